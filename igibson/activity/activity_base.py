@@ -8,6 +8,7 @@ from bddl.condition_evaluation import Negation
 from bddl.logic_base import AtomicFormula
 
 import igibson
+from igibson.activity.bddl_backend import PREDICATE_EVALUATOR
 from igibson.external.pybullet_tools.utils import *
 from igibson.object_states.on_floor import RoomFloor
 from igibson.objects.articulated_object import URDFObject
@@ -101,6 +102,16 @@ class iGBEHAVIORActivityInstance(BEHAVIORActivityInstance):
     def reset_scene(self, snapshot_id):
         restoreState(snapshot_id)
         load_internal_states(self.simulator, self.state_history[snapshot_id])
+        PREDICATE_EVALUATOR.clear()
+
+    def check_success(self):
+        # Evaluate each distinct atom of the goal conditions once, computing the adjacencies of the kinematic
+        # predicates in one ray casting pass instead of one per object. The values are reused until the simulator
+        # steps or a body is moved through the iGibson API: callers changing other states, or moving bodies with raw
+        # pybullet calls, without stepping must call PREDICATE_EVALUATOR.clear() before checking again
+        with PREDICATE_EVALUATOR.caching(self.simulator.frame_count):
+            PREDICATE_EVALUATOR.evaluate_atoms(self.goal_conditions)
+            return super(iGBEHAVIORActivityInstance, self).check_success()
 
     def check_scene(self):
         feedback = {"init_success": "yes", "goal_success": "untested", "init_feedback": "", "goal_feedback": ""}
@@ -1,17 +1,170 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
 from bddl.backend_abc import BDDLBackend
 from bddl.logic_base import BinaryAtomicFormula, UnaryAtomicFormula
 
 from igibson import object_states
+from igibson.object_states.adjacency import HorizontalAdjacency, VerticalAdjacency, update_adjacencies_per_object
+from igibson.physics.activation_tracker import get_latest_pose_version
+
+
+class PredicateEvaluator(object):
+    """
+    Evaluates the atomic predicates of BDDL conditions through the object states. While caching is enabled, every
+    distinct (predicate, objects, simulator frame) atom is evaluated once and its value is shared by all the ground
+    conditions it appears in. The cached values are also dropped when any body is moved through the iGibson API,
+    which bumps its pose version, even without stepping the simulator.
+    """
+
+    def __init__(self):
+        self.cache = {}
+        self.frame = None
+        self.pose_version = None
+        self.caching_enabled = False
+        self.evaluation_counts = defaultdict(int)
+        self.evaluation_times = defaultdict(float)
+        self.cache_hits = defaultdict(int)
+
+    @contextmanager
+    def caching(self, frame):
+        """
+        Cache the values of the atoms evaluated in this context
+
+        :param frame: current simulator frame, the values cached for the other frames are dropped
+        """
+        pose_version = get_latest_pose_version()
+        if frame != self.frame or pose_version != self.pose_version:
+            self.clear()
+            self.frame = frame
+            self.pose_version = pose_version
+        caching_enabled = self.caching_enabled
+        self.caching_enabled = True
+        try:
+            yield
+        finally:
+            self.caching_enabled = caching_enabled
+
+    def clear(self):
+        """
+        Drop the cached values, e.g. when object states are changed without stepping the simulator
+        """
+        self.cache = {}
+
+    def get_key(self, state_class, objs, kwargs):
+        return state_class, objs, tuple(sorted(kwargs.items())), self.frame
+
+    def evaluate(self, state_class, state_name, objs, kwargs):
+        """
+        Evaluate an atom, or get its cached value
+
+        :param state_class: object state class of the predicate
+        :param state_name: name of the predicate
+        :param objs: tuple of the objects of the atom, the state of the first one is evaluated on the others
+        :param kwargs: keyword arguments of the state evaluation
+        :return: value of the atom
+        """
+        key = self.get_key(state_class, objs, kwargs)
+        if self.caching_enabled and key in self.cache:
+            self.cache_hits[state_name] += 1
+            return self.cache[key]
+
+        start = time.time()
+        value = objs[0].states[state_class].get_value(*objs[1:], **kwargs)
+        self.evaluation_times[state_name] += time.time() - start
+        self.evaluation_counts[state_name] += 1
+
+        if self.caching_enabled:
+            self.cache[key] = value
+        return value
+
+    def evaluate_atoms(self, expressions):
+        """
+        Evaluate the distinct atoms of compiled BDDL expressions into the cache, cheapest first: the atoms that do
+        not need ray casting, then the cheap prechecks of the ones that do, and finally the ray casting atoms that
+        passed their precheck, once the adjacencies of all their objects are computed in a single ray casting pass.
+
+        :param expressions: compiled BDDL expressions, e.g. the goal conditions of an activity
+        """
+        assert self.caching_enabled, "Atoms can only be evaluated into the cache while caching is enabled."
+
+        atoms = {}
+        expressions = list(expressions)
+        while expressions:
+            expression = expressions.pop()
+            if not isinstance(expression, (ObjectStateUnaryPredicate, ObjectStateBinaryPredicate)):
+                # The children of forpairs and fornpairs are lists of expressions
+                for child in expression.children:
+                    expressions.extend(child if isinstance(child, list) else [child])
+                continue
+            objs = expression.get_objects()
+            if objs is None:
+                continue
+            key = self.get_key(expression.STATE_CLASS, objs, expression.kwargs)
+            if key not in self.cache:
+                atoms[key] = expression.STATE_CLASS, expression.STATE_NAME, objs, expression.kwargs
+
+        ray_casting_atoms = []
+        # The states evaluate the adjacencies of their first object, the others are computed when needed
+        adjacency_types_by_obj = defaultdict(set)
+        for key, (state_class, state_name, objs, kwargs) in atoms.items():
+            adjacency_types = {VerticalAdjacency, HorizontalAdjacency} & set(state_class.get_dependencies())
+            if not adjacency_types:
+                self.evaluate(state_class, state_name, objs, kwargs)
+                continue
+
+            state = objs[0].states[state_class]
+            if hasattr(state, "passes_precheck"):
+                start = time.time()
+                passes_precheck = state.passes_precheck(*objs[1:])
+                self.evaluation_times[state_name] += time.time() - start
+                if not passes_precheck:
+                    self.evaluation_counts[state_name] += 1
+                    self.cache[key] = False
+                    continue
+            ray_casting_atoms.append((state_class, state_name, objs, kwargs))
+            adjacency_types_by_obj[objs[0]].update(adjacency_types)
+
+        update_adjacencies_per_object(adjacency_types_by_obj)
+        for state_class, state_name, objs, kwargs in ray_casting_atoms:
+            self.evaluate(state_class, state_name, objs, kwargs)
+
+    def reset_stats(self):
+        self.evaluation_counts.clear()
+        self.evaluation_times.clear()
+        self.cache_hits.clear()
+
+    def get_stats(self):
+        """
+        :return: dict of the number of evaluations, cache hits and the evaluation time in seconds of each predicate
+        """
+        return {
+            state_name: {
+                "evaluations": self.evaluation_counts[state_name],
+                "cache_hits": self.cache_hits[state_name],
+                "time": self.evaluation_times[state_name],
+            }
+            for state_name in set(self.evaluation_counts) | set(self.cache_hits)
+        }
+
+
+PREDICATE_EVALUATOR = PredicateEvaluator()
 
 
 class ObjectStateUnaryPredicate(UnaryAtomicFormula):
     STATE_CLASS = None
     STATE_NAME = None
 
+    def get_objects(self):
+        obj = self.scope[self.input]
+        return None if obj is None else (obj,)
+
     def _evaluate(self, obj, **kwargs):
-        return obj.states[self.STATE_CLASS].get_value(**kwargs)
+        return PREDICATE_EVALUATOR.evaluate(self.STATE_CLASS, self.STATE_NAME, (obj,), kwargs)
 
     def _sample(self, obj, binary_state, **kwargs):
+        PREDICATE_EVALUATOR.clear()
         return obj.states[self.STATE_CLASS].set_value(binary_state, **kwargs)
 
 
@@ -19,10 +172,15 @@ class ObjectStateBinaryPredicate(BinaryAtomicFormula):
     STATE_CLASS = None
     STATE_NAME = None
 
+    def get_objects(self):
+        obj1, obj2 = self.scope[self.input1], self.scope[self.input2]
+        return None if obj1 is None or obj2 is None else (obj1, obj2)
+
     def _evaluate(self, obj1, obj2, **kwargs):
-        return obj1.states[self.STATE_CLASS].get_value(obj2, **kwargs)
+        return PREDICATE_EVALUATOR.evaluate(self.STATE_CLASS, self.STATE_NAME, (obj1, obj2), kwargs)
 
     def _sample(self, obj1, obj2, binary_state, **kwargs):
+        PREDICATE_EVALUATOR.clear()
         return obj1.states[self.STATE_CLASS].set_value(obj2, binary_state, **kwargs)
 
 
@@ -35,6 +35,7 @@ def remove_newly_added_objects(igbhvr_act_inst, state_id):
         igbhvr_act_inst.scene.remove_object(sim_obj)
         for id in sim_obj.body_ids:
             p.removeBody(id)
+            igbhvr_act_inst.simulator.activation_tracker.untrack_body(id)
     restoreState(state_id)
 
 
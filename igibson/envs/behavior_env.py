@@ -10,11 +10,13 @@ import numpy as np
 from bddl.condition_evaluation import evaluate_state
 
 from igibson.activity.activity_base import iGBEHAVIORActivityInstance
+from igibson.activity.bddl_backend import PREDICATE_EVALUATOR
 from igibson.envs.igibson_env import iGibsonEnv
 from igibson.robots.behavior_robot import BehaviorRobot
 from igibson.robots.fetch_gripper_robot import FetchGripper
 from igibson.utils.checkpoint_utils import load_checkpoint
 from igibson.utils.ig_logging import IGLogWriter
+from igibson.utils.profiling import PROFILER
 
 BEHAVIOR_ROBOT_ACTION_SCALING = 0.05
 # The original action space defined in BehaviorEnv is too large and will be clipped when applying
@@ -186,6 +188,7 @@ class BehaviorEnv(iGibsonEnv):
             )
             self.observation_space = gym.spaces.Dict(self.observation_space.spaces)
 
+    @PROFILER.profile("env.step")
     def step(self, action):
         """
         Apply robot's action.
@@ -233,14 +236,18 @@ class BehaviorEnv(iGibsonEnv):
         else:
             Exception("Only BehaviorRobot and FetchGripper are supported for behavior_env")
 
-        self.robots[0].apply_action(new_action)
+        with PROFILER.scope("apply_action"):
+            self.robots[0].apply_action(new_action)
         if self.log_writer is not None:
-            self.log_writer.process_frame()
+            with PROFILER.scope("log_writer"):
+                self.log_writer.process_frame()
         self.simulator.step()
 
-        state = self.get_state()
+        with PROFILER.scope("get_state"):
+            state = self.get_state()
         info = {}
-        done, satisfied_predicates = self.task.check_success()
+        with PROFILER.scope("check_success"):
+            done, satisfied_predicates = self.task.check_success()
         # Compute the initial reward potential here instead of during reset
         # because if an intermediate checkpoint is loaded, we need step the
         # simulator before calling task.check_success
@@ -249,21 +256,25 @@ class BehaviorEnv(iGibsonEnv):
 
         if self.current_step >= self.config["max_step"]:
             done = True
-        reward, info = self.get_reward(satisfied_predicates)
+        with PROFILER.scope("get_reward"):
+            reward, info = self.get_reward(satisfied_predicates)
 
         self.populate_info(info)
 
         if done and self.automatic_reset:
             info["last_observation"] = state
-            state = self.reset()
+            with PROFILER.scope("reset"):
+                state = self.reset()
 
         return state, reward, done, info
 
     def get_potential(self, satisfied_predicates):
         potential = 0.0
 
-        # Evaluate the first ground goal state option as the potential
-        _, satisfied_predicates = evaluate_state(self.task.ground_goal_state_options[0])
+        # Evaluate the first ground goal state option as the potential, reusing the atoms evaluated by check_success
+        with PREDICATE_EVALUATOR.caching(self.simulator.frame_count):
+            PREDICATE_EVALUATOR.evaluate_atoms(self.task.ground_goal_state_options[0])
+            _, satisfied_predicates = evaluate_state(self.task.ground_goal_state_options[0])
         success_score = len(satisfied_predicates["satisfied"]) / (
             len(satisfied_predicates["satisfied"]) + len(satisfied_predicates["unsatisfied"])
         )
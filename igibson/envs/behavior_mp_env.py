@@ -14,6 +14,7 @@ from igibson.object_states.utils import sample_kinematics
 from igibson.objects.articulated_object import URDFObject
 from igibson.robots.behavior_robot import BRBody, BREye, BRHand
 from igibson.utils.behavior_robot_planning_utils import dry_run_base_plan, plan_base_motion_br, plan_hand_motion_br
+from igibson.utils.motion_planning_service import MotionPlanningService
 from igibson.utils.utils import restoreState
 
 
@@ -75,6 +76,7 @@ class BehaviorMPEnv(BehaviorEnv):
         action_filter="mobile_manipulation",
         use_motion_planning=False,
         activity_relevant_objects_only=True,
+        num_planning_workers=0,
     ):
         """
         @param config_file: config_file path
@@ -89,6 +91,8 @@ class BehaviorMPEnv(BehaviorEnv):
         @param action_filter: see BehaviorEnv
         @param use_motion_planning: Whether motion-planned primitives or magic primitives should be used
         @param activity_relevant_objects_only: Whether the actions should be parameterized by AROs or all scene objs.
+        @param num_planning_workers: Number of processes solving the candidate plans of the motion-planned primitives
+            in parallel, 0 to plan a single candidate at a time in this process
         """
         super(BehaviorMPEnv, self).__init__(
             config_file=config_file,
@@ -106,6 +110,7 @@ class BehaviorMPEnv(BehaviorEnv):
         self.use_motion_planning = use_motion_planning
         self.activity_relevant_objects_only = activity_relevant_objects_only
         self.robots[0].initial_z_offset = 0.7
+        self.planning_service = MotionPlanningService(num_planning_workers) if num_planning_workers > 0 else None
 
     def load_action_space(self):
         if self.activity_relevant_objects_only:
@@ -276,35 +281,54 @@ class BehaviorMPEnv(BehaviorEnv):
         print("PRIMITIVE satisfied predicates:", info["satisfied_predicates"])
         return state, reward, done, info
 
-    def grasp_obj(self, obj, hand):
-        if self.use_motion_planning:
-            x, y, _ = obj.get_position()
-            z = obj.states[object_states.AABB].get_value()[1][2]
-            hand_x, hand_y, hand_z = self.robots[0].parts[hand].get_position()
-
-            # add a little randomness to avoid getting stuck
-            x += np.random.uniform(-0.025, 0.025)
-            y += np.random.uniform(-0.025, 0.025)
-            z += np.random.uniform(-0.025, 0.025)
+    def sample_grasp_goal(self, obj, hand):
+        """
+        Sample a hand pose above an object to grasp it from
 
-            minx = min(x, hand_x) - 0.5
-            miny = min(y, hand_y) - 0.5
-            minz = min(z, hand_z) - 0.5
-            maxx = max(x, hand_x) + 0.5
-            maxy = max(y, hand_y) + 0.5
-            maxz = max(z, hand_z) + 0.5
+        :param obj: object to grasp
+        :param hand: hand to grasp it with
+        :return: end_conf and hand_limits arguments of plan_hand_motion_br
+        """
+        x, y, _ = obj.get_position()
+        z = obj.states[object_states.AABB].get_value()[1][2]
+        hand_x, hand_y, hand_z = self.robots[0].parts[hand].get_position()
+
+        # add a little randomness to avoid getting stuck
+        x += np.random.uniform(-0.025, 0.025)
+        y += np.random.uniform(-0.025, 0.025)
+        z += np.random.uniform(-0.025, 0.025)
+
+        minx = min(x, hand_x) - 0.5
+        miny = min(y, hand_y) - 0.5
+        minz = min(z, hand_z) - 0.5
+        maxx = max(x, hand_x) + 0.5
+        maxy = max(y, hand_y) + 0.5
+        maxz = max(z, hand_z) + 0.5
+
+        return {
+            "end_conf": [x, y, z + 0.05, 0, np.pi * 5 / 6.0, np.random.uniform(-np.pi, np.pi)],
+            "hand_limits": ((minx, miny, minz), (maxx, maxy, maxz)),
+        }
 
-            state = p.saveState()
+    def grasp_obj(self, obj, hand):
+        if self.use_motion_planning:
             # plan a motion to above the object
-            plan = plan_hand_motion_br(
-                robot=self.robots[0],
-                obj_in_hand=None,
-                end_conf=[x, y, z + 0.05, 0, np.pi * 5 / 6.0, np.random.uniform(-np.pi, np.pi)],
-                hand_limits=((minx, miny, minz), (maxx, maxy, maxz)),
-                obstacles=self.get_body_ids(include_self=True),
-            )
-            restoreState(state)
-            p.removeState(state)
+            if self.planning_service is None:
+                state = p.saveState()
+                plan = plan_hand_motion_br(
+                    robot=self.robots[0],
+                    obj_in_hand=None,
+                    obstacles=self.get_body_ids(include_self=True),
+                    **self.sample_grasp_goal(obj, hand)
+                )
+                restoreState(state)
+                p.removeState(state)
+            else:
+                # try a different grasp sample in every worker
+                candidates = [self.sample_grasp_goal(obj, hand) for _ in range(self.planning_service.num_workers)]
+                _, plan = self.planning_service.solve(
+                    "hand", self.robots[0], candidates, obstacles=self.get_body_ids(include_self=True)
+                )
 
             if plan is not None:
                 grasp_success = self.execute_grasp_plan(plan, obj, hand)
@@ -386,18 +410,27 @@ class BehaviorMPEnv(BehaviorEnv):
             maxy = max(y, hand_y) + 1
             maxz = max(z, hand_z) + 0.5
 
-            state = p.saveState()
             obstacles = self.get_body_ids()
             obstacles.remove(self.obj_in_hand.get_body_id())
-            plan = plan_hand_motion_br(
-                robot=self.robots[0],
-                obj_in_hand=obj_in_hand,
-                end_conf=[x, y, z + 0.1, 0, np.pi * 5 / 6.0, 0],
-                hand_limits=((minx, miny, minz), (maxx, maxy, maxz)),
-                obstacles=obstacles,
-            )  #
-            restoreState(state)
-            p.removeState(state)
+            end_conf = [x, y, z + 0.1, 0, np.pi * 5 / 6.0, 0]
+            hand_limits = ((minx, miny, minz), (maxx, maxy, maxz))
+            if self.planning_service is None:
+                state = p.saveState()
+                plan = plan_hand_motion_br(
+                    robot=self.robots[0],
+                    obj_in_hand=obj_in_hand,
+                    end_conf=end_conf,
+                    hand_limits=hand_limits,
+                    obstacles=obstacles,
+                )  #
+                restoreState(state)
+                p.removeState(state)
+            else:
+                # same goal in every worker, with different random seeds
+                candidates = [{"end_conf": end_conf, "hand_limits": hand_limits}] * self.planning_service.num_workers
+                _, plan = self.planning_service.solve(
+                    "hand", self.robots[0], candidates, obstacles=obstacles, obj_in_hand=obj_in_hand
+                )
 
             if plan:
                 for x, y, z, roll, pitch, yaw in plan:
@@ -423,12 +456,16 @@ class BehaviorMPEnv(BehaviorEnv):
         theta = np.random.uniform(*CIRCULAR_LIMITS)
         return (x, y, theta)
 
-    def navigate_to_obj(self, obj):
-        # test agent positions around an obj
-        # try to place the agent near the object, and rotate it to the object
-        valid_position = None  # ((x,y,z),(roll, pitch, yaw))
-        original_position = self.robots[0].get_position()
-        original_orientation = self.robots[0].get_orientation()
+    def sample_navigation_goals(self, obj, num_goals=1):
+        """
+        Sample collision-free robot poses near an object. Around a URDFObject, the robot faces the object and sees it,
+        and the poses closest to the object are preferred.
+
+        :param obj: URDFObject or RoomFloor to navigate to
+        :param num_goals: maximum number of poses to sample
+        :return: list of the (position, euler orientation) poses, the robot pose is left at the last tried pose
+        """
+        valid_positions = []  # ((x,y,z),(roll, pitch, yaw))
         if isinstance(obj, URDFObject):
             distance_to_try = [0.6, 1.2, 1.8, 2.4]
             obj_pos = obj.get_position()
@@ -446,9 +483,10 @@ class BehaviorMPEnv(BehaviorEnv):
                         blocked = True
 
                     if not detect_robot_collision(self.robots[0]) and not blocked:
-                        valid_position = (pos, orn)
-                        break
-                if valid_position is not None:
+                        valid_positions.append((pos, orn))
+                        if len(valid_positions) == num_goals:
+                            break
+                if len(valid_positions) > 0:
                     break
         else:
             for _ in range(60):
@@ -457,28 +495,54 @@ class BehaviorMPEnv(BehaviorEnv):
                 orn = [0, 0, yaw]
                 self.robots[0].set_position_orientation(pos, p.getQuaternionFromEuler(orn))
                 if not detect_robot_collision(self.robots[0]):
-                    valid_position = (pos, orn)
-                    break
+                    valid_positions.append((pos, orn))
+                    if len(valid_positions) == num_goals:
+                        break
+        return valid_positions
 
-        if valid_position is not None:
-            target_x = valid_position[0][0]
-            target_y = valid_position[0][1]
-            x = original_position[0]
-            y = original_position[1]
-            minx = min(x, target_x) - 1
-            miny = min(y, target_y) - 1
-            maxx = max(x, target_x) + 1
-            maxy = max(y, target_y) + 1
+    def navigate_to_obj(self, obj):
+        # test agent positions around an obj
+        # try to place the agent near the object, and rotate it to the object
+        original_position = self.robots[0].get_position()
+        original_orientation = self.robots[0].get_orientation()
+        num_goals = self.planning_service.num_workers if self.use_motion_planning and self.planning_service else 1
+        valid_positions = self.sample_navigation_goals(obj, num_goals)
 
+        if len(valid_positions) > 0:
+            valid_position = valid_positions[0]
             if self.use_motion_planning:
                 self.robots[0].set_position_orientation(original_position, original_orientation)
-                plan = plan_base_motion_br(
-                    robot=self.robots[0],
-                    end_conf=[valid_position[0][0], valid_position[0][1], valid_position[1][2]],
-                    base_limits=[(minx, miny), (maxx, maxy)],
-                    obstacles=self.get_body_ids(),
-                    override_sample_fn=self.sample_fn,
-                )
+                x = original_position[0]
+                y = original_position[1]
+                candidates = []
+                for pos, orn in valid_positions:
+                    target_x = pos[0]
+                    target_y = pos[1]
+                    minx = min(x, target_x) - 1
+                    miny = min(y, target_y) - 1
+                    maxx = max(x, target_x) + 1
+                    maxy = max(y, target_y) + 1
+                    candidates.append(
+                        {"end_conf": [target_x, target_y, orn[2]], "base_limits": [(minx, miny), (maxx, maxy)]}
+                    )
+
+                if self.planning_service is None:
+                    plan = plan_base_motion_br(
+                        robot=self.robots[0],
+                        obstacles=self.get_body_ids(),
+                        override_sample_fn=self.sample_fn,
+                        **candidates[0]
+                    )
+                else:
+                    # the workers sample the base positions among traversable points drawn here, as self.sample_fn
+                    sample_points = np.array([self.scene.get_random_point()[1][:2] for _ in range(1000)])
+                    for candidate in candidates:
+                        candidate["sample_points"] = sample_points
+                    index, plan = self.planning_service.solve(
+                        "base", self.robots[0], candidates, obstacles=self.get_body_ids()
+                    )
+                    if plan is not None:
+                        valid_position = valid_positions[index]
 
                 if plan is not None:
                     if self.mode != "headless":
@@ -507,6 +571,11 @@ class BehaviorMPEnv(BehaviorEnv):
             if self.navigate_to_obj(obj):
                 return
 
+    def close(self):
+        if self.planning_service is not None:
+            self.planning_service.close()
+        super(BehaviorMPEnv, self).close()
+
     def reset(self, resample_objects=False):
         obs = super(BehaviorMPEnv, self).reset()
         for hand in ["left_hand", "right_hand"]:
@@ -9,7 +9,7 @@ import pybullet as p
 from transforms3d.euler import euler2quat
 
 from igibson.envs.env_base import BaseEnv
-from igibson.external.pybullet_tools.utils import stable_z_on_aabb
+from igibson.external.pybullet_tools.utils import body_collision, get_aabb, get_bodies_in_region, stable_z_on_aabb
 from igibson.robots.robot_base import BaseRobot
 from igibson.sensors.bump_sensor import BumpSensor
 from igibson.sensors.scan_sensor import ScanSensor
@@ -21,6 +21,7 @@ from igibson.tasks.point_nav_random_task import PointNavRandomTask
 from igibson.tasks.reaching_random_task import ReachingRandomTask
 from igibson.tasks.room_rearrangement_task import RoomRearrangementTask
 from igibson.utils.constants import MAX_CLASS_COUNT, MAX_INSTANCE_COUNT
+from igibson.utils.profiling import PROFILER
 from igibson.utils.utils import quatToXYZW
 
 
@@ -286,6 +287,7 @@ class iGibsonEnv(BaseEnv):
         info["episode_length"] = self.current_step
         info["collision_step"] = self.collision_step
 
+    @PROFILER.profile("env.step")
     def step(self, action):
         """
         Apply robot's action.
@@ -300,21 +302,28 @@ class iGibsonEnv(BaseEnv):
         """
         self.current_step += 1
         if action is not None:
-            self.robots[0].apply_action(action)
-        collision_links = self.run_simulation()
+            with PROFILER.scope("apply_action"):
+                self.robots[0].apply_action(action)
+        with PROFILER.scope("run_simulation"):
+            collision_links = self.run_simulation()
         self.collision_links = collision_links
         self.collision_step += int(len(collision_links) > 0)
 
-        state = self.get_state(collision_links)
+        with PROFILER.scope("get_state"):
+            state = self.get_state(collision_links)
         info = {}
-        reward, info = self.task.get_reward(self, collision_links, action, info)
-        done, info = self.task.get_termination(self, collision_links, action, info)
-        self.task.step(self)
+        with PROFILER.scope("get_reward"):
+            reward, info = self.task.get_reward(self, collision_links, action, info)
+        with PROFILER.scope("get_termination"):
+            done, info = self.task.get_termination(self, collision_links, action, info)
+        with PROFILER.scope("task_step"):
+            self.task.step(self)
         self.populate_info(info)
 
         if done and self.automatic_reset:
             info["last_observation"] = state
-            state = self.reset()
+            with PROFILER.scope("reset"):
+                state = self.reset()
 
         return state, reward, done, info
 
@@ -334,6 +343,32 @@ class iGibsonEnv(BaseEnv):
 
         return len(collisions) == 0
 
+    @staticmethod
+    def check_placement_collision(body_id):
+        """
+        Check whether the given body_id has any collision at its current pose, without stepping the simulation.
+        Only the bodies whose AABB overlaps the AABB of body_id are checked.
+
+        Only touching or penetrating bodies are in collision. Unlike check_collision, whose contact points after a
+        step include the collision margin of the shapes, placements a few millimeters away from other bodies, e.g.
+        between convex meshes, are accepted.
+
+        :param body_id: pybullet body id
+        :return: whether the given body_id has no collision
+        """
+        # pybullet updates the broadphase AABBs when bodies and joints are reset, no physics step is needed
+        overlapping_objects = get_bodies_in_region(get_aabb(body_id)) or []
+        overlapping_body_ids = sorted(set(other_id for other_id, _ in overlapping_objects) - {body_id})
+        collisions = [
+            other_id for other_id in overlapping_body_ids if body_collision(body_id, other_id, max_distance=0.0)
+        ]
+
+        if logging.root.level <= logging.DEBUG:  # Only going into this if it is for logging --> efficiency
+            for other_id in collisions:
+                logging.debug("bodyA:{}, bodyB:{}".format(body_id, other_id))
+
+        return len(collisions) == 0
+
     def set_pos_orn_with_z_offset(self, obj, pos, orn=None, offset=None):
         """
         Reset position and orientation for the robot or the object
@@ -361,7 +396,9 @@ class iGibsonEnv(BaseEnv):
 
     def test_valid_position(self, obj, pos, orn=None):
         """
-        Test if the robot or the object can be placed with no collision
+        Test if the robot or the object can be placed with no collision.
+        The simulation is not stepped: only the tested robot or object is moved, no need to save and restore the
+        pybullet state around the test.
 
         :param obj: an instance of robot or object
         :param pos: position
@@ -377,7 +414,7 @@ class iGibsonEnv(BaseEnv):
             obj.keep_still()
 
         body_id = obj.robot_ids[0] if is_robot else obj.get_body_id()
-        has_collision = self.check_collision(body_id)
+        has_collision = self.check_placement_collision(body_id)
         return has_collision
 
     def land(self, obj, pos, orn):
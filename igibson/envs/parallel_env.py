@@ -4,11 +4,18 @@ import os
 import sys
 import traceback
 
+import gym
 import numpy as np
 
 import igibson
 from igibson.envs.igibson_env import iGibsonEnv
 
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:
+    # Python < 3.8
+    shared_memory = None
+
 
 class ParallelNavEnv(iGibsonEnv):
     """Batch together environments and simulate them in external processes.
@@ -18,7 +25,7 @@ class ParallelNavEnv(iGibsonEnv):
     access global variables.
     """
 
-    def __init__(self, env_constructors, blocking=False, flatten=False):
+    def __init__(self, env_constructors, blocking=False, flatten=False, use_shared_memory=False, ring_size=2):
         """Batch together environments and simulate them in external processes.
         The environments can be different but must use the same action and
         observation specs.
@@ -27,16 +34,29 @@ class ParallelNavEnv(iGibsonEnv):
         :param blocking: Whether to step environments one after another.
         :param flatten: Boolean, whether to use flatten action and time_steps during
             communication to reduce overhead.
+        :param use_shared_memory: Whether the workers write the observations into a
+            shared memory ring buffer instead of sending them through the pipe.
+        :param ring_size: number of batched observations kept in the ring buffer.
         :raise ValueError: If the action or observation specs don't match.
         """
         self._envs = [ProcessPyEnvironment(ctor, flatten=flatten) for ctor in env_constructors]
         self._num_envs = len(env_constructors)
+        if use_shared_memory and shared_memory is not None:
+            # Share the resource tracker with the workers, so that they do not free the buffer when they exit
+            resource_tracker.ensure_running()
         self.start()
         self.action_space = self._envs[0].action_space
         self.observation_space = self._envs[0].observation_space
         self._blocking = blocking
         self._flatten = flatten
 
+        self._obs_buffer = None
+        self._obs_slot = 0
+        if use_shared_memory:
+            self._obs_buffer = SharedObservationBuffer(self.observation_space, self._num_envs, ring_size)
+            for index, env in enumerate(self._envs):
+                env.share_observations(self._obs_buffer, index)
+
     def start(self):
         """
         Start all children processes
@@ -55,29 +75,134 @@ class ParallelNavEnv(iGibsonEnv):
     def reset(self):
         """Reset all environments and combine the resulting observation.
 
-        :return: a list of [next_obs, reward, done, info]
+        :return: a list of next_obs, or the batched next_obs when using shared memory
         """
-        time_steps = [env.reset(self._blocking) for env in self._envs]
+        obs_slot = self._next_obs_slot()
+        time_steps = [env.reset(self._blocking, obs_slot=obs_slot) for env in self._envs]
         if not self._blocking:
             time_steps = [promise() for promise in time_steps]
+        if self._obs_buffer is not None:
+            return self._obs_buffer.read(obs_slot)
         return time_steps
 
     def step(self, actions):
         """Forward a batch of actions to the wrapped environments.
 
+        When using shared memory, the batched next_obs is a dict of views of the ring buffer, without any copy.
+        It stays valid until ring_size - 1 more steps or resets are taken.
+
         :param actions: batched action, possibly nested, to apply to the environment.
-        :return: a list of [next_obs, reward, done, info]
+        :return: a list of [next_obs, reward, done, info], or [batched next_obs, rewards, dones, infos] when using
+            shared memory
         """
-        time_steps = [env.step(action, self._blocking) for env, action in zip(self._envs, actions)]
+        obs_slot = self._next_obs_slot()
+        time_steps = [
+            env.step(action, self._blocking, obs_slot=obs_slot) for env, action in zip(self._envs, actions)
+        ]
         # When blocking is False we get promises that need to be called.
         if not self._blocking:
             time_steps = [promise() for promise in time_steps]
+        if self._obs_buffer is not None:
+            _, rewards, dones, infos = zip(*time_steps)
+            return self._obs_buffer.read(obs_slot), np.array(rewards), np.array(dones), list(infos)
         return time_steps
 
+    def _next_obs_slot(self):
+        """
+        :return: slot of the ring buffer to write the next observations to, or None when not using shared memory
+        """
+        if self._obs_buffer is None:
+            return None
+        obs_slot = self._obs_slot
+        self._obs_slot = (self._obs_slot + 1) % self._obs_buffer.ring_size
+        return obs_slot
+
     def close(self):
         """Close all external process."""
         for env in self._envs:
             env.close()
+        if self._obs_buffer is not None:
+            self._obs_buffer.close()
+            self._obs_buffer.unlink()
+            self._obs_buffer = None
+
+
+class SharedObservationBuffer(object):
+    """
+    Ring buffer of batched observations in shared memory, laid out from a gym Dict observation space of Box spaces.
+    Each modality is stored as a (ring_size, num_envs, *shape) array, so that the observations of all the
+    environments for a step are a single view of the buffer.
+    """
+
+    # Alignment of the arrays in the buffer, in bytes
+    _ALIGNMENT = 64
+
+    def __init__(self, observation_space, num_envs, ring_size=2, name=None):
+        """
+        :param observation_space: gym Dict observation space of the environments
+        :param num_envs: number of environments
+        :param ring_size: number of batched observations kept in the buffer
+        :param name: name of an existing buffer to attach to, or None to create a new one
+        """
+        if shared_memory is None:
+            raise RuntimeError("Shared memory observations require Python 3.8 or newer")
+        if not isinstance(observation_space, gym.spaces.Dict) or not all(
+            isinstance(space, gym.spaces.Box) for space in observation_space.spaces.values()
+        ):
+            raise ValueError("Shared memory observations require a Dict observation space of Box spaces")
+
+        self.observation_space = observation_space
+        self.num_envs = num_envs
+        self.ring_size = ring_size
+
+        layout = []
+        size = 0
+        for key, space in observation_space.spaces.items():
+            shape = (ring_size, num_envs) + tuple(space.shape)
+            layout.append((key, shape, space.dtype, size))
+            nbytes = int(np.prod(shape)) * space.dtype.itemsize
+            size += (nbytes + self._ALIGNMENT - 1) // self._ALIGNMENT * self._ALIGNMENT
+
+        self._shm = shared_memory.SharedMemory(name=name, create=name is None, size=max(size, 1))
+        self.arrays = {
+            key: np.ndarray(shape, dtype=dtype, buffer=self._shm.buf, offset=offset)
+            for key, shape, dtype, offset in layout
+        }
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def __reduce__(self):
+        # Workers attach to the same buffer by name
+        return SharedObservationBuffer, (self.observation_space, self.num_envs, self.ring_size, self.name)
+
+    def write(self, slot, index, obs):
+        """
+        Write the observation of an environment
+
+        :param slot: slot of the ring buffer
+        :param index: index of the environment
+        :param obs: observation dict
+        """
+        for key, array in self.arrays.items():
+            array[slot, index] = obs[key]
+
+    def read(self, slot):
+        """
+        :param slot: slot of the ring buffer
+        :return: dict of the batched observations of all the environments, as views of the buffer
+        """
+        return {key: array[slot] for key, array in self.arrays.items()}
+
+    def close(self):
+        """Detach from the buffer. The views returned by read are invalid afterwards."""
+        self.arrays = {}
+        self._shm.close()
+
+    def unlink(self):
+        """Free the buffer, once all the processes have closed it."""
+        self._shm.unlink()
 
 
 class ProcessPyEnvironment(object):
@@ -90,6 +215,7 @@ class ProcessPyEnvironment(object):
     _RESULT = 4
     _EXCEPTION = 5
     _CLOSE = 6
+    _SHARE = 7
 
     def __init__(self, env_constructor, flatten=False):
         """Step environment in a separate process for lock free paralellism.
@@ -152,26 +278,37 @@ class ProcessPyEnvironment(object):
             pass
         self._process.join(5)
 
-    def step(self, action, blocking=True):
+    def share_observations(self, obs_buffer, index):
+        """Make the external environment write its observations into a shared memory buffer.
+
+        :param obs_buffer: SharedObservationBuffer of the batched environments.
+        :param index: index of the environment in the buffer.
+        """
+        self._conn.send((self._SHARE, (obs_buffer, index)))
+        self._receive()
+
+    def step(self, action, blocking=True, obs_slot=None):
         """Step the environment.
 
         :param action: the action to apply to the environment.
         :param blocking: whether to wait for the result.
+        :param obs_slot: slot of the shared memory buffer to write next_obs to, next_obs is then None in the result.
         :return: (next_obs, reward, done, info) tuple when blocking, otherwise callable that returns that tuple
         """
-        promise = self.call("step", action)
+        promise = self.call("step", action, obs_slot=obs_slot)
         if blocking:
             return promise()
         else:
             return promise
 
-    def reset(self, blocking=True):
+    def reset(self, blocking=True, obs_slot=None):
         """Reset the environment.
 
         :param blocking: whether to wait for the result.
+        :param obs_slot: slot of the shared memory buffer to write next_obs to, next_obs is then None.
         :return: next_obs when blocking, otherwise callable that returns next_obs
         """
-        promise = self.call("reset")
+        promise = self.call("reset", obs_slot=obs_slot)
         if blocking:
             return promise()
         else:
@@ -205,6 +342,8 @@ class ProcessPyEnvironment(object):
 
         :raise KeyError: when receiving a message of unknown type.
         """
+        obs_buffer = None
+        obs_index = None
         try:
             np.random.seed()
             env = env_constructor()
@@ -222,10 +361,23 @@ class ProcessPyEnvironment(object):
                     result = getattr(env, name)
                     conn.send((self._RESULT, result))
                     continue
+                if message == self._SHARE:
+                    obs_buffer, obs_index = payload
+                    conn.send((self._RESULT, None))
+                    continue
                 if message == self._CALL:
                     name, args, kwargs = payload
                     if name == "step" or name == "reset":
+                        obs_slot = kwargs.pop("obs_slot", None)
                         result = getattr(env, name)(*args, **kwargs)
+                        if obs_slot is not None:
+                            # Only send the small part of the result through the pipe
+                            if name == "step":
+                                obs_buffer.write(obs_slot, obs_index, result[0])
+                                result = (None,) + tuple(result[1:])
+                            else:
+                                obs_buffer.write(obs_slot, obs_index, result)
+                                result = None
                     conn.send((self._RESULT, result))
                     continue
                 if message == self._CLOSE:
@@ -239,6 +391,8 @@ class ProcessPyEnvironment(object):
             # tf.logging.error(message)
             conn.send((self._EXCEPTION, stacktrace))
         finally:
+            if obs_buffer is not None:
+                obs_buffer.close()
             conn.close()
 
 
@@ -218,7 +218,7 @@ def replay_demo(
         online_sampling=False,
     )
     vr_agent = igbhvr_act_inst.simulator.robots[0]
-    log_reader = IGLogReader(in_log_path, log_status=False)
+    log_reader = IGLogReader(in_log_path, log_status=False, block_size=200)
 
     log_writer = None
     if not disable_save:
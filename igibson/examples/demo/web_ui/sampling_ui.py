@@ -255,6 +255,7 @@ class ToyEnvInt(object):
 
         for body_id in range(self.num_body_ids, p.getNumBodies()):
             p.removeBody(body_id)
+            self.task.simulator.activation_tracker.untrack_body(body_id)
 
         restoreState(self.state_id)
 
@@ -5,7 +5,7 @@ and adapted by iGibson team.
 from scipy.spatial.kdtree import KDTree
 from heapq import heappush, heappop
 from collections import namedtuple
-from igibson.external.motion.motion_planners.utils import INF, elapsed_time
+from igibson.external.motion.motion_planners.utils import INF, any_collision, elapsed_time
 from igibson.external.motion.motion_planners.rrt_connect import direct_path
 from igibson.external.motion.motion_planners.smoothing import smooth_path
 
@@ -84,7 +84,7 @@ def check_path(path, colliding_vertices, colliding_edges, samples, extend_fn, co
         if (v1, v2) not in colliding_edges:
             segment = list(extend_fn(samples[v1], samples[v2]))
             random.shuffle(segment)
-            colliding_edges[v1, v2] = any(map(collision_fn, segment))
+            colliding_edges[v1, v2] = any_collision(collision_fn, segment)
             colliding_edges[v2, v1] = colliding_edges[v1, v2]
         if colliding_edges[v1, v2]:
             return False
@@ -0,0 +1,182 @@
+"""
+Nearest neighbor indices over the configurations of the planner trees and roadmaps.
+
+Distance functions that are weighted Euclidean distances, where the differences along the circular dimensions wrap
+around, can declare it with the `weights` and `circular` attributes (see the distance functions of
+igibson.external.pybullet_tools.utils). Their configurations are indexed in a KD-tree, the other distance functions
+fall back to a linear scan.
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .utils import INF
+
+
+class LinearNearestNeighbors(object):
+    """
+    Scan of all the configurations with the distance function, for any distance function
+    """
+
+    def __init__(self, distance_fn):
+        self.distance_fn = distance_fn
+        self.configs = []
+        self.items = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, config, item):
+        """
+        :param config: configuration
+        :param item: object returned by the queries for the configuration, e.g. a tree node
+        """
+        self.configs.append(config)
+        self.items.append(item)
+
+    def nearest(self, config):
+        """
+        :param config: query configuration
+        :return: item of the closest configuration, the first added one in case of ties
+        """
+        distances = [self.distance_fn(other, config) for other in self.configs]
+        return self.items[distances.index(min(distances))]
+
+    def k_nearest(self, config, k):
+        """
+        :param config: query configuration
+        :param k: number of neighbors
+        :return: list of the (distance, item) of the k closest configurations, from closest to farthest
+        """
+        distances = [self.distance_fn(other, config) for other in self.configs]
+        return [(distances[i], self.items[i]) for i in np.argsort(distances, kind="stable")[:k]]
+
+    def within(self, config, radius):
+        """
+        :param config: query configuration
+        :param radius: maximum distance
+        :return: list of the (distance, item) of the configurations within the radius, from closest to farthest
+        """
+        distances = [self.distance_fn(other, config) for other in self.configs]
+        return [(distances[i], self.items[i]) for i in np.argsort(distances, kind="stable") if distances[i] <= radius]
+
+
+class KDTreeNearestNeighbors(object):
+    """
+    KD-tree over the configurations for a weighted Euclidean distance, with periodic boundaries along the circular
+    dimensions. The tree is rebuilt from scratch once enough configurations have been added since the last build, the
+    configurations added in between are scanned with numpy.
+    """
+
+    def __init__(self, weights, circular=None, rebuild_ratio=0.25, min_rebuild_size=64):
+        """
+        :param weights: weight of each dimension in the squared distance
+        :param circular: whether each dimension is an angle whose differences wrap around [-pi, pi)
+        :param rebuild_ratio: the tree is rebuilt once the configurations added since the last build exceed this
+            fraction of the configurations in the tree
+        :param min_rebuild_size: the tree is never rebuilt for fewer added configurations than this
+        """
+        self.scales = np.sqrt(np.asarray(weights, dtype=float))
+        self.circular = np.zeros(len(self.scales), dtype=bool) if circular is None else np.asarray(circular, dtype=bool)
+        # Circular dimensions are periodic in the scaled space, cKDTree treats the dimensions of size 0 as not periodic
+        self.periods = np.where(self.circular, 2 * np.pi * self.scales, 0.0)
+        self.periodic = self.periods > 0
+        self.rebuild_ratio = rebuild_ratio
+        self.min_rebuild_size = min_rebuild_size
+        self.points = np.zeros((min_rebuild_size, len(self.scales)))
+        self.items = []
+        self.tree = None
+        self.tree_size = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def embed(self, config):
+        """
+        :param config: configuration
+        :return: point of the configuration in the scaled space, angles are wrapped to [0, 2 * pi)
+        """
+        point = np.asarray(config, dtype=float) * self.scales
+        point[self.periodic] %= self.periods[self.periodic]
+        return point
+
+    def add(self, config, item):
+        """
+        :param config: configuration
+        :param item: object returned by the queries for the configuration, e.g. a tree node
+        """
+        if len(self.items) == len(self.points):
+            self.points = np.concatenate([self.points, np.zeros_like(self.points)])
+        self.points[len(self.items)] = self.embed(config)
+        self.items.append(item)
+        if len(self.items) - self.tree_size >= max(self.min_rebuild_size, self.rebuild_ratio * self.tree_size):
+            self.tree_size = len(self.items)
+            self.tree = cKDTree(self.points[: self.tree_size], boxsize=self.periods)
+
+    def get_distances(self, point, indices):
+        """
+        :param point: query point in the scaled space
+        :param indices: indices of the configurations
+        :return: distances from the configurations to the query point
+        """
+        differences = np.abs(self.points[indices] - point)
+        differences[:, self.periodic] = np.minimum(
+            differences[:, self.periodic], self.periods[self.periodic] - differences[:, self.periodic]
+        )
+        return np.sqrt(np.sum(differences * differences, axis=1))
+
+    def sort_neighbors(self, point, indices):
+        """
+        :param point: query point in the scaled space
+        :param indices: indices of the candidate configurations
+        :return: list of the (distance, index) of the candidates, from closest to farthest, then in insertion order
+        """
+        indices = np.asarray(indices, dtype=int)
+        distances = self.get_distances(point, indices)
+        order = np.lexsort((indices, distances))
+        return list(zip(distances[order].tolist(), indices[order].tolist()))
+
+    def nearest(self, config):
+        """
+        :param config: query configuration
+        :return: item of the closest configuration
+        """
+        return self.k_nearest(config, 1)[0][1]
+
+    def k_nearest(self, config, k):
+        """
+        :param config: query configuration
+        :param k: number of neighbors
+        :return: list of the (distance, item) of the k closest configurations, from closest to farthest
+        """
+        point = self.embed(config)
+        candidates = list(range(self.tree_size, len(self.items)))
+        if self.tree_size > 0:
+            _, indices = self.tree.query(point, k=min(k, self.tree_size))
+            candidates.extend(np.atleast_1d(indices).tolist())
+        return [(distance, self.items[i]) for distance, i in self.sort_neighbors(point, candidates)[:k]]
+
+    def within(self, config, radius):
+        """
+        :param config: query configuration
+        :param radius: maximum distance
+        :return: list of the (distance, item) of the configurations within the radius, from closest to farthest
+        """
+        if radius == INF:
+            return self.k_nearest(config, len(self.items))
+        point = self.embed(config)
+        candidates = list(range(self.tree_size, len(self.items)))
+        if self.tree_size > 0:
+            candidates.extend(self.tree.query_ball_point(point, radius))
+        return [(distance, self.items[i]) for distance, i in self.sort_neighbors(point, candidates) if distance <= radius]
+
+
+def get_nearest_neighbors(distance_fn):
+    """
+    :param distance_fn: distance function between configurations
+    :return: empty nearest neighbor index for the distance function: a KD-tree if the distance function declares its
+        weights, and optionally its circular dimensions, a linear scan otherwise
+    """
+    weights = getattr(distance_fn, "weights", None)
+    if weights is None:
+        return LinearNearestNeighbors(distance_fn)
+    return KDTreeNearestNeighbors(weights, circular=getattr(distance_fn, "circular", None))
@@ -2,11 +2,12 @@
 Developed by Caelen Garrett in pybullet-planning repository (https://github.com/caelan/pybullet-planning)
 and adapted by iGibson team.
 """
-from collections import namedtuple, Mapping
+from collections import namedtuple
+from collections.abc import Mapping
 from heapq import heappop, heappush
-import operator
 
-from .utils import INF, pairs, merge_dicts, flatten
+from .nearest_neighbors import get_nearest_neighbors
+from .utils import INF, any_collision, pairs, merge_dicts, flatten
 
 
 # TODO - Lazy-PRM, Visibility-PRM, PRM*
@@ -161,11 +162,13 @@ class Roadmap(Mapping, object):
 
 class PRM(Roadmap):
 
-    def __init__(self, distance, extend, collision, samples=[]):
+    def __init__(self, distance, extend, collision, samples=[], nearest_neighbors_fn=get_nearest_neighbors):
         super(PRM, self).__init__()
         self.distance = distance
         self.extend = extend
         self.collision = collision
+        # Nearest neighbor index over the vertices
+        self.nearest_neighbors = nearest_neighbors_fn(distance)
         self.grow(samples)
 
     def __call__(self, q1, q2):
@@ -200,45 +203,48 @@ class PRM(Roadmap):
 
 class DistancePRM(PRM):
 
-    def __init__(self, distance, extend, collision, samples=[], connect_distance=.5):
+    def __init__(self, distance, extend, collision, samples=[], connect_distance=.5, **kwargs):
         self.connect_distance = connect_distance
-        super(self.__class__, self).__init__(
-            distance, extend, collision, samples=samples)
+        super(DistancePRM, self).__init__(
+            distance, extend, collision, samples=samples, **kwargs)
 
     def grow(self, samples):
-        old_vertices, new_vertices = self.vertices.keys(), self.add(samples)
-        for i, v1 in enumerate(new_vertices):
-            for v2 in new_vertices[i + 1:] + old_vertices:
-                if self.distance(v1.q, v2.q) <= self.connect_distance:
-                    path = list(self.extend(v1.q, v2.q))[:-1]
-                    if not any(self.collision(q) for q in path):
-                        self.connect(v1, v2, path)
+        new_vertices = self.add(samples)
+        # Every new vertex is connected to the vertices indexed before it, so that every pair is tried once
+        for v1 in new_vertices:
+            for _, v2 in self.nearest_neighbors.within(v1.q, self.connect_distance):
+                path = list(self.extend(v1.q, v2.q))[:-1]
+                if not any_collision(self.collision, path):
+                    self.connect(v1, v2, path)
+            self.nearest_neighbors.add(v1.q, v1)
         return new_vertices
 
 
 class DegreePRM(PRM):
 
-    def __init__(self, distance, extend, collision, samples=[], target_degree=4, connect_distance=INF):
+    def __init__(self, distance, extend, collision, samples=[], target_degree=4, connect_distance=INF, **kwargs):
         self.target_degree = target_degree
         self.connect_distance = connect_distance
-        super(self.__class__, self).__init__(
-            distance, extend, collision, samples=samples)
+        super(DegreePRM, self).__init__(
+            distance, extend, collision, samples=samples, **kwargs)
 
     def grow(self, samples):
         # TODO: do sorted edges version
         new_vertices = self.add(samples)
+        for v in new_vertices:
+            self.nearest_neighbors.add(v.q, v)
         if self.target_degree == 0:
             return new_vertices
         for v1 in new_vertices:
             degree = 0
-            for _, v2 in sorted(filter(lambda (d, v2): v2 != v1 and d <= self.connect_distance,
-                                       map(lambda v: (self.distance(v1.q, v.q), v), self.vertices.values())),  # TODO - slow, use nearest neighbors
-                                key=operator.itemgetter(0)):
+            for _, v2 in self.nearest_neighbors.within(v1.q, self.connect_distance):
+                if v2 == v1:
+                    continue
                 if self.target_degree <= degree:
                     break
                 if v2 not in v1.edges:
                     path = list(self.extend(v1.q, v2.q))[:-1]
-                    if not any(self.collision(q) for q in path):
+                    if not any_collision(self.collision, path):
                         self.connect(v1, v2, path)
                         degree += 1
                 else:
@@ -246,6 +252,6 @@ class DegreePRM(PRM):
         return new_vertices
 
 
-def call_prm(start_conf, end_conf, distance_fn, sample_fn, extend_fn, collision_fn):
-    prm = DistancePRM(distance_fn, extend_fn, collision_fn)
-    return prm.call(start_conf, end_conf)
+def call_prm(start_conf, end_conf, distance_fn, sample_fn, extend_fn, collision_fn, **kwargs):
+    prm = DistancePRM(distance_fn, extend_fn, collision_fn, **kwargs)
+    return prm(start_conf, end_conf)
@@ -4,7 +4,8 @@ and adapted by iGibson team.
 """
 from random import random
 import numpy as np
-from .utils import irange, argmin, RRT_ITERATIONS
+from .nearest_neighbors import get_nearest_neighbors
+from .utils import irange, RRT_ITERATIONS
 
 
 class TreeNode(object):
@@ -48,24 +49,26 @@ def configs(nodes):
     return list(map(lambda n: n.config, nodes))
 
 
-def rrt(start, goal_sample, distance, sample, extend, collision, goal_test=lambda q: False, iterations=RRT_ITERATIONS, goal_probability=.2):
+def rrt(start, goal_sample, distance, sample, extend, collision, goal_test=lambda q: False, iterations=RRT_ITERATIONS, goal_probability=.2,
+        nearest_neighbors_fn=get_nearest_neighbors):
     #goal_test = lambda q: np.linalg.norm(q - goal_sample) < 0.5
     if collision(start):
         return None
     if not callable(goal_sample):
         g = goal_sample
         goal_sample = lambda: g
-    nodes = [TreeNode(start)]
+    nodes = nearest_neighbors_fn(distance)
+    nodes.add(start, TreeNode(start))
     for i in irange(iterations):
         goal = random() < goal_probability or i == 0
         s = goal_sample() if goal else sample()
 
-        last = argmin(lambda n: distance(n.config, s), nodes)
+        last = nodes.nearest(s)
         for q in extend(last.config, s):
             if collision(q):
                 break
             last = TreeNode(q, parent=last)
-            nodes.append(last)
+            nodes.add(q, last)
             if np.linalg.norm(np.array(last.config) - goal_sample()) < 0.5:#goal_test(last.config):
                 return configs(last.retrace())
         else:
@@ -4,18 +4,23 @@ and adapted by iGibson team.
 """
 from .smoothing import smooth_path
 from .rrt import TreeNode, configs
-from .utils import irange, argmin, RRT_ITERATIONS, RRT_RESTARTS, RRT_SMOOTHING
+from .nearest_neighbors import get_nearest_neighbors
+from .utils import irange, any_collision, RRT_ITERATIONS, RRT_RESTARTS, RRT_SMOOTHING
 
 def asymmetric_extend(q1, q2, extend_fn, backward=False):
     if backward:
         return reversed(list(extend_fn(q2, q1)))
     return extend_fn(q1, q2)
 
-def rrt_connect(q1, q2, distance_fn, sample_fn, extend_fn, collision_fn, iterations=RRT_ITERATIONS):
+def rrt_connect(q1, q2, distance_fn, sample_fn, extend_fn, collision_fn, iterations=RRT_ITERATIONS,
+                nearest_neighbors_fn=get_nearest_neighbors):
     # TODO: collision(q1, q2)
     if collision_fn(q1) or collision_fn(q2):
         return None
-    nodes1, nodes2 = [TreeNode(q1)], [TreeNode(q2)]
+    # Nearest neighbor indices over the nodes of the two trees
+    nodes1, nodes2 = nearest_neighbors_fn(distance_fn), nearest_neighbors_fn(distance_fn)
+    nodes1.add(q1, TreeNode(q1))
+    nodes2.add(q2, TreeNode(q2))
     for iteration in irange(iterations):
         swap = len(nodes1) > len(nodes2)
         tree1, tree2 = nodes1, nodes2
@@ -23,19 +28,19 @@ def rrt_connect(q1, q2, distance_fn, sample_fn, extend_fn, collision_fn, iterati
             tree1, tree2 = nodes2, nodes1
         s = sample_fn()
 
-        last1 = argmin(lambda n: distance_fn(n.config, s), tree1)
+        last1 = tree1.nearest(s)
         for q in asymmetric_extend(last1.config, s, extend_fn, swap):
             if collision_fn(q):
                 break
             last1 = TreeNode(q, parent=last1)
-            tree1.append(last1)
+            tree1.add(q, last1)
 
-        last2 = argmin(lambda n: distance_fn(n.config, last1.config), tree2)
+        last2 = tree2.nearest(last1.config)
         for q in asymmetric_extend(last2.config, last1.config, extend_fn, not swap):
             if collision_fn(q):
                 break
             last2 = TreeNode(q, parent=last2)
-            tree2.append(last2)
+            tree2.add(q, last2)
         else:
             path1, path2 = last1.retrace(), last2.retrace()
             if swap:
@@ -49,16 +54,15 @@ def rrt_connect(q1, q2, distance_fn, sample_fn, extend_fn, collision_fn, iterati
 def direct_path(q1, q2, extend_fn, collision_fn):
     if collision_fn(q1) or collision_fn(q2):
         return None
-    path = [q1]
-    for q in extend_fn(q1, q2):
-        if collision_fn(q):
-            return None
-        path.append(q)
+    path = [q1] + list(extend_fn(q1, q2))
+    if any_collision(collision_fn, path[1:]):
+        return None
     return path
 
 
 def birrt(q1, q2, distance, sample, extend, collision,
-          restarts=RRT_RESTARTS, iterations=RRT_ITERATIONS, smooth=RRT_SMOOTHING):
+          restarts=RRT_RESTARTS, iterations=RRT_ITERATIONS, smooth=RRT_SMOOTHING,
+          nearest_neighbors_fn=get_nearest_neighbors):
     if collision(q1) or collision(q2):
         return None
     path = direct_path(q1, q2, extend, collision)
@@ -66,7 +70,7 @@ def birrt(q1, q2, distance, sample, extend, collision,
         return path
     for attempt in irange(restarts + 1):
         path = rrt_connect(q1, q2, distance, sample, extend,
-                           collision, iterations=iterations)
+                           collision, iterations=iterations, nearest_neighbors_fn=nearest_neighbors_fn)
         if path is not None:
             #print('{} attempts'.format(attempt))
             if smooth is None:
@@ -4,8 +4,8 @@ and adapted by iGibson team.
 """
 from random import random
 from time import time
-import numpy as np
-from .utils import INF, argmin
+from .nearest_neighbors import get_nearest_neighbors
+from .utils import INF
 
 
 class OptimalNode(object):
@@ -81,10 +81,12 @@ def safe_path(sequence, collision):
     return path
 
 
-def rrt_star(start, goal, distance, sample, extend, collision, radius=0.5, max_time=INF, max_iterations=INF, goal_probability=.2, informed=True):
+def rrt_star(start, goal, distance, sample, extend, collision, radius=0.5, max_time=INF, max_iterations=INF, goal_probability=.2, informed=True,
+             nearest_neighbors_fn=get_nearest_neighbors):
     if collision(start) or collision(goal):
         return None
-    nodes = [OptimalNode(start)]
+    nodes = nearest_neighbors_fn(distance)
+    nodes.add(start, OptimalNode(start))
     goal_n = None
     t0 = time()
     it = 0
@@ -99,7 +101,7 @@ def rrt_star(start, goal, distance, sample, extend, collision, radius=0.5, max_t
         it += 1
         print(it, len(nodes))
 
-        nearest = argmin(lambda n: distance(n.config, s), nodes)
+        nearest = nodes.nearest(s)
         path = safe_path(extend(nearest.config, s), collision)
         if len(path) == 0:
             continue
@@ -115,12 +117,10 @@ def rrt_star(start, goal, distance, sample, extend, collision, radius=0.5, max_t
         #    n.config, new.config) < radius, nodes)
         # print('num neighbors', len(list(neighbors)))
         k = 10
-        k = np.min([k, len(nodes)])
-        dists = [distance(n.config, new.config) for n in nodes]
-        neighbors = [nodes[i] for i in np.argsort(dists)[:k]]
+        neighbors = [n for _, n in nodes.k_nearest(new.config, k)]
         #print(neighbors)
 
-        nodes.append(new)
+        nodes.add(new.config, new)
 
         for n in neighbors:
             d = distance(n.config, new.config)
@@ -5,6 +5,8 @@ and adapted by iGibson team.
 from random import randint
 import numpy as np
 
+from .utils import any_collision
+
 
 def smooth_path(path, extend, collision, iterations=50):
     smoothed_path = path
@@ -18,7 +20,7 @@ def smooth_path(path, extend, collision, iterations=50):
         if j < i:
             i, j = j, i
         shortcut = list(extend(smoothed_path[i], smoothed_path[j]))
-        if (len(shortcut) < (j - i)) and all(not collision(q) for q in shortcut):
+        if (len(shortcut) < (j - i)) and not any_collision(collision, shortcut):
             smoothed_path = smoothed_path[:i + 1] + \
                 shortcut + smoothed_path[j + 1:]
     return smoothed_path
@@ -44,7 +46,7 @@ def optimize_path(path, extend, collision, iterations=50):
         shortcut = list(extend(smoothed_path[i], smoothed_path[j]))
         # print('short cut cost', cost_fn(shortcut),
         #       'original cost:', cost_fn(smoothed_path[i:j]))
-        if (cost_fn(shortcut) < cost_fn(smoothed_path[i:j])) and all(not collision(q) for q in shortcut):
+        if (cost_fn(shortcut) < cost_fn(smoothed_path[i:j])) and not any_collision(collision, shortcut):
             smoothed_path = smoothed_path[:i + 1] + \
                 shortcut + smoothed_path[j + 1:]
             # smoothed_paths.append(np.copy(smoothed_path))
@@ -2,6 +2,7 @@
 Developed by Caelen Garrett in pybullet-planning repository (https://github.com/caelan/pybullet-planning)
 and adapted by iGibson team.
 """
+from collections import deque
 from random import shuffle
 from itertools import islice
 import time
@@ -32,6 +33,27 @@ def pairs(lst):
     return zip(lst[:-1], lst[1:])
 
 
+def bisect_order(sequence):
+    # Coarse to fine order: the middle element, then the middles of the two halves, and so on
+    sequence = list(sequence)
+    order = []
+    intervals = deque([(0, len(sequence))])
+    while intervals:
+        start, stop = intervals.popleft()
+        if start < stop:
+            middle = (start + stop) // 2
+            order.append(sequence[middle])
+            intervals.extend([(start, middle), (middle + 1, stop)])
+    return order
+
+
+def any_collision(collision_fn, sequence):
+    # Collision checkers can check a whole segment at once, e.g. in a coarse to fine order
+    if hasattr(collision_fn, 'check_segment'):
+        return collision_fn.check_segment(sequence)
+    return any(collision_fn(q) for q in sequence)
+
+
 def merge_dicts(*args):
     result = {}
     for d in args:
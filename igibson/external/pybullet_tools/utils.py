@@ -26,6 +26,7 @@ from igibson.external.motion.motion_planners.rrt_star import rrt_star
 from igibson.external.motion.motion_planners.lazy_prm import lazy_prm_replan_loop
 from igibson.external.motion.motion_planners.rrt import rrt
 from igibson.external.motion.motion_planners.smoothing import optimize_path
+from igibson.external.motion.motion_planners.utils import any_collision, bisect_order
 from igibson.utils.constants import OccupancyGridState
 #from ..motion.motion_planners.rrt_connect import birrt, direct_path
 import cv2
@@ -2802,6 +2803,9 @@ def get_distance_fn(body, joints, weights=None):  # , norm=2):
         diff = np.array(difference_fn(q2, q1))
         return np.sqrt(np.dot(weights, diff * diff))
         # return np.linalg.norm(np.multiply(weights * diff), ord=norm)
+    # Metric of the distance, for the nearest neighbor indices of the planners
+    fn.weights = weights
+    fn.circular = [is_circular(body, joint) for joint in joints]
     return fn
 
 
@@ -2926,45 +2930,175 @@ def get_self_link_pairs(body, joints, disabled_collisions=set(), only_moving=Tru
     return check_link_pairs
 
 
-def get_collision_fn(body, joints, obstacles, attachments, self_collisions, disabled_collisions,
-                     custom_limits={}, allow_collision_links=[], **kwargs):
-    # TODO: convert most of these to keyword arguments
-    check_link_pairs = get_self_link_pairs(body, joints, disabled_collisions) \
-        if self_collisions else []
-    moving_links = frozenset(
-        [item for item in get_moving_links(body, joints) if not item in allow_collision_links])
-    # TODO: This is a fetch specific change
-    attached_bodies = [attachment.child for attachment in attachments]
-    moving_bodies = [(body, moving_links)] + attached_bodies
-    #moving_bodies = [body] + [attachment.child for attachment in attachments]
-    # + list(combinations(moving_bodies, 2))
-    check_body_pairs = list(product(moving_bodies, obstacles))
+SELF_LINK_PAIRS_CACHE = {}
+
+
+def get_cached_self_link_pairs(body, joints, disabled_collisions=set()):
+    # The link pairs only depend on the kinematic tree, the body id is reused by pybullet once the body is removed
+    key = (CLIENT, body, get_body_name(body), get_num_joints(body), tuple(joints), frozenset(disabled_collisions))
+    if key not in SELF_LINK_PAIRS_CACHE:
+        SELF_LINK_PAIRS_CACHE[key] = get_self_link_pairs(body, joints, disabled_collisions)
+    return list(SELF_LINK_PAIRS_CACHE[key])
+
+
+def get_swept_aabb(body, joints, attachments=[], custom_limits={}):
+    """
+    Get a conservative AABB of the volume swept by the links moved by the joints, and by the attached bodies, over all
+    the joint positions, with the rest of the body still. A rotation about a joint axis preserves the distances to
+    the link origin, so every moving subtree stays within a ball around the origin of its link, whose radius is
+    bounded recursively from the current link AABBs. The prismatic joints extend the ball by their range of motion.
+
+    :param body: body id
+    :param joints: moving joints
+    :param attachments: attachments of other bodies to the links of the body
+    :param custom_limits: dictionary of the custom (lower, upper) limits of the joints
+    :return: swept AABB
+    """
     lower_limits, upper_limits = get_custom_limits(body, joints, custom_limits)
+    travels = {}
+    for joint, lower, upper in zip(joints, lower_limits, upper_limits):
+        if get_joint_type(body, joint) not in [p.JOINT_REVOLUTE, p.JOINT_SPHERICAL, p.JOINT_FIXED]:
+            travels[child_link_from_joint(joint)] = upper - lower
+    attached = defaultdict(list)
+    for attachment in attachments:
+        if attachment.parent == body:
+            attached[attachment.parent_link].append(attachment.child)
+    children = get_all_link_children(body)
 
-    # TODO: maybe prune the link adjacent to the robot
-    # TODO: test self collision with the holding
-    def collision_fn(q):
-        if not all_between(lower_limits, q, upper_limits):
-            pass
-            # print(lower_limits, q, upper_limits)
-            # print('Joint limits violated')
-            # return True
-        set_joint_positions(body, joints, q)
-        for attachment in attachments:
+    def get_reach(link):
+        # Distance from the link origin to the farthest point of its subtree, over all the joint positions
+        origin = np.array(get_link_pose(body, link)[0])
+        reach = 0.
+        for lower, upper in [get_aabb(body, link)] + [get_aabb(child) for child in attached[link]]:
+            reach = max(reach, np.linalg.norm(np.maximum(np.abs(np.array(lower) - origin),
+                                                         np.abs(np.array(upper) - origin))))
+        for child in children.get(link, []):
+            offset = np.linalg.norm(np.array(get_link_pose(body, child)[0]) - origin)
+            reach = max(reach, offset + get_reach(child) + travels.get(child, 0.))
+        return reach
+
+    moving_links = set(get_moving_links(body, joints))
+    aabbs = []
+    for joint in joints:
+        link = child_link_from_joint(joint)
+        if get_link_parent(body, link) not in moving_links:
+            origin = np.array(get_link_pose(body, link)[0])
+            radius = get_reach(link) + travels.get(link, 0.)
+            aabbs.append(AABB(origin - radius, origin + radius))
+    for attachment in attachments:
+        if (attachment.parent != body) or (attachment.parent_link not in moving_links):
+            aabbs.append(get_aabb(attachment.child))
+    return aabb_union(aabbs)
+
+
+def closest_points_collision(body1, body2, link1=None, link2=None, max_distance=MAX_DISTANCE):
+    # A link of None checks all the links of the body in the same query
+    link_indices = {}
+    if link1 is not None:
+        link_indices['linkIndexA'] = link1
+    if link2 is not None:
+        link_indices['linkIndexB'] = link2
+    return len(p.getClosestPoints(bodyA=body1, bodyB=body2, distance=max_distance,
+                                  physicsClientId=CLIENT, **link_indices)) != 0
+
+
+class CollisionChecker(object):
+    """
+    Collision checker of the positions of joints of a body, to pass as the collision_fn of the planners.
+    The obstacle links out of the swept AABB of the moving links are dropped once for the whole plan, the remaining
+    ones are only queried for the moving links whose current AABBs overlap them. The self-collision link pairs that
+    collided last are checked first, and segments of configurations are checked at once in a coarse to fine order.
+    """
+
+    def __init__(self, body, joints, obstacles, attachments, self_collisions, disabled_collisions,
+                 custom_limits={}, allow_collision_links=[], max_distance=MAX_DISTANCE, coarse_to_fine=True):
+        """
+        :param body: body id
+        :param joints: moving joints
+        :param obstacles: obstacle body ids, or (body id, links) tuples
+        :param attachments: attachments moving along with the links of the body
+        :param self_collisions: whether to check the collisions between the links of the body
+        :param disabled_collisions: link pairs not to check for self collisions
+        :param custom_limits: dictionary of the custom (lower, upper) limits of the joints
+        :param allow_collision_links: moving links allowed to collide with the obstacles
+        :param max_distance: distance under which a moving link and an obstacle collide
+        :param coarse_to_fine: whether to check the segments of configurations in a coarse to fine order
+        """
+        self.body = body
+        self.joints = joints
+        self.attachments = attachments
+        self.max_distance = max_distance
+        self.coarse_to_fine = coarse_to_fine
+        self.self_link_pairs = get_cached_self_link_pairs(body, joints, disabled_collisions) \
+            if self_collisions else []
+        self.moving_bodies = [(body, link) for link in get_moving_links(body, joints)
+                              if link not in allow_collision_links]
+        self.moving_bodies.extend((attachment.child, None) for attachment in attachments)
+
+        swept_lower, swept_upper = get_swept_aabb(body, joints, attachments, custom_limits=custom_limits)
+        swept_aabb = AABB(np.array(swept_lower) - max_distance, np.array(swept_upper) + max_distance)
+        self.obstacles = []
+        obstacle_aabbs = []
+        for obstacle in obstacles:
+            obstacle, links = expand_links(obstacle)
+            link_aabbs = [(link, get_aabb(obstacle, link)) for link in links]
+            link_aabbs = [(link, aabb) for link, aabb in link_aabbs if aabb_overlap(aabb, swept_aabb)]
+            if len(link_aabbs) == len(get_all_links(obstacle)):
+                # A single query for all the links
+                link_aabbs = [(None, aabb_union(aabb for _, aabb in link_aabbs))]
+            for link, aabb in link_aabbs:
+                self.obstacles.append((obstacle, link))
+                obstacle_aabbs.append(aabb)
+        obstacle_aabbs = np.reshape(obstacle_aabbs, (-1, 2, 3))
+        self.obstacle_lowers = obstacle_aabbs[:, 0] - max_distance
+        self.obstacle_uppers = obstacle_aabbs[:, 1] + max_distance
+
+    def get_obstacle_pairs(self):
+        """
+        :return: indices of the moving bodies and of the obstacles whose current AABBs overlap
+        """
+        if not self.obstacles:
+            return []
+        moving_aabbs = np.array([get_aabb(body, link) for body, link in self.moving_bodies])
+        overlaps = np.all(moving_aabbs[:, None, 0] <= self.obstacle_uppers[None], axis=2) & \
+            np.all(self.obstacle_lowers[None] <= moving_aabbs[:, None, 1], axis=2)
+        return zip(*np.nonzero(overlaps))
+
+    def __call__(self, q):
+        """
+        :param q: joint positions
+        :return: whether the joint positions are in collision, the body is left at these positions
+        """
+        set_joint_positions(self.body, self.joints, q)
+        for attachment in self.attachments:
             attachment.assign()
-        for link1, link2 in check_link_pairs:
+        for i, (link1, link2) in enumerate(self.self_link_pairs):
             # Self-collisions should not have the max_distance parameter
-            # , **kwargs):
-            if pairwise_link_collision(body, link1, body, link2):
-                #print(get_body_name(body), get_link_name(body, link1), get_link_name(body, link2))
+            if pairwise_link_collision(self.body, link1, self.body, link2):
+                self.self_link_pairs.insert(0, self.self_link_pairs.pop(i))
                 return True
-        for body1, body2 in check_body_pairs:
-            if pairwise_collision(body1, body2, **kwargs):
-                # print('body collision', body1, body2)
-                #print(get_body_name(body1), get_body_name(body2))
+        for i, j in self.get_obstacle_pairs():
+            body1, link1 = self.moving_bodies[i]
+            body2, link2 = self.obstacles[j]
+            if closest_points_collision(body1, body2, link1, link2, max_distance=self.max_distance):
                 return True
         return False
-    return collision_fn
+
+    def check_segment(self, segment):
+        """
+        :param segment: sequence of joint positions
+        :return: whether any of the joint positions is in collision, stopping at the first collision
+        """
+        if self.coarse_to_fine:
+            segment = bisect_order(segment)
+        return any(self(q) for q in segment)
+
+
+def get_collision_fn(body, joints, obstacles, attachments, self_collisions, disabled_collisions,
+                     custom_limits={}, allow_collision_links=[], max_distance=MAX_DISTANCE, **kwargs):
+    return CollisionChecker(body, joints, obstacles, attachments, self_collisions, disabled_collisions,
+                            custom_limits=custom_limits, allow_collision_links=allow_collision_links,
+                            max_distance=max_distance, **kwargs)
 
 
 def plan_waypoints_joint_motion(body, joints, waypoints, start_conf=None, obstacles=[], attachments=[],
@@ -2985,10 +3119,10 @@ def plan_waypoints_joint_motion(body, joints, waypoints, start_conf=None, obstac
     path = [start_conf]
     for waypoint in waypoints:
         assert len(joints) == len(waypoint)
-        for q in extend_fn(path[-1], waypoint):
-            if collision_fn(q):
-                return None
-            path.append(q)
+        segment = list(extend_fn(path[-1], waypoint))
+        if any_collision(collision_fn, segment):
+            return None
+        path.extend(segment)
     return path
 
 
@@ -3153,6 +3287,9 @@ def get_base_distance_fn(weights=1*np.ones(3)):
     def fn(q1, q2):
         difference = np.array(difference_fn(q2, q1))
         return np.sqrt(np.dot(weights, difference * difference))
+    # Metric of the distance, for the nearest neighbor indices of the planners
+    fn.weights = weights
+    fn.circular = (False, False, True)
     return fn
 
 
@@ -3214,6 +3351,29 @@ def plan_base_motion(body, end_conf, base_limits, obstacles=[], direct=False,
                  sample_fn, extend_fn, collision_fn, **kwargs)
 
 
+def get_base_cspace_map(map_2d, robot_footprint_radius_in_map):
+    """
+    Compute the configuration space obstacle map of a circular robot base: a cell is in collision if the robot
+    footprint centered on it overlaps any cell of the occupancy grid that is not free space, or if the footprint does
+    not fit in the grid
+
+    :param map_2d: square occupancy grid
+    :param robot_footprint_radius_in_map: radius of the robot footprint, in cells
+    :return: boolean map of the cells in collision
+    """
+    radius = robot_footprint_radius_in_map
+    grid_resolution = map_2d.shape[0]
+    footprint = np.zeros((radius * 2 + 1, radius * 2 + 1), dtype=np.uint8)
+    cv2.circle(footprint, (radius, radius), radius, 1, -1)
+    obstacles = (map_2d != OccupancyGridState.FREESPACE).astype(np.uint8)
+    cspace_map = cv2.dilate(obstacles, footprint).astype(bool)
+    cspace_map[:radius, :] = True
+    cspace_map[:, :radius] = True
+    cspace_map[grid_resolution - radius:, :] = True
+    cspace_map[:, grid_resolution - radius:] = True
+    return cspace_map
+
+
 def plan_base_motion_2d(body, end_conf, base_limits, map_2d, occupancy_range, grid_resolution, robot_footprint_radius_in_map,
                         obstacles=[], weights=1 * np.ones(3), resolutions=0.05 * np.ones(3),
                         max_distance=MAX_DISTANCE, min_goal_dist = 0.02, algorithm='birrt', optimize_iter=0, 
@@ -3226,72 +3386,70 @@ def plan_base_motion_2d(body, end_conf, base_limits, map_2d, occupancy_range, gr
     difference_fn = get_base_difference_fn()
     distance_fn = get_base_distance_fn(weights=weights)
 
-    def extend_fn(q1, q2):
-        target_theta = np.arctan2(q2[1] - q1[1], q2[0] - q1[0])
-
-        n1 = int(np.abs(circular_difference(
-            target_theta, q1[2]) / resolutions[2])) + 1
-        n3 = int(np.abs(circular_difference(
-            q2[2], target_theta) / resolutions[2])) + 1
-        steps2 = np.abs(np.divide(difference_fn(q2, q1), resolutions))
-        n2 = int(np.max(steps2)) + 1
-
-        for i in range(n1):
-            q = (i / (n1)) * \
-                np.array(difference_fn(
-                    (q1[0], q1[1], target_theta), q1)) + np.array(q1)
-            q = tuple(q)
-            yield q
-
-        for i in range(n2):
-            q = (i / (n2)) * np.array(
-                difference_fn((q2[0], q2[1], target_theta), (q1[0], q1[1], target_theta))) + np.array(
-                (q1[0], q1[1], target_theta))
-            q = tuple(q)
-            yield q
-
-        for i in range(n3):
-            q = (i / (n3)) * np.array(difference_fn(q2, (q2[0], q2[1], target_theta))) + np.array(
-                (q2[0], q2[1], target_theta))
-            q = tuple(q)
-            yield q
-
     start_conf = get_base_values(body)
 
     if np.abs(start_conf[0] - end_conf[0]) < min_goal_dist and np.abs(start_conf[1] - end_conf[1]) < min_goal_dist:
         # do not do plans that is smaller than 30mm
         return None
 
+    # The occupancy grid is in the frame of the start configuration, and does not change during planning: the robot
+    # footprint is dilated into it once, so that checking a configuration is a single lookup
+    cspace_map = get_base_cspace_map(map_2d, robot_footprint_radius_in_map)
+    theta = start_conf[2]
+    x_dir = [float(np.sin(theta)), float(-np.cos(theta))]
+    y_dir = [float(np.cos(theta)), float(np.sin(theta))]
+
     def collision_fn(q):
         # TODO: update this function
         # set_base_values(body, q)
         # return any(pairwise_collision(body, obs, max_distance=max_distance) for obs in obstacles)
-        delta = np.array(q)[:2] - np.array(start_conf)[:2]
-        theta = start_conf[2]
-        x_dir = np.array([np.sin(theta), -np.cos(theta)])
-        y_dir = np.array([np.cos(theta), np.sin(theta)])
-        end_in_start_frame = [x_dir.dot(delta), y_dir.dot(delta)]
-        pts = np.array(end_in_start_frame) / (occupancy_range / 2) * \
-            (grid_resolution / 2) + grid_resolution / 2
+        collision = segment_collisions.get(tuple(q))
+        if collision is None:
+            delta = (q[0] - start_conf[0], q[1] - start_conf[1])
+            pts = [int((delta[0] * direction[0] + delta[1] * direction[1]) / (occupancy_range / 2) *
+                       (grid_resolution / 2) + grid_resolution / 2) for direction in (x_dir, y_dir)]
+            collision = not (0 <= pts[0] < grid_resolution and 0 <= pts[1] < grid_resolution) or \
+                bool(cspace_map[pts[0], pts[1]])
+        return collision
+
+    def batch_collision_fn(qs):
+        delta = np.asarray(qs)[:, :2] - np.array(start_conf)[:2]
+        pts = np.stack([(delta[:, 0] * direction[0] + delta[:, 1] * direction[1]) / (occupancy_range / 2) *
+                        (grid_resolution / 2) + grid_resolution / 2 for direction in (x_dir, y_dir)], axis=1)
         pts = pts.astype(np.int32)
-        # print(pts)
+        in_map = np.all((pts >= 0) & (pts < grid_resolution), axis=1)
+        collisions = np.ones(len(pts), dtype=bool)
+        collisions[in_map] = cspace_map[pts[in_map, 0], pts[in_map, 1]]
+        return collisions
 
-        if pts[0] < robot_footprint_radius_in_map or pts[1] < robot_footprint_radius_in_map \
-            or pts[0] > grid_resolution - robot_footprint_radius_in_map - 1 or pts[
-                1] > grid_resolution - robot_footprint_radius_in_map - 1:
-            return True
+    # Collisions of the configurations of the last segment generated by extend_fn, which are all checked at once
+    segment_collisions = {}
 
-        # plt.figure()
-        # plt.imshow(map_2d[pts[0]-1:pts[0]+1, pts[1]-1:pts[1]+1])
-        # plt.colorbar()
-        mask = np.zeros((robot_footprint_radius_in_map * 2 + 1,
-                         robot_footprint_radius_in_map * 2 + 1))
-        cv2.circle(mask, (robot_footprint_radius_in_map, robot_footprint_radius_in_map), robot_footprint_radius_in_map,
-                   1, -1)
-        mask = mask.astype(np.bool)
-        return not np.all(map_2d[pts[0] - robot_footprint_radius_in_map:pts[0] + robot_footprint_radius_in_map + 1,
-                             pts[1] - robot_footprint_radius_in_map:pts[1] + robot_footprint_radius_in_map + 1][mask]
-                      == OccupancyGridState.FREESPACE)
+    def extend_fn(q1, q2):
+        target_theta = np.arctan2(q2[1] - q1[1], q2[0] - q1[0])
+
+        n1 = int(np.abs(circular_difference(
+            target_theta, q1[2]) / resolutions[2])) + 1
+        n3 = int(np.abs(circular_difference(
+            q2[2], target_theta) / resolutions[2])) + 1
+        steps2 = np.abs(np.divide(difference_fn(q2, q1), resolutions))
+        n2 = int(np.max(steps2)) + 1
+
+        # Turn towards q2, move to it and turn to its orientation
+        segment = np.concatenate([
+            (np.arange(n1) / n1)[:, np.newaxis] * np.array(difference_fn(
+                (q1[0], q1[1], target_theta), q1)) + np.array(q1),
+            (np.arange(n2) / n2)[:, np.newaxis] * np.array(
+                difference_fn((q2[0], q2[1], target_theta), (q1[0], q1[1], target_theta))) + np.array(
+                (q1[0], q1[1], target_theta)),
+            (np.arange(n3) / n3)[:, np.newaxis] * np.array(difference_fn(q2, (q2[0], q2[1], target_theta))) + np.array(
+                (q2[0], q2[1], target_theta)),
+        ])
+        segment = [tuple(q) for q in segment]
+        segment_collisions.clear()
+        segment_collisions.update(zip(segment, batch_collision_fn(segment).tolist()))
+        for q in segment:
+            yield q
 
     if collision_fn(start_conf):
         # print("Warning: initial configuration is in collision")
@@ -1,10 +1,14 @@
 import numpy as np
 
 from igibson.external.pybullet_tools.utils import aabb_union, get_aabb, get_all_links
-from igibson.object_states.object_state_base import CachingEnabledObjectState
+from igibson.object_states.object_state_base import CachingEnabledObjectState, UpdateTrigger
 
 
 class AABB(CachingEnabledObjectState):
+    @staticmethod
+    def get_update_triggers():
+        return [UpdateTrigger.POSE]
+
     def _compute_value(self):
         body_id = self.obj.get_body_id()
         all_links = get_all_links(body_id)
@@ -63,64 +63,125 @@ def compute_adjacencies(obj, axes, max_distance):
         both its positive and negative direction.
     :return: List[AxisAdjacencyList] of length len(axes) containing the adjacencies.
     """
+    return compute_adjacencies_batch([(obj, axes, max_distance)])[0]
+
+
+def compute_adjacencies_batch(queries):
+    """
+    Batched version of compute_adjacencies: the rays of all the queries are cast
+    together, with a single ray test batch per iteration.
+
+    :param queries: List of (obj, axes, max_distance) tuples, see compute_adjacencies.
+    :return: List of the List[AxisAdjacencyList] adjacencies of each query.
+    """
+    if not queries:
+        return []
+
     # Get vectors for each of the axes' directions.
-    # The ordering is axes1+, axis1-, axis2+, axis2- etc.
-    directions = np.empty((len(axes) * 2, 3))
-    directions[0::2] = axes
-    directions[1::2] = -axes
+    # The ordering is axes1+, axis1-, axis2+, axis2- etc. for each query, one after the other.
+    directions, ray_starts, ray_endpoints, body_ids, query_slices = [], [], [], [], []
+    for obj, axes, max_distance in queries:
+        query_directions = np.empty((len(axes) * 2, 3))
+        query_directions[0::2] = axes
+        query_directions[1::2] = -axes
+
+        # Prepare this object's info for ray casting.
+        # Use AABB center instead of position because we cannot get valid position
+        # for fixed objects if fixed links are merged.
+        object_position, _ = obj.states[Pose].get_value()
+        start = len(directions)
+        directions.extend(query_directions)
+        ray_starts.append(np.tile(object_position, (len(query_directions), 1)))
+        ray_endpoints.append(ray_starts[-1] + query_directions * max_distance)
+        body_ids.append(np.full(len(query_directions), obj.get_body_id()))
+        query_slices.append(slice(start, len(directions)))
+    ray_starts = np.concatenate(ray_starts)
+    ray_endpoints = np.concatenate(ray_endpoints)
+    body_ids = np.concatenate(body_ids)
 
     # For now, we keep our result in the dimensionality of (direction, hit_object_order).
-    finalized = np.zeros(directions.shape[0], dtype=bool)
+    finalized = np.zeros(len(directions), dtype=bool)
     bodies_by_direction = [[] for _ in directions]
 
-    # Prepare this object's info for ray casting.
-    # Use AABB center instead of position because we cannot get valid position
-    # for fixed objects if fixed links are merged.
-    object_position, _ = obj.states[Pose].get_value()
-    body_id = obj.get_body_id()
-
     # Cast rays repeatedly until the max number of casting is reached
     for i in range(_MAX_ITERATIONS):
         # Find which directions still need ray casting
-        unfinished_directions = finalized != True
-        num_directions_to_cast = np.count_nonzero(unfinished_directions)
+        unfinished_directions = np.flatnonzero(~finalized)
 
         # If all directions are ready, stop.
-        if num_directions_to_cast == 0:
+        if len(unfinished_directions) == 0:
             break
 
-        # Prepare the rays to cast.
-        ray_directions = directions[unfinished_directions, :]
-        ray_starts = np.tile(object_position, (num_directions_to_cast, 1))
-        ray_endpoints = ray_starts + (ray_directions * max_distance)
-
-        # Cast time.
-        ray_results = p.rayTestBatch(
-            ray_starts,
-            ray_endpoints,
-            reportHitNumber=i,
-            fractionEpsilon=1,
-            numThreads=0,
-        )
+        # Cast time. pybullet silently returns no results for batches of MAX_RAY_INTERSECTION_BATCH_SIZE rays or more.
+        ray_results = []
+        batch_size = p.MAX_RAY_INTERSECTION_BATCH_SIZE - 1
+        for batch_start in range(0, len(unfinished_directions), batch_size):
+            batch = unfinished_directions[batch_start : batch_start + batch_size]
+            ray_results.extend(
+                p.rayTestBatch(
+                    ray_starts[batch],
+                    ray_endpoints[batch],
+                    reportHitNumber=i,
+                    fractionEpsilon=1,
+                    numThreads=0,
+                )
+            )
 
         # Get the object IDs per axis and filter out self-hit cases.
         obj_ids = np.array([result[0] for result in ray_results], dtype=int)
 
         # Add the results to the appropriate lists
-        for direction_idx, result in enumerate(obj_ids):
-            if result != -1 and result != body_id:
+        for direction_idx, result in zip(unfinished_directions, obj_ids):
+            if result != -1 and result != body_ids[direction_idx]:
                 bodies_by_direction[direction_idx].append(result)
 
         # Set the finalization status of no-hit directions
-        finalized[unfinished_directions][obj_ids == -1] = True
+        finalized[unfinished_directions[obj_ids == -1]] = True
 
     # Reshape so that these have the following indices:
-    # (axis_idx, direction-one-or-zero, hit_idx)
-    bodies_by_axis = [
-        AxisAdjacencyList(positive_neighbors, negative_neighbors)
-        for positive_neighbors, negative_neighbors in zip(bodies_by_direction[::2], bodies_by_direction[1::2])
+    # (query_idx, axis_idx, direction-one-or-zero, hit_idx)
+    return [
+        [
+            AxisAdjacencyList(positive_neighbors, negative_neighbors)
+            for positive_neighbors, negative_neighbors in zip(
+                bodies_by_direction[query_slice][::2], bodies_by_direction[query_slice][1::2]
+            )
+        ]
+        for query_slice in query_slices
     ]
-    return bodies_by_axis
+
+
+def update_adjacencies(objs, state_types=None):
+    """
+    Compute the stale VerticalAdjacency and HorizontalAdjacency values of a set of
+    objects together, casting the rays of all of them at once, and cache them in
+    the objects' states. Objects without these states are ignored.
+
+    :param objs: Iterable of the objects to update the adjacencies of.
+    :param state_types: Adjacency state types to update, both by default.
+    """
+    if state_types is None:
+        state_types = (VerticalAdjacency, HorizontalAdjacency)
+    update_adjacencies_per_object({obj: state_types for obj in objs})
+
+
+def update_adjacencies_per_object(state_types_by_obj):
+    """
+    Same as update_adjacencies, with the adjacency state types to update chosen per
+    object, e.g. only VerticalAdjacency for the objects that only need that one.
+
+    :param state_types_by_obj: Dict mapping the objects to the adjacency state types to update.
+    """
+    stale_states, queries = [], []
+    for obj, state_types in state_types_by_obj.items():
+        states = getattr(obj, "states", {})
+        for state_type in state_types:
+            if state_type in states and states[state_type].value is None:
+                stale_states.append(states[state_type])
+                queries.append(state_type.get_adjacency_query(obj))
+
+    for state, bodies_by_axis in zip(stale_states, compute_adjacencies_batch(queries)):
+        state.value = state.get_value_from_adjacencies(bodies_by_axis)
 
 
 class VerticalAdjacency(CachingEnabledObjectState):
@@ -128,13 +189,20 @@ class VerticalAdjacency(CachingEnabledObjectState):
     Value is a AxisAdjacencyList object.
     """
 
-    def _compute_value(self):
-        # Call the adjacency computation with th Z axis.
-        bodies_by_axis = compute_adjacencies(self.obj, np.array([[0, 0, 1]]), _MAX_DISTANCE_VERTICAL)
+    @staticmethod
+    def get_adjacency_query(obj):
+        # Query the adjacency computation with the Z axis.
+        return obj, np.array([[0, 0, 1]]), _MAX_DISTANCE_VERTICAL
 
+    @staticmethod
+    def get_value_from_adjacencies(bodies_by_axis):
         # Return the adjacencies from the only axis we passed in.
         return bodies_by_axis[0]
 
+    def _compute_value(self):
+        bodies_by_axis = compute_adjacencies(*self.get_adjacency_query(self.obj))
+        return self.get_value_from_adjacencies(bodies_by_axis)
+
     def _set_value(self, new_value):
         raise NotImplementedError("VerticalAdjacency state currently does not support setting.")
 
@@ -169,18 +237,25 @@ class HorizontalAdjacency(CachingEnabledObjectState):
     2 * _HORIZONTAL_AXIS_COUNT directions.
     """
 
-    def _compute_value(self):
+    @staticmethod
+    def get_adjacency_query(obj):
         coordinate_planes = get_equidistant_coordinate_planes(_HORIZONTAL_AXIS_COUNT)
 
         # Flatten the axis dimension and input into compute_adjacencies.
-        bodies_by_axis = compute_adjacencies(self.obj, coordinate_planes.reshape(-1, 3), _MAX_DISTANCE_HORIZONTAL)
+        return obj, coordinate_planes.reshape(-1, 3), _MAX_DISTANCE_HORIZONTAL
 
+    @staticmethod
+    def get_value_from_adjacencies(bodies_by_axis):
         # Now reshape the bodies_by_axis to group by coordinate planes.
         bodies_by_plane = list(zip(bodies_by_axis[::2], bodies_by_axis[1::2]))
 
         # Return the adjacencies.
         return bodies_by_plane
 
+    def _compute_value(self):
+        bodies_by_axis = compute_adjacencies(*self.get_adjacency_query(self.obj))
+        return self.get_value_from_adjacencies(bodies_by_axis)
+
     def _set_value(self, new_value):
         raise NotImplementedError("HorizontalAdjacency state currently does not support setting.")
 
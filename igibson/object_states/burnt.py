@@ -1,5 +1,5 @@
 from igibson.object_states.max_temperature import MaxTemperature
-from igibson.object_states.object_state_base import AbsoluteObjectState, BooleanState
+from igibson.object_states.object_state_base import AbsoluteObjectState, BooleanState, UpdateTrigger
 from igibson.object_states.texture_change_state_mixin import TextureChangeStateMixin
 from igibson.utils.utils import transform_texture
 
@@ -15,6 +15,10 @@ class Burnt(AbsoluteObjectState, BooleanState, TextureChangeStateMixin):
     def get_dependencies():
         return AbsoluteObjectState.get_dependencies() + [MaxTemperature]
 
+    @staticmethod
+    def get_update_triggers():
+        return [UpdateTrigger.DEPENDENCY]
+
     @staticmethod
     def create_transformed_texture(diffuse_tex_filename, diffuse_tex_filename_transformed):
         # 0.8 mixture with black
@@ -1,9 +1,11 @@
-from igibson.external.pybullet_tools.utils import aabb_contains_point, get_aabb
+import numpy as np
+
+from igibson.external.pybullet_tools.utils import get_aabb
 from igibson.object_states.aabb import AABB
 from igibson.object_states.contact_bodies import ContactBodies
 from igibson.object_states.dirty import Dusty, Stained
 from igibson.object_states.link_based_state_mixin import LinkBasedStateMixin
-from igibson.object_states.object_state_base import AbsoluteObjectState
+from igibson.object_states.object_state_base import AbsoluteObjectState, UpdateTrigger
 from igibson.object_states.soaked import Soaked
 from igibson.object_states.toggle import ToggledOn
 from igibson.objects.particles import Dust, Stain
@@ -59,10 +61,10 @@ class CleaningTool(AbsoluteObjectState, LinkBasedStateMixin):
                 aabb = self.obj.states[AABB].get_value()
 
             # Find particles in the AABB.
-            for particle in particle_system.get_active_particles():
-                pos = particle.get_position()
-                if aabb_contains_point(pos, aabb):
-                    particle_system.stash_particle(particle)
+            aabb_low, aabb_high = aabb
+            positions = particle_system.get_positions()
+            in_aabb = np.all((aabb_low <= positions) & (positions <= aabb_high), axis=1)
+            particle_system.stash_particles(in_aabb)
 
     def _set_value(self, new_value):
         raise ValueError("Cannot set valueless state CleaningTool.")
@@ -83,3 +85,7 @@ class CleaningTool(AbsoluteObjectState, LinkBasedStateMixin):
     @staticmethod
     def get_optional_dependencies():
         return AbsoluteObjectState.get_optional_dependencies() + [Dusty, Stained, Soaked, ToggledOn, ContactBodies]
+
+    @staticmethod
+    def get_update_triggers():
+        return [UpdateTrigger.CONTACT, UpdateTrigger.DEPENDENCY]
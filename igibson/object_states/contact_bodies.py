@@ -1,10 +1,14 @@
 import pybullet as p
 
 from igibson.external.pybullet_tools.utils import ContactResult
-from igibson.object_states.object_state_base import CachingEnabledObjectState
+from igibson.object_states.object_state_base import CachingEnabledObjectState, UpdateTrigger
 
 
 class ContactBodies(CachingEnabledObjectState):
+    @staticmethod
+    def get_update_triggers():
+        return [UpdateTrigger.POSE, UpdateTrigger.CONTACT]
+
     def _compute_value(self):
         body_id = self.obj.get_body_id()
         return [ContactResult(*item[:10]) for item in p.getContactPoints(bodyA=body_id)]
@@ -1,6 +1,6 @@
 import numpy as np
 
-from igibson.object_states.object_state_base import AbsoluteObjectState, BooleanState
+from igibson.object_states.object_state_base import AbsoluteObjectState, BooleanState, UpdateTrigger
 from igibson.object_states.temperature import Temperature
 from igibson.object_states.texture_change_state_mixin import TextureChangeStateMixin
 from igibson.utils.utils import transform_texture
@@ -22,6 +22,10 @@ class Frozen(AbsoluteObjectState, BooleanState, TextureChangeStateMixin):
     def get_dependencies():
         return AbsoluteObjectState.get_dependencies() + [Temperature]
 
+    @staticmethod
+    def get_update_triggers():
+        return [UpdateTrigger.DEPENDENCY]
+
     @staticmethod
     def create_transformed_texture(diffuse_tex_filename, diffuse_tex_filename_transformed):
         # 0.8 mixture with white
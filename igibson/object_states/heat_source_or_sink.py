@@ -7,7 +7,7 @@ import igibson
 from igibson.object_states.aabb import AABB
 from igibson.object_states.inside import Inside
 from igibson.object_states.link_based_state_mixin import LinkBasedStateMixin
-from igibson.object_states.object_state_base import AbsoluteObjectState
+from igibson.object_states.object_state_base import AbsoluteObjectState, UpdateTrigger
 from igibson.object_states.open import Open
 from igibson.object_states.toggle import ToggledOn
 
@@ -98,6 +98,10 @@ class HeatSourceOrSink(AbsoluteObjectState, LinkBasedStateMixin):
     def get_optional_dependencies():
         return AbsoluteObjectState.get_optional_dependencies() + [ToggledOn, Open]
 
+    @staticmethod
+    def get_update_triggers():
+        return [UpdateTrigger.POSE, UpdateTrigger.DEPENDENCY]
+
     @staticmethod
     def get_state_link_name():
         return _HEATING_ELEMENT_LINK_NAME
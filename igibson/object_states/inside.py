@@ -42,17 +42,26 @@ class Inside(PositionalValidationMemoizedObjectStateMixin, KinematicsMixin, Rela
 
         return sampling_success
 
-    def _get_value(self, other, use_ray_casting_method=False):
-        del use_ray_casting_method
+    def passes_precheck(self, other):
+        """
+        Cheap necessary condition for the object to be inside the other, checked before any ray casting.
 
-        # First check that the inner object's position is inside the outer's AABB.
+        :param other: The outer object.
+        :return: False if the object cannot be inside the other.
+        """
+        # Check that the inner object's position is inside the outer's AABB.
         # Since we usually check for a small set of outer objects, this is cheap.
         # Also note that this produces garbage values for fixed objects - but we are
         # assuming none of our inside-checking objects are fixed.
         inner_object_pos, _ = self.obj.states[Pose].get_value()
         outer_object_AABB = other.states[AABB].get_value()
+        return aabb_contains_point(inner_object_pos, outer_object_AABB)
 
-        if not aabb_contains_point(inner_object_pos, outer_object_AABB):
+    def _get_value(self, other, use_ray_casting_method=False):
+        del use_ray_casting_method
+
+        # First check that the inner object's position is inside the outer's AABB.
+        if not self.passes_precheck(other):
             return False
 
         # Our definition of inside: an object A is inside an object B if there
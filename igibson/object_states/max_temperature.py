@@ -1,4 +1,4 @@
-from igibson.object_states.object_state_base import AbsoluteObjectState
+from igibson.object_states.object_state_base import AbsoluteObjectState, UpdateTrigger
 from igibson.object_states.temperature import Temperature
 
 
@@ -11,6 +11,10 @@ class MaxTemperature(AbsoluteObjectState):
     def get_dependencies():
         return AbsoluteObjectState.get_dependencies() + [Temperature]
 
+    @staticmethod
+    def get_update_triggers():
+        return [UpdateTrigger.DEPENDENCY]
+
     def __init__(self, obj):
         super(MaxTemperature, self).__init__(obj)
 
@@ -1,20 +1,28 @@
 import itertools
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
 
-import numpy as np
 from six import with_metaclass
 
-from igibson.object_states.pose import Pose
-from igibson.utils.utils import l2_distance
+from igibson.physics.activation_tracker import get_pose_version
 
-POSITIONAL_VALIDATION_EPSILON = 1e-5
+# Maximum number of memoized values per state, the least recently used ones are evicted first
+MAX_MEMO_SIZE = 1000
+
+
+def get_pose_versions(obj):
+    """
+    :param obj: object
+    :return: tuple of the pose versions of the bodies of the object
+    """
+    return tuple(get_pose_version(body_id) for body_id in getattr(obj, "body_ids", None) or [obj.get_body_id()])
 
 
 class MemoizedObjectStateMixin(with_metaclass(ABCMeta, object)):
     def __init__(self, *args, **kwargs):
         super(MemoizedObjectStateMixin, self).__init__(*args, **kwargs)
-        self._memo = {}
-        self._validation_caches = {}
+        # Maps the memo keys to (validation cache, value) tuples, in least recently used order
+        self._memo = OrderedDict()
 
     @abstractmethod
     def get_validation_cache(self, *args, **kwargs):
@@ -30,35 +38,32 @@ class MemoizedObjectStateMixin(with_metaclass(ABCMeta, object)):
 
         # If we have a valid memoized result, return it directly.
         if key in self._memo:
-            if self.validate_validation_cache(self._validation_caches[key], *args, **kwargs):
-                return self._memo[key]
+            validation_cache, result = self._memo[key]
+            if self.validate_validation_cache(validation_cache, *args, **kwargs):
+                self._memo.move_to_end(key)
+                return result
 
         # Otherwise, recompute the result & memoize.
         validation_cache = self.get_validation_cache(*args, **kwargs)
         result = super(MemoizedObjectStateMixin, self).get_value(*args, **kwargs)
-        self._validation_caches[key] = validation_cache
-        self._memo[key] = result
+        self._memo[key] = (validation_cache, result)
+        self._memo.move_to_end(key)
+        if len(self._memo) > MAX_MEMO_SIZE:
+            self._memo.popitem(last=False)
 
         # Return the result.
         return result
 
 
 class PositionalValidationMemoizedObjectStateMixin(MemoizedObjectStateMixin):
+    """
+    Memoization validated by the pose versions of the objects, which change whenever the objects may have moved or
+    rotated, so that validating a memoized value is a comparison of integer tuples.
+    """
+
     def get_validation_cache(self, *args, **kwargs):
         # Assume that args contains objects for relative states (and is empty for others).
-        return tuple(obj.states[Pose].get_value()[0] for obj in itertools.chain((self.obj,), args))
+        return tuple(get_pose_versions(obj) for obj in itertools.chain((self.obj,), args))
 
     def validate_validation_cache(self, cache, *args, **kwargs):
-        # Assume that args contains objects for relative states (and is empty for others).
-        for obj, old_pos in zip(itertools.chain((self.obj,), args), cache):
-            new_pos, _ = obj.states[Pose].get_value()
-
-            # Don't do expensive vector work if the positions are already equal.
-            if np.all(np.asarray(new_pos) == np.asarray(old_pos)):
-                continue
-
-            dist = l2_distance(new_pos, old_pos)
-            if dist > POSITIONAL_VALIDATION_EPSILON:
-                return False
-
-        return True
+        return cache == self.get_validation_cache(*args, **kwargs)
@@ -15,7 +15,13 @@ class NextTo(PositionalValidationMemoizedObjectStateMixin, KinematicsMixin, Rela
     def _set_value(self, other, new_value):
         raise NotImplementedError()
 
-    def _get_value(self, other):
+    def passes_precheck(self, other):
+        """
+        Cheap necessary condition for the object to be next to the other, checked before any ray casting.
+
+        :param other: The other object.
+        :return: False if the AABBs of the objects are too far apart for them to be next to each other.
+        """
         objA_states = self.obj.states
         objB_states = other.states
 
@@ -37,8 +43,12 @@ class NextTo(PositionalValidationMemoizedObjectStateMixin, KinematicsMixin, Rela
         objB_dims = objB_upper - objB_lower
         avg_aabb_length = np.mean(objA_dims + objB_dims)
 
+        # The distance should not be longer than acceptable.
+        return distance <= avg_aabb_length * (1.0 / 6.0)
+
+    def _get_value(self, other):
         # If the distance is longer than acceptable, return False.
-        if distance > avg_aabb_length * (1.0 / 6.0):
+        if not self.passes_precheck(other):
             return False
 
         # Otherwise, check if the other object shows up in the adjacency list.
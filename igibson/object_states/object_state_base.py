@@ -1,8 +1,25 @@
 from abc import ABCMeta, abstractmethod
+from enum import IntEnum
 
 from future.utils import with_metaclass
 
 
+class UpdateTrigger(IntEnum):
+    """
+    Changes that can make the per-step update of a state produce a different result. The simulator's dirty-set
+    update mode only updates a state on the objects for which one of its triggers fired during the step.
+    """
+
+    # Update every step, e.g. states that integrate over time or depend on other objects and robots.
+    ALWAYS = 0
+    # One of the bodies of the object moved or changed its activation state.
+    POSE = 1
+    # The contacts of one of the bodies of the object may have changed.
+    CONTACT = 2
+    # The value of one of the (optional) dependencies of the state on the same object changed.
+    DEPENDENCY = 3
+
+
 class BaseObjectState(with_metaclass(ABCMeta, object)):
     """
     Base ObjectState class. Do NOT inherit from this class directly - use either AbsoluteObjectState or
@@ -33,6 +50,16 @@ class BaseObjectState(with_metaclass(ABCMeta, object)):
         """
         return []
 
+    @staticmethod
+    def get_update_triggers():
+        """
+        Get the changes that require this state to be updated in the simulator's dirty-set update mode. States whose
+        _update is a no-op are never updated in that mode, regardless of their triggers.
+
+        :return: List of UpdateTrigger values.
+        """
+        return [UpdateTrigger.ALWAYS]
+
     def __init__(self, obj):
         super(BaseObjectState, self).__init__()
         self.obj = obj
@@ -39,12 +39,21 @@ class OnTop(PositionalValidationMemoizedObjectStateMixin, RelativeObjectState, B
 
         return sampling_success
 
+    def passes_precheck(self, other):
+        """
+        Cheap necessary condition for the object to be on top of the other, checked before any ray casting.
+
+        :param other: The object below.
+        :return: False if the objects are not touching.
+        """
+        return self.obj.states[Touching].get_value(other)
+
     def _get_value(self, other, use_ray_casting_method=False):
         del use_ray_casting_method
 
         # Touching is the less costly of our conditions.
         # Check it first.
-        if not self.obj.states[Touching].get_value(other):
+        if not self.passes_precheck(other):
             return False
 
         # Then check vertical adjacency - it's the second least
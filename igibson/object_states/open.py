@@ -3,7 +3,8 @@ import random
 import pybullet as p
 
 from igibson.external.pybullet_tools import utils
-from igibson.object_states.object_state_base import BooleanState, CachingEnabledObjectState
+from igibson.object_states.object_state_base import BooleanState, CachingEnabledObjectState, UpdateTrigger
+from igibson.physics.activation_tracker import mark_body_awake
 
 # Joint position threshold before a joint is considered open.
 # Should be a number in the range [0, 1] which will be transformed
@@ -78,6 +79,10 @@ def _get_relevant_joints(obj):
 
 
 class Open(CachingEnabledObjectState, BooleanState):
+    @staticmethod
+    def get_update_triggers():
+        return [UpdateTrigger.POSE]
+
     def _compute_value(self):
         both_sides, relevant_joint_infos, joint_directions = _get_relevant_joints(self.obj)
         if not relevant_joint_infos:
@@ -161,6 +166,9 @@ class Open(CachingEnabledObjectState, BooleanState):
                 # Save sampled position.
                 utils.set_joint_position(self.obj.get_body_id(), joint_info.jointIndex, joint_pos)
 
+            # The joints were reset outside of physics stepping
+            mark_body_awake(self.obj.get_body_id())
+
             # If we succeeded, return now.
             if self._compute_value() == new_value:
                 return True
@@ -1,9 +1,13 @@
 import numpy as np
 
-from igibson.object_states.object_state_base import CachingEnabledObjectState
+from igibson.object_states.object_state_base import CachingEnabledObjectState, UpdateTrigger
 
 
 class Pose(CachingEnabledObjectState):
+    @staticmethod
+    def get_update_triggers():
+        return [UpdateTrigger.POSE]
+
     def _compute_value(self):
         pos = self.obj.get_position()
         orn = self.obj.get_orientation()
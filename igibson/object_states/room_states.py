@@ -1,11 +1,20 @@
 import numpy as np
 
-from igibson.object_states.object_state_base import AbsoluteObjectState, BooleanState, CachingEnabledObjectState
+from igibson.object_states.object_state_base import (
+    AbsoluteObjectState,
+    BooleanState,
+    CachingEnabledObjectState,
+    UpdateTrigger,
+)
 
 
 class InsideRoomTypes(CachingEnabledObjectState):
     """The value of this state is the list of rooms that the object currently is in."""
 
+    @staticmethod
+    def get_update_triggers():
+        return [UpdateTrigger.POSE]
+
     def _compute_value(self):
         if hasattr(self.obj, "main_body_is_fixed") and self.obj.main_body_is_fixed:
             # For fixed objects, we can use the in_rooms attribute.
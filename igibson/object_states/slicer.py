@@ -1,6 +1,6 @@
 from igibson.object_states import ContactBodies, Sliced
 from igibson.object_states.link_based_state_mixin import LinkBasedStateMixin
-from igibson.object_states.object_state_base import AbsoluteObjectState
+from igibson.object_states.object_state_base import AbsoluteObjectState, UpdateTrigger
 
 _SLICER_LINK_NAME = "slicer"
 
@@ -47,3 +47,7 @@ class Slicer(AbsoluteObjectState, LinkBasedStateMixin):
     @staticmethod
     def get_dependencies():
         return AbsoluteObjectState.get_dependencies() + [ContactBodies]
+
+    @staticmethod
+    def get_update_triggers():
+        return [UpdateTrigger.CONTACT]
@@ -1,5 +1,5 @@
 from igibson.object_states.contact_bodies import ContactBodies
-from igibson.object_states.object_state_base import AbsoluteObjectState, BooleanState
+from igibson.object_states.object_state_base import AbsoluteObjectState, BooleanState, UpdateTrigger
 from igibson.object_states.texture_change_state_mixin import TextureChangeStateMixin
 from igibson.object_states.water_source import WaterSource
 from igibson.utils.utils import transform_texture
@@ -39,6 +39,10 @@ class Soaked(AbsoluteObjectState, BooleanState, TextureChangeStateMixin):
     def get_optional_dependencies():
         return [WaterSource]
 
+    @staticmethod
+    def get_update_triggers():
+        return [UpdateTrigger.CONTACT]
+
     @staticmethod
     def create_transformed_texture(diffuse_tex_filename, diffuse_tex_filename_transformed):
         # 0.5 mixture with blue
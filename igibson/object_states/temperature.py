@@ -1,8 +1,13 @@
+import itertools
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from igibson.object_states.aabb import AABB
 from igibson.object_states.heat_source_or_sink import HeatSourceOrSink
 from igibson.object_states.inside import Inside
 from igibson.object_states.object_state_base import AbsoluteObjectState
 from igibson.object_states.pose import Pose
-from igibson.utils.utils import l2_distance
 
 # TODO: Consider sourcing default temperature from scene
 # Default ambient temperature.
@@ -34,44 +39,7 @@ class Temperature(AbsoluteObjectState):
         return True
 
     def _update(self):
-        # Start at the current temperature.
-        new_temperature = self.value
-
-        # Find all heat source objects.
-        affected_by_heat_source = False
-        for obj2 in self.simulator.scene.get_objects_with_state(HeatSourceOrSink):
-            # Obtain heat source position.
-            heat_source = obj2.states[HeatSourceOrSink]
-            heat_source_state, heat_source_position = heat_source.get_value()
-            if heat_source_state:
-                # The heat source is toggled on. If it has a position, we check distance.
-                # If not, we check whether we are inside it or not.
-                if heat_source_position is not None:
-                    # Load our Pose. Note that this is cached already by the state.
-                    # Also note that this produces garbage values for fixed objects - but we are
-                    # assuming none of our temperature-enabled objects are fixed.
-                    position, _ = self.obj.states[Pose].get_value()
-
-                    # Compute distance to heat source from our position.
-                    dist = l2_distance(heat_source_position, position)
-                    if dist > heat_source.distance_threshold:
-                        continue
-                else:
-                    if not self.obj.states[Inside].get_value(obj2):
-                        continue
-
-                new_temperature += (
-                    (heat_source.temperature - self.value) * heat_source.heating_rate * self.simulator.render_timestep
-                )
-                affected_by_heat_source = True
-
-        # Apply temperature decay if not affected by any heat source.
-        if not affected_by_heat_source:
-            new_temperature += (
-                (DEFAULT_TEMPERATURE - self.value) * TEMPERATURE_DECAY_SPEED * self.simulator.render_timestep
-            )
-
-        self.value = new_temperature
+        self.value = HeatSourceField.get(self.simulator).get_new_temperature(self)
 
     # For this state, we simply store its value.
     def _dump(self):
@@ -79,3 +47,123 @@ class Temperature(AbsoluteObjectState):
 
     def load(self, data):
         self.value = data
+
+
+class HeatSourceField(object):
+    """
+    The heat sources that are active during a simulator step, shared by all the Temperature states of the scene.
+
+    Heating elements are indexed with a KD-tree over their positions so that every temperature-enabled object only
+    looks at the elements within reach, while Inside-type sources are pre-filtered with their AABBs before running
+    the Inside check. The new temperatures of all the objects are then computed in a single vectorized pass.
+    """
+
+    @staticmethod
+    def get(simulator):
+        """
+        Get the heat source field of the current step, building it if needed. All heat sources are updated before any
+        Temperature state since HeatSourceOrSink is an optional dependency of Temperature.
+
+        :param simulator: Simulator the heat sources and temperature-enabled objects live in
+        :return: HeatSourceField of the current step
+        """
+        field = simulator.heat_source_field
+        if field is None or field.frame_count != simulator.frame_count:
+            field = HeatSourceField(simulator)
+            simulator.heat_source_field = field
+        return field
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.frame_count = simulator.frame_count
+
+        positions = []
+        distance_thresholds = []
+        temperatures = []
+        heating_rates = []
+        self.inside_sources = []
+        for obj in simulator.scene.get_objects_with_state(HeatSourceOrSink):
+            heat_source = obj.states[HeatSourceOrSink]
+            heat_source_state, heat_source_position = heat_source.get_value()
+            if not heat_source_state:
+                continue
+            if heat_source_position is not None:
+                positions.append(heat_source_position)
+                distance_thresholds.append(heat_source.distance_threshold)
+                temperatures.append(heat_source.temperature)
+                heating_rates.append(heat_source.heating_rate)
+            else:
+                self.inside_sources.append((obj, heat_source))
+
+        self.positions = np.array(positions, dtype=float).reshape(-1, 3)
+        self.distance_thresholds = np.array(distance_thresholds, dtype=float)
+        self.temperatures = np.array(temperatures, dtype=float)
+        self.heating_rates = np.array(heating_rates, dtype=float)
+        self.tree = cKDTree(self.positions) if len(positions) > 0 else None
+
+        # (temperature the update started from, new temperature) of every Temperature state, computed on first use
+        self.new_temperatures = None
+
+    def compute_temperatures(self, states):
+        """
+        Compute the temperatures of a list of Temperature states after one step of heating or decay.
+
+        :param states: list of Temperature states
+        :return: np.array of new temperatures, in the order of states
+        """
+        values = np.array([state.value for state in states], dtype=float)
+        heating = np.zeros(len(states))
+        affected = np.zeros(len(states), dtype=bool)
+
+        if len(states) > 0 and (self.tree is not None or self.inside_sources):
+            # Note that this produces garbage values for fixed objects - but we are assuming none of our
+            # temperature-enabled objects are fixed.
+            positions = np.array([state.obj.states[Pose].get_value()[0] for state in states], dtype=float)
+
+            if self.tree is not None:
+                # Gather the candidate (object, heating element) pairs within the largest threshold, then apply the
+                # threshold of each heating element.
+                neighbors = self.tree.query_ball_point(positions, np.max(self.distance_thresholds))
+                rows = np.repeat(np.arange(len(states)), [len(idx) for idx in neighbors])
+                cols = np.fromiter(itertools.chain.from_iterable(neighbors), dtype=int, count=len(rows))
+                dists = np.linalg.norm(positions[rows] - self.positions[cols], axis=1)
+                in_range = dists <= self.distance_thresholds[cols]
+                rows, cols = rows[in_range], cols[in_range]
+                np.add.at(heating, rows, (self.temperatures[cols] - values[rows]) * self.heating_rates[cols])
+                affected[rows] = True
+
+            for obj, heat_source in self.inside_sources:
+                # Inside requires the position of the object to be in the AABB of the heat source, which is cheap to
+                # check for all objects at once.
+                aabb_low, aabb_high = obj.states[AABB].get_value()
+                candidates = np.flatnonzero(np.all((positions >= aabb_low) & (positions <= aabb_high), axis=1))
+                for i in candidates:
+                    if states[i].obj.states[Inside].get_value(obj):
+                        heating[i] += (heat_source.temperature - values[i]) * heat_source.heating_rate
+                        affected[i] = True
+
+        # Apply temperature decay if not affected by any heat source.
+        decay = (DEFAULT_TEMPERATURE - values) * TEMPERATURE_DECAY_SPEED
+        return values + np.where(affected, heating, decay) * self.simulator.render_timestep
+
+    def get_new_temperature(self, state):
+        """
+        Get the temperature of a Temperature state after the current step.
+
+        :param state: Temperature state
+        :return: new temperature
+        """
+        if self.new_temperatures is None:
+            states = [
+                obj.states[Temperature]
+                for obj in self.simulator.scene.get_objects_with_state(Temperature)
+                if isinstance(obj.states[Temperature], Temperature)
+            ]
+            values = [state.value for state in states]
+            self.new_temperatures = dict(zip(states, zip(values, self.compute_temperatures(states))))
+
+        # Objects that are not part of the batch (e.g. inside an object multiplexer) or whose temperature was set
+        # since the batch was computed are handled on their own.
+        if state in self.new_temperatures and self.new_temperatures[state][0] == state.value:
+            return float(self.new_temperatures[state][1])
+        return float(self.compute_temperatures([state])[0])
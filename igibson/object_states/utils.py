@@ -18,6 +18,7 @@ from igibson.external.pybullet_tools.utils import (
 )
 from igibson.object_states.aabb import AABB
 from igibson.object_states.object_state_base import CachingEnabledObjectState
+from igibson.physics.activation_tracker import bump_pose_version
 from igibson.utils import sampling_utils, utils
 from igibson.utils.utils import restoreState
 
@@ -52,6 +53,10 @@ def clear_cached_states(obj):
         if isinstance(obj_state, CachingEnabledObjectState):
             obj_state.clear_cached_value()
 
+    # The object may have moved, so the memoized states that involve it are no longer valid either
+    for body_id in getattr(obj, "body_ids", None) or [obj.get_body_id()]:
+        bump_pose_version(body_id)
+
 
 def detect_collision(bodyA):
     collision = False
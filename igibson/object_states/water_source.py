@@ -2,7 +2,7 @@ import numpy as np
 
 from igibson.object_states.contact_bodies import ContactBodies
 from igibson.object_states.link_based_state_mixin import LinkBasedStateMixin
-from igibson.object_states.object_state_base import AbsoluteObjectState
+from igibson.object_states.object_state_base import AbsoluteObjectState, UpdateTrigger
 from igibson.object_states.toggle import ToggledOn
 from igibson.objects.particles import WaterStream
 
@@ -87,3 +87,7 @@ class WaterSource(AbsoluteObjectState, LinkBasedStateMixin):
     @staticmethod
     def get_dependencies():
         return [ContactBodies]
+
+    @staticmethod
+    def get_update_triggers():
+        return [UpdateTrigger.POSE, UpdateTrigger.CONTACT, UpdateTrigger.DEPENDENCY]
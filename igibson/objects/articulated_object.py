@@ -33,6 +33,7 @@ from igibson.object_states.texture_change_state_mixin import TextureChangeStateM
 from igibson.object_states.utils import clear_cached_states
 from igibson.objects.object_base import NonRobotObject, SingleBodyObject
 from igibson.objects.stateful_object import StatefulObject
+from igibson.physics.activation_tracker import mark_body_awake
 from igibson.render.mesh_renderer.materials import ProceduralMaterial, RandomizedMaterial
 from igibson.utils import utils
 from igibson.utils.urdf_utils import add_fixed_link, get_base_link_name, round_up, save_urdfs_without_floating_joints
@@ -100,6 +101,7 @@ class ArticulatedObject(StatefulObject, SingleBodyObject):
         for joint_id in range(p.getNumJoints(self.get_body_id())):
             p.changeDynamics(self.get_body_id(), joint_id, activationState=p.ACTIVATION_STATE_WAKE_UP)
         p.changeDynamics(self.get_body_id(), -1, activationState=p.ACTIVATION_STATE_WAKE_UP)
+        mark_body_awake(self.get_body_id())
 
 
 class RBOObject(ArticulatedObject):
@@ -974,6 +976,7 @@ class URDFObject(StatefulObject, NonRobotObject):
             for joint_id in range(p.getNumJoints(body_id)):
                 p.changeDynamics(body_id, joint_id, activationState=p.ACTIVATION_STATE_WAKE_UP)
             p.changeDynamics(body_id, -1, activationState=p.ACTIVATION_STATE_WAKE_UP)
+            mark_body_awake(body_id)
 
     def reset(self):
         """
@@ -4,6 +4,8 @@ import numpy as np
 import pybullet as p
 from future.utils import with_metaclass
 
+from igibson.physics.activation_tracker import mark_body_awake
+
 
 class BaseObject(with_metaclass(ABCMeta, object)):
     """This is simply an interface that all objects must implement that does not implement any features on its own."""
@@ -59,6 +61,7 @@ class BaseObject(with_metaclass(ABCMeta, object)):
     def set_position_orientation(self, pos, orn):
         """Set object position and orientation in the format of Tuple[Array[x, y, z], Array[x, y, z, w]]"""
         p.resetBasePositionAndOrientation(self.get_body_id(), pos, orn)
+        mark_body_awake(self.get_body_id())
 
     def set_base_link_position_orientation(self, pos, orn):
         """Set object base link position and orientation in the format of Tuple[Array[x, y, z], Array[x, y, z, w]]"""
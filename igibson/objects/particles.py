@@ -1,5 +1,5 @@
 import os
-from collections import deque
+from collections import OrderedDict
 
 import numpy as np
 import pybullet as p
@@ -8,10 +8,13 @@ import igibson
 from igibson.external.pybullet_tools import utils
 from igibson.external.pybullet_tools.utils import get_aabb_extent, get_link_name, link_from_name
 from igibson.objects.object_base import SingleBodyObject
+from igibson.physics.activation_tracker import mark_body_awake
 from igibson.utils import sampling_utils
-from igibson.utils.constants import PyBulletSleepState, SemanticClass
+from igibson.utils.constants import SemanticClass
+from igibson.utils.transform_utils import pose_inv_batch, pose_multiply_batch
 
 _STASH_POSITION = [0, 0, -100]
+_IDENTITY_ORIENTATION = [0, 0, 0, 1]
 
 
 class Particle(SingleBodyObject):
@@ -103,6 +106,7 @@ class Particle(SingleBodyObject):
     def force_wakeup(self):
         activationState = p.ACTIVATION_STATE_WAKE_UP
         p.changeDynamics(self.get_body_id(), -1, activationState=activationState)
+        mark_body_awake(self.get_body_id())
 
 
 class ParticleSystem(object):
@@ -125,10 +129,18 @@ class ParticleSystem(object):
         if color.ndim == 2:
             assert color.shape[0] == num
 
+        # Particle bookkeeping is array-backed and indexed by the position of the particle in _all_particles.
+        # The stash is an ordered set of indices so that both popping the oldest stashed particle and taking out a
+        # specific one are O(1).
         self._all_particles = []
-        self._active_particles = []
-        self._stashed_particles = deque()
-        self._particles_activated_at_any_time = set()
+        self._particle_indices = {}
+        self._active = np.zeros(num, dtype=bool)
+        self._stashed_indices = OrderedDict()
+        self._activated_at_any_time = np.zeros(num, dtype=bool)
+
+        # Last poses set on the particles by the particle system
+        self._positions = np.tile(np.array(_STASH_POSITION, dtype=float), (num, 1))
+        self._orientations = np.tile(np.array(_IDENTITY_ORIENTATION, dtype=float), (num, 1))
 
         self._simulator = None
         self._import_params = {
@@ -144,13 +156,14 @@ class ParticleSystem(object):
             this_color = color if color.ndim == 1 else color[i]
 
             particle = Particle(this_size, _STASH_POSITION, color=this_color, **kwargs)
+            self._particle_indices[particle] = i
             self._all_particles.append(particle)
-            self._stashed_particles.append(particle)
+            self._stashed_indices[i] = None
 
     def dump(self):
         return [
-            particle.get_position_orientation() if particle in self.get_active_particles() else None
-            for particle in self.get_particles()
+            particle.get_position_orientation() if active else None
+            for particle, active in zip(self._all_particles, self._active)
         ]
 
     def reset_to_dump(self, dump):
@@ -171,27 +184,48 @@ class ParticleSystem(object):
         pass
 
     def get_num(self):
-        return len(self._stashed_particles) + len(self._active_particles)
+        return len(self._all_particles)
 
     def get_num_stashed(self):
-        return len(self._stashed_particles)
+        return len(self._stashed_indices)
 
     def get_num_active(self):
-        return len(self._active_particles)
+        return len(self._all_particles) - len(self._stashed_indices)
 
     def get_stashed_particles(self):
-        return list(self._stashed_particles)
+        return [self._all_particles[idx] for idx in self._stashed_indices]
 
     def get_active_particles(self):
-        return list(self._active_particles)
+        return [self._all_particles[idx] for idx in np.flatnonzero(self._active)]
 
     def get_particles(self):
         return self._all_particles
 
+    def get_particle_index(self, particle):
+        """Get the index of a particle in get_particles(), which also indexes the particle arrays."""
+        return self._particle_indices[particle]
+
+    def get_active_mask(self):
+        """Get a boolean array over get_particles() that is True for the active particles. Do not modify it."""
+        return self._active
+
+    def get_positions(self):
+        """
+        Get the positions of all the particles as an (N, 3) array over get_particles(), with the stashed particles at
+        the stash position. The positions of active particles are refreshed from pybullet since they can be moved by
+        physics. Do not modify the returned array.
+        """
+        for idx in np.flatnonzero(self._active):
+            self._positions[idx] = self._all_particles[idx].get_position()
+        return self._positions
+
     def stash_particle(self, particle):
-        assert particle in self._active_particles
-        self._active_particles.remove(particle)
-        self._stashed_particles.append(particle)
+        idx = self._particle_indices[particle]
+        assert self._active[idx]
+        self._active[idx] = False
+        self._stashed_indices[idx] = None
+        self._positions[idx] = _STASH_POSITION
+        self._orientations[idx] = _IDENTITY_ORIENTATION
 
         particle.set_position(_STASH_POSITION)
         if particle.visual_only:
@@ -206,6 +240,15 @@ class ParticleSystem(object):
             # renderer should still update its pose in the curren timestep
             particle.force_sleep()
 
+    def stash_particles(self, mask):
+        """
+        Stash all the active particles selected by a mask.
+
+        :param mask: boolean array over get_particles(), inactive particles are ignored
+        """
+        for idx in np.flatnonzero(np.logical_and(mask, self._active)):
+            self.stash_particle(self._all_particles[idx])
+
     def _load_particle(self, particle):
         body_ids = self._simulator.import_object(particle, **self._import_params)
         # Put loaded particles at the stash position initially.
@@ -215,9 +258,11 @@ class ParticleSystem(object):
     def unstash_particle(self, position, orientation, particle=None):
         # If the user wants a particular particle, give it to them. Otherwise, unstash one.
         if particle is not None:
-            self._stashed_particles.remove(particle)
+            idx = self._particle_indices[particle]
+            del self._stashed_indices[idx]
         else:
-            particle = self._stashed_particles.popleft()
+            idx, _ = self._stashed_indices.popitem(last=False)
+            particle = self._all_particles[idx]
 
         # Lazy loading of the particle now if not already loaded
         if not particle.get_body_id():
@@ -226,8 +271,10 @@ class ParticleSystem(object):
         particle.set_position_orientation(position, orientation)
         particle.force_wakeup()
 
-        self._active_particles.append(particle)
-        self._particles_activated_at_any_time.add(particle)
+        self._active[idx] = True
+        self._activated_at_any_time[idx] = True
+        self._positions[idx] = position
+        self._orientations[idx] = orientation
 
         return particle
 
@@ -236,15 +283,14 @@ class ParticleSystem(object):
         for particle in self.get_active_particles():
             self.stash_particle(particle)
 
-        self._stashed_particles.clear()
-        self._stashed_particles.extend(self._all_particles)
+        self._stashed_indices = OrderedDict.fromkeys(range(len(self._all_particles)))
 
     def get_num_particles_activated_at_any_time(self):
         """Get the number of unique particles that were active at some point in history."""
-        return len(self._particles_activated_at_any_time)
+        return int(np.count_nonzero(self._activated_at_any_time))
 
     def reset_particles_activated_at_any_time(self):
-        self._particles_activated_at_any_time = set()
+        self._activated_at_any_time[:] = False
 
 
 class AttachedParticleSystem(ParticleSystem):
@@ -252,9 +298,14 @@ class AttachedParticleSystem(ParticleSystem):
         super(AttachedParticleSystem, self).__init__(**kwargs)
 
         self.parent_obj = parent_obj
-        self._attachment_offsets = {}  # in the format of {particle: offset}
         self.initial_dump = initial_dump
 
+        # Pose of every particle relative to the parent link it is attached to, only meaningful for active particles
+        num = self.get_num()
+        self._attachment_link_ids = np.full(num, -1, dtype=int)
+        self._attachment_pos_offsets = np.zeros((num, 3))
+        self._attachment_orn_offsets = np.tile(np.array(_IDENTITY_ORIENTATION, dtype=float), (num, 1))
+
     def reset_to_dump(self, dump):
         # Assert that the dump is compatible
         assert len(dump) == self.get_num()
@@ -262,6 +313,8 @@ class AttachedParticleSystem(ParticleSystem):
         # First, stash all particles
         self.reset_stash()
 
+        particles, positions, orientations, link_ids = [], [], [], []
+        link_ids_by_name = {None: -1}
         for i, particle_data in enumerate(dump):
             # particle_data will be None for stashed particles
             if particle_data is not None:
@@ -269,17 +322,20 @@ class AttachedParticleSystem(ParticleSystem):
                 # If particle_attached_link_id cannot be found, it’s because it has been merged
                 # (p.URDF_MERGE_FIXED_LINKS). Since it’s a fixed link anyways and the absolute pose (not link-relative
                 # pose) of the particle is dumped, we can safely assign this particle to the base link.
-                particle_attached_link_id = -1
-                if particle_attached_link_name is not None:
+                if particle_attached_link_name not in link_ids_by_name:
                     try:
-                        particle_attached_link_id = link_from_name(
+                        link_ids_by_name[particle_attached_link_name] = link_from_name(
                             self.parent_obj.get_body_id(), particle_attached_link_name
                         )
                     except ValueError:
-                        pass
+                        link_ids_by_name[particle_attached_link_name] = -1
 
-                particle = self.get_particles()[i]
-                self.unstash_particle(particle_pos, particle_orn, link_id=particle_attached_link_id, particle=particle)
+                particles.append(self.get_particles()[i])
+                positions.append(particle_pos)
+                orientations.append(particle_orn)
+                link_ids.append(link_ids_by_name[particle_attached_link_name])
+
+        self.unstash_particles(positions, orientations, link_ids, particles)
 
     def initialize(self, simulator):
         super(AttachedParticleSystem, self).initialize(simulator)
@@ -289,82 +345,114 @@ class AttachedParticleSystem(ParticleSystem):
             self.reset_to_dump(self.initial_dump)
             del self.initial_dump
 
+    def get_attachment_frames(self, link_ids):
+        """
+        Get the world poses of the parent links that particles are attached to, querying each link only once.
+
+        :param link_ids: array of parent link ids, -1 for the base link
+        :return: (N, 3) array of positions and (N, 4) array of (x, y, z, w) orientations
+        """
+        unique_link_ids, inverse = np.unique(link_ids, return_inverse=True)
+        positions = np.zeros((len(unique_link_ids), 3))
+        orientations = np.zeros((len(unique_link_ids), 4))
+        for i, link_id in enumerate(unique_link_ids):
+            if link_id == -1:
+                positions[i], orientations[i] = self.parent_obj.get_position_orientation()
+            else:
+                link_state = utils.get_link_state(self.parent_obj.get_body_id(), link_id)
+                positions[i] = link_state.linkWorldPosition
+                orientations[i] = link_state.linkWorldOrientation
+        return positions[inverse], orientations[inverse]
+
     def unstash_particle(self, position, orientation, link_id=-1, **kwargs):
         particle = super(AttachedParticleSystem, self).unstash_particle(position, orientation, **kwargs)
 
         # Compute the offset for this particle.
-        if link_id == -1:
-            attachment_source_pos = self.parent_obj.get_position()
-            attachment_source_orn = self.parent_obj.get_orientation()
-        else:
-            link_state = utils.get_link_state(self.parent_obj.get_body_id(), link_id)
-            attachment_source_pos = link_state.linkWorldPosition
-            attachment_source_orn = link_state.linkWorldOrientation
-
-        base_pos, base_orn = p.invertTransform(attachment_source_pos, attachment_source_orn)
-        offsets = p.multiplyTransforms(base_pos, base_orn, position, orientation)
-        self._attachment_offsets[particle] = (link_id, offsets)
+        idx = self.get_particle_index(particle)
+        attachment_source_pos, attachment_source_orn = self.get_attachment_frames([link_id])
+        base_pos, base_orn = pose_inv_batch(attachment_source_pos, attachment_source_orn)
+        offset_pos, offset_orn = pose_multiply_batch(base_pos, base_orn, [position], [orientation])
+        self._attachment_link_ids[idx] = link_id
+        self._attachment_pos_offsets[idx] = offset_pos[0]
+        self._attachment_orn_offsets[idx] = offset_orn[0]
 
         return particle
 
-    def stash_particle(self, particle):
-        super(AttachedParticleSystem, self).stash_particle(particle)
-        del self._attachment_offsets[particle]
+    def unstash_particles(self, positions, orientations, link_ids, particles):
+        """
+        Unstash several specific particles at once, computing their attachment offsets in one batch.
 
-    def update(self, simulator):
-        super(AttachedParticleSystem, self).update(simulator)
+        :param positions: list of world positions of the particles
+        :param orientations: list of world (x, y, z, w) orientations of the particles
+        :param link_ids: list of the parent link ids the particles are attached to, -1 for the base link
+        :param particles: list of stashed particles to unstash
+        """
+        if len(particles) == 0:
+            return
 
-        # Move every particle to their known parent object offsets.
-        for particle in self.get_active_particles():
-            link_id, (pos_offset, orn_offset) = self._attachment_offsets[particle]
+        for position, orientation, particle in zip(positions, orientations, particles):
+            super(AttachedParticleSystem, self).unstash_particle(position, orientation, particle=particle)
 
-            dynamics_info = p.getDynamicsInfo(self.parent_obj.get_body_id(), link_id)
+        indices = [self.get_particle_index(particle) for particle in particles]
+        attachment_source_pos, attachment_source_orn = self.get_attachment_frames(link_ids)
+        base_pos, base_orn = pose_inv_batch(attachment_source_pos, attachment_source_orn)
+        offset_pos, offset_orn = pose_multiply_batch(base_pos, base_orn, positions, orientations)
+        self._attachment_link_ids[indices] = link_ids
+        self._attachment_pos_offsets[indices] = offset_pos
+        self._attachment_orn_offsets[indices] = offset_orn
 
-            if len(dynamics_info) == 13:
-                activation_state = dynamics_info[12]
-            else:
-                activation_state = PyBulletSleepState.AWAKE
+    def get_positions(self):
+        # Attached particles are only moved by the particle system, so the cached positions are up to date.
+        return self._positions
 
-            if activation_state != PyBulletSleepState.AWAKE:
-                # If parent object is in sleep, don't update particle poses
-                continue
+    def get_attached_poses(self, indices):
+        """
+        Compute the world poses of attached particles from the current poses of the parent links.
 
-            if link_id == -1:
-                attachment_source_pos = self.parent_obj.get_position()
-                attachment_source_orn = self.parent_obj.get_orientation()
-            else:
-                link_state = utils.get_link_state(self.parent_obj.get_body_id(), link_id)
-                attachment_source_pos = link_state.linkWorldPosition
-                attachment_source_orn = link_state.linkWorldOrientation
+        :param indices: array of particle indices, see get_particle_index
+        :return: (N, 3) array of positions and (N, 4) array of (x, y, z, w) orientations
+        """
+        attachment_source_pos, attachment_source_orn = self.get_attachment_frames(self._attachment_link_ids[indices])
+        return pose_multiply_batch(
+            attachment_source_pos,
+            attachment_source_orn,
+            self._attachment_pos_offsets[indices],
+            self._attachment_orn_offsets[indices],
+        )
 
-            position, orientation = p.multiplyTransforms(
-                attachment_source_pos, attachment_source_orn, pos_offset, orn_offset
-            )
+    def update(self, simulator):
+        super(AttachedParticleSystem, self).update(simulator)
+
+        # If parent object is in sleep, don't update particle poses
+        if not simulator.activation_tracker.is_awake(self.parent_obj.get_body_id()):
+            return
+
+        # Move every particle to their known parent object offsets.
+        indices = np.flatnonzero(self._active)
+        if len(indices) == 0:
+            return
+
+        positions, orientations = self.get_attached_poses(indices)
+        self._positions[indices] = positions
+        self._orientations[indices] = orientations
+        for idx, position, orientation in zip(indices, positions, orientations):
+            particle = self._all_particles[idx]
             particle.set_position_orientation(position, orientation)
             particle.force_wakeup()
 
     def dump(self):
-        data = []
-        for particle in self.get_particles():
-            if particle in self.get_stashed_particles():
-                data.append(None)
-            else:
-                link_id, (pos_offset, orn_offset) = self._attachment_offsets[particle]
-
-                if link_id == -1:
-                    link_name = None
-                    attachment_source_pos = self.parent_obj.get_position()
-                    attachment_source_orn = self.parent_obj.get_orientation()
-                else:
-                    link_name = get_link_name(self.parent_obj.get_body_id(), link_id)
-                    link_state = utils.get_link_state(self.parent_obj.get_body_id(), link_id)
-                    attachment_source_pos = link_state.linkWorldPosition
-                    attachment_source_orn = link_state.linkWorldOrientation
-
-                position, orientation = p.multiplyTransforms(
-                    attachment_source_pos, attachment_source_orn, pos_offset, orn_offset
-                )
-                data.append((link_name, position, orientation))
+        data = [None] * self.get_num()
+        indices = np.flatnonzero(self._active)
+        if len(indices) == 0:
+            return data
+
+        positions, orientations = self.get_attached_poses(indices)
+        link_names = {-1: None}
+        for idx, position, orientation in zip(indices, positions, orientations):
+            link_id = self._attachment_link_ids[idx]
+            if link_id not in link_names:
+                link_names[link_id] = get_link_name(self.parent_obj.get_body_id(), link_id)
+            data[idx] = (link_names[link_id], tuple(position), tuple(orientation))
 
         return data
 
@@ -522,6 +610,7 @@ class _Dirt(AttachedParticleSystem):
         self.reset_particles_activated_at_any_time()
 
         # Use the sampled points to set the dirt positions.
+        particles, positions, orientations, link_ids = [], [], [], []
         for i, particle in enumerate(self.get_stashed_particles()):
             position, normal, quaternion, hit_link, reasons = results[i]
 
@@ -533,8 +622,12 @@ class _Dirt(AttachedParticleSystem):
                     cuboid_base_to_center = bbox_sizes[2] / 2.0
                     surface_point -= normal * cuboid_base_to_center
 
-                # Unstash the particle (and make sure we get the correct one!)
-                assert self.unstash_particle(surface_point, quaternion, link_id=hit_link, particle=particle) == particle
+                particles.append(particle)
+                positions.append(surface_point)
+                orientations.append(quaternion)
+                link_ids.append(hit_link)
+
+        self.unstash_particles(positions, orientations, link_ids, particles)
 
 
 class Dust(_Dirt):
@@ -1,6 +1,7 @@
 import pybullet as p
 
 from igibson.objects.object_base import SingleBodyObject
+from igibson.physics.activation_tracker import mark_body_awake
 
 
 class VisualMarker(SingleBodyObject):
@@ -98,6 +99,7 @@ class VisualMarker(SingleBodyObject):
     def force_wakeup(self):
         activationState = p.ACTIVATION_STATE_WAKE_UP
         p.changeDynamics(self.get_body_id(), -1, activationState=activationState)
+        mark_body_awake(self.get_body_id())
 
     def set_position(self, pos):
         self.force_wakeup()
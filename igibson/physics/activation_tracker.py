@@ -0,0 +1,177 @@
+"""This file implements body-level tracking of pybullet activation (sleep) states."""
+
+import itertools
+
+import pybullet as p
+
+from igibson.utils.constants import PyBulletSleepState
+
+# Bodies that have been woken up or moved through the iGibson API since the last sync. pybullet is used through a
+# single global client, so this is shared by all the trackers of the process.
+_woken_bodies = set()
+
+# Pose versions of the bodies. Versions are drawn from a single counter so that a body never gets a version again.
+_pose_versions = {}
+_pose_version_counter = itertools.count(1)
+_latest_pose_version = 0
+
+
+def mark_body_awake(body_id):
+    """
+    Record that a body has been woken up or moved outside of physics stepping, so that it is treated as awake until
+    the next renderer sync even if pybullet reports it as sleeping.
+
+    :param body_id: pybullet body id
+    """
+    _woken_bodies.add(body_id)
+    bump_pose_version(body_id)
+
+
+def bump_pose_version(body_id):
+    """
+    Record that the pose or joint states of a body may have changed
+
+    :param body_id: pybullet body id
+    """
+    global _latest_pose_version
+    _latest_pose_version = next(_pose_version_counter)
+    _pose_versions[body_id] = _latest_pose_version
+
+
+def get_pose_version(body_id):
+    """
+    :param body_id: pybullet body id
+    :return: version of the pose and joint states of the body, which changes whenever they may have changed: when
+        the body is awake after physics stepping or when it is moved through the iGibson API. Code resetting poses or
+        joint states with raw pybullet calls, e.g. set_pose or set_joint_positions of pybullet_tools, must call
+        mark_body_awake or bump_pose_version itself, or the memoized states of the body go stale.
+    """
+    return _pose_versions.get(body_id, 0)
+
+
+def get_latest_pose_version():
+    """
+    :return: latest pose version given to any body, which changes whenever any body may have moved
+    """
+    return _latest_pose_version
+
+
+def is_body_awake(body_id):
+    """
+    Query the activation state of a body from pybullet. All the links of a multibody share the activation state of
+    the body, so only the base link is queried.
+
+    :param body_id: pybullet body id
+    :return: whether the body is awake. Builds of pybullet without activation state support always report awake.
+    """
+    dynamics_info = p.getDynamicsInfo(body_id, -1)
+    if len(dynamics_info) == 13:
+        return dynamics_info[12] == PyBulletSleepState.AWAKE
+    return True
+
+
+class ActivationStateTracker(object):
+    """
+    Keeps the set of awake bodies up to date with one pybullet query per body, so that consumers such as the
+    renderer sync and the attached particle systems can go straight to the awake subset instead of querying the
+    activation state of every link themselves.
+
+    Bodies are tracked lazily: the first query of an untracked body adds it to the tracker.
+    """
+
+    def __init__(self):
+        self.body_ids = set()
+        self.awake_bodies = set()
+        self.newly_awake_bodies = set()
+        self.newly_asleep_bodies = set()
+        self.num_refreshes = 0
+
+    def track_body(self, body_id):
+        """
+        Start tracking the activation state of a body
+
+        :param body_id: pybullet body id
+        """
+        if body_id in self.body_ids:
+            return
+        self.body_ids.add(body_id)
+        if is_body_awake(body_id):
+            self.awake_bodies.add(body_id)
+
+    def untrack_body(self, body_id):
+        """
+        Stop tracking a body and forget its woken state and pose version. Must be called when the body is removed
+        from pybullet, which cannot be queried for removed bodies and reuses their ids.
+
+        :param body_id: pybullet body id
+        """
+        self.body_ids.discard(body_id)
+        self.awake_bodies.discard(body_id)
+        self.newly_awake_bodies.discard(body_id)
+        self.newly_asleep_bodies.discard(body_id)
+        _woken_bodies.discard(body_id)
+        _pose_versions.pop(body_id, None)
+
+    def untrack_all(self):
+        """
+        Stop tracking all bodies and forget the woken bodies, when the physics simulation is reset and the body ids
+        become stale
+        """
+        self.body_ids = set()
+        self.awake_bodies = set()
+        self.newly_awake_bodies = set()
+        self.newly_asleep_bodies = set()
+        _woken_bodies.clear()
+
+    def refresh(self):
+        """
+        Query the activation state of every tracked body. Should be called once per simulation step, after physics.
+        """
+        awake_bodies = set(body_id for body_id in self.body_ids if is_body_awake(body_id))
+        self.newly_awake_bodies = awake_bodies - self.awake_bodies
+        self.newly_asleep_bodies = self.awake_bodies - awake_bodies
+        self.awake_bodies = awake_bodies
+
+        # The bodies that were awake during physics stepping may have moved
+        for body_id in awake_bodies | self.newly_asleep_bodies:
+            bump_pose_version(body_id)
+        self.num_refreshes += 1
+
+    def clear_woken_bodies(self):
+        """
+        Forget the bodies woken up through the iGibson API, once their poses have been synced
+        """
+        _woken_bodies.clear()
+
+    def is_awake(self, body_id):
+        """
+        :param body_id: pybullet body id
+        :return: whether the body was awake at the last refresh or has been woken up since
+        """
+        if body_id not in self.body_ids:
+            self.track_body(body_id)
+        return body_id in self.awake_bodies or body_id in _woken_bodies
+
+    def get_awake_bodies(self):
+        """
+        :return: set of bodies that were awake at the last refresh or have been woken up since
+        """
+        return self.awake_bodies | (_woken_bodies & self.body_ids)
+
+    def get_woken_bodies(self):
+        """
+        :return: set of bodies woken up through the iGibson API since the last sync, tracked or not
+        """
+        return set(_woken_bodies)
+
+    def get_num_awake_bodies(self):
+        """
+        :return: number of tracked bodies that are currently awake
+        """
+        return len(self.get_awake_bodies())
+
+    def get_num_tracked_bodies(self):
+        """
+        :return: number of tracked bodies
+        """
+        return len(self.body_ids)
@@ -20,6 +20,7 @@ from igibson.render.mesh_renderer.visual_object import VisualObject
 from igibson.robots.behavior_robot import BehaviorRobot
 from igibson.utils.constants import AVAILABLE_MODALITIES, MAX_CLASS_COUNT, MAX_INSTANCE_COUNT, ShadowPass
 from igibson.utils.mesh_util import lookat, mat2xyz, ortho, perspective, quat2rotmat, safemat2quat, xyz2mat, xyzw2wxyz
+from igibson.utils.profiling import PROFILER
 
 Image.MAX_IMAGE_PIXELS = None
 NO_MATERIAL_DEFINED_IN_SHAPE_AND_NO_OVERWRITE_SUPPLIED = -1
@@ -313,6 +314,8 @@ class MeshRenderer(object):
         # Store trans and rot data for OR as a single variable that we update every frame - avoids copying variable each frame
         self.trans_data = None
         self.rot_data = None
+        # Whether the simulator writes the poses of dynamic instances straight into trans_data and rot_data
+        self.dynamic_positions_synced = False
 
         self.skybox_size = rendering_settings.skybox_size
         if not self.platform == "Darwin" and rendering_settings.enable_pbr:
@@ -984,6 +987,7 @@ class MeshRenderer(object):
         P[3, 2] = (2 * zfar * znear) / (znear - zfar)
         self.P = P
 
+    @PROFILER.profile("renderer.readbuffer")
     def readbuffer(self, modes=AVAILABLE_MODALITIES):
         """
         Read framebuffer of rendering.
@@ -1018,6 +1022,7 @@ class MeshRenderer(object):
         if request_update:
             self.update_optimized_texture_internal()
 
+    @PROFILER.profile("renderer.render")
     def render(
         self, modes=AVAILABLE_MODALITIES, hidden=(), return_buffer=True, render_shadow_pass=True, render_text_pass=True
     ):
@@ -1505,6 +1510,7 @@ class MeshRenderer(object):
         # Construct trans and rot data to be the right shape
         self.trans_data = np.zeros((self.or_buffer_shape_num, 4, 4))
         self.rot_data = np.zeros((self.or_buffer_shape_num, 4, 4))
+        self.dynamic_positions_synced = False
 
         # Variables needed for multi draw elements call
         index_ptr_offsets = []
@@ -1844,7 +1850,9 @@ class MeshRenderer(object):
         :param need_flow_info: whether flow information is required
         """
         for instance in self.instances:
-            # if instance.dynamic:
+            # Dynamic instances have already been written into the buffers by Simulator.sync
+            if instance.dynamic and self.dynamic_positions_synced:
+                continue
             if isinstance(instance, Instance):
                 buf_idxs = instance.or_buffer_indices
                 # Continue if instance has no visual objects
@@ -3,6 +3,7 @@ import logging
 from igibson.render.mesh_renderer.get_available_devices import get_cuda_device
 from igibson.render.mesh_renderer.mesh_renderer_cpu import MeshRenderer, MeshRendererSettings
 from igibson.utils.constants import AVAILABLE_MODALITIES
+from igibson.utils.profiling import PROFILER
 
 try:
     import torch
@@ -36,6 +37,7 @@ try:
                 self.optical_flow_tensor = torch.cuda.FloatTensor(height, width, 4).cuda()
                 self.scene_flow_tensor = torch.cuda.FloatTensor(height, width, 4).cuda()
 
+        @PROFILER.profile("renderer.readbuffer")
         def readbuffer_to_tensor(self, modes=AVAILABLE_MODALITIES):
             results = []
 
@@ -518,56 +518,41 @@ class FetchGripper(LocomotorRobot):
 
         if self.ag_strict_mode:
             # Compute gripper bounding box
-            corners = []
-
             eef_pos, eef_orn, _, _, _, _ = p.getLinkState(self.get_body_id(), self.eef_link_id)
-            i_eef_pos, i_eef_orn = p.invertTransform(eef_pos, eef_orn)
+            i_eef_pos, i_eef_orn = T.pose_inv_batch(eef_pos, eef_orn)
 
             gripper_fork_1_state = p.getLinkState(self.get_body_id(), self.gripper_finger_joint_ids[0])
-            local_corners = [
-                [0.04, -0.012, 0.014],
-                [0.04, -0.012, -0.014],
-                [-0.04, -0.012, 0.014],
-                [-0.04, -0.012, -0.014],
-            ]
-            for coord in local_corners:
-                corner, _ = p.multiplyTransforms(gripper_fork_1_state[0], gripper_fork_1_state[1], coord, [0, 0, 0, 1])
-                corners.append(corner)
-
             gripper_fork_2_state = p.getLinkState(self.get_body_id(), self.gripper_finger_joint_ids[1])
-            local_corners = [
-                [0.04, 0.012, 0.014],
-                [0.04, 0.012, -0.014],
-                [-0.04, 0.012, 0.014],
-                [-0.04, 0.012, -0.014],
-            ]
-            for coord in local_corners:
-                corner, _ = p.multiplyTransforms(gripper_fork_2_state[0], gripper_fork_2_state[1], coord, [0, 0, 0, 1])
-                corners.append(corner)
-
-            eef_local_corners = []
-            for coord in corners:
-                corner, _ = p.multiplyTransforms(i_eef_pos, i_eef_orn, coord, [0, 0, 0, 1])
-                eef_local_corners.append(corner)
+            local_corners = np.array(
+                [
+                    [0.04, -0.012, 0.014],
+                    [0.04, -0.012, -0.014],
+                    [-0.04, -0.012, 0.014],
+                    [-0.04, -0.012, -0.014],
+                ]
+            )
+            corners = np.concatenate(
+                [
+                    gripper_fork_1_state[0] + T.quat_rotate_batch(gripper_fork_1_state[1], local_corners),
+                    gripper_fork_2_state[0] + T.quat_rotate_batch(gripper_fork_2_state[1], local_corners * [1, -1, 1]),
+                ]
+            )
+            eef_local_corners = i_eef_pos + T.quat_rotate_batch(i_eef_orn, corners)
+            eef_local_min, eef_local_max = np.min(eef_local_corners, axis=0), np.max(eef_local_corners, axis=0)
 
-            eef_local_corners = np.stack(eef_local_corners)
             for candidate in candidates:
-                new_contact_point_data = []
-                for contact_point_data in contact_dict[candidate]:
-                    pos = contact_point_data["contact_position"]
-                    local_pos, _ = p.multiplyTransforms(i_eef_pos, i_eef_orn, pos, [0, 0, 0, 1])
-                    x_inside = local_pos[0] < np.max(eef_local_corners[:, 0]) and local_pos[0] > np.min(
-                        eef_local_corners[:, 0]
-                    )
-                    y_inside = local_pos[1] < np.max(eef_local_corners[:, 1]) and local_pos[1] > np.min(
-                        eef_local_corners[:, 1]
-                    )
-                    z_inside = local_pos[2] < np.max(eef_local_corners[:, 2]) and local_pos[2] > np.min(
-                        eef_local_corners[:, 2]
-                    )
-                    if x_inside and y_inside and z_inside:
-                        new_contact_point_data.append(contact_point_data)
-                contact_dict[candidate] = new_contact_point_data
+                if not contact_dict[candidate]:
+                    continue
+                positions = np.array(
+                    [contact_point_data["contact_position"] for contact_point_data in contact_dict[candidate]]
+                )
+                local_positions = i_eef_pos + T.quat_rotate_batch(i_eef_orn, positions)
+                inside = np.all((local_positions < eef_local_max) & (local_positions > eef_local_min), axis=1)
+                contact_dict[candidate] = [
+                    contact_point_data
+                    for contact_point_data, is_inside in zip(contact_dict[candidate], inside)
+                    if is_inside
+                ]
 
         # Step 3 - find the closest object to the gripper center among these "inside" objects
         gripper_state = p.getLinkState(self.get_body_id(), self.eef_link_id)
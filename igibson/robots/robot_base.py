@@ -6,6 +6,7 @@ import pybullet as p
 
 import igibson
 from igibson.object_states.factory import prepare_object_states
+from igibson.physics.activation_tracker import mark_body_awake
 
 
 class BaseRobot(object):
@@ -209,6 +210,7 @@ class BodyPart:
     def _set_fields_of_pose_of(self, pos, orn):
         """Set pose of body part"""
         p.resetBasePositionAndOrientation(self.bodies[self.body_index], pos, orn)
+        mark_body_awake(self.bodies[self.body_index])
 
     def get_pose(self):
         """Get pose of body part"""
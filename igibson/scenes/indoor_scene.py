@@ -1,17 +1,15 @@
 import logging
 import os
-import pickle
-import sys
 from abc import ABCMeta
+from collections import OrderedDict
 
 import cv2
-import networkx as nx
 import numpy as np
 from future.utils import with_metaclass
 from PIL import Image
 
 from igibson.scenes.scene_base import Scene
-from igibson.utils.utils import l2_distance
+from igibson.utils.trav_graph import DistanceField, TraversabilityGraph
 
 
 class IndoorScene(with_metaclass(ABCMeta, Scene)):
@@ -58,6 +56,9 @@ class IndoorScene(with_metaclass(ABCMeta, Scene)):
         self.mesh_body_id = None
         self.pybullet_load_texture = pybullet_load_texture
         self.floor_heights = [0.0]
+        # LRU cache of the geodesic distance fields, keyed by (floor, goal cell)
+        self.distance_field_cache = OrderedDict()
+        self.distance_field_cache_size = 16
 
     def load_trav_map(self, maps_path):
         """
@@ -70,7 +71,9 @@ class IndoorScene(with_metaclass(ABCMeta, Scene)):
             return
 
         self.floor_map = []
-        self.floor_graph = []
+        self.floor_trav_graph = []
+        self.floor_trav_cells = []
+        self.distance_field_cache.clear()
         for floor in range(len(self.floor_heights)):
             if self.trav_map_type == "with_obj":
                 trav_map = np.array(Image.open(os.path.join(maps_path, "floor_trav_{}.png".format(floor))))
@@ -93,53 +96,33 @@ class IndoorScene(with_metaclass(ABCMeta, Scene)):
             if self.build_graph:
                 self.build_trav_graph(maps_path, floor, trav_map)
             self.floor_map.append(trav_map)
+            # traversable cells of the eroded map, that random points are sampled from
+            self.floor_trav_cells.append(np.argwhere(trav_map == 255))
 
-    # TODO: refactor into C++ for speedup
     def build_trav_graph(self, maps_path, floor, trav_map):
         """
-        Build traversibility graph and only take the largest connected component
+        Build traversibility graph and only take the largest connected component. The graph is cached in maps_path,
+        keyed by the trav map and the trav map resolution and erosion.
 
         :param maps_path: String with the path to the folder containing the traversability maps
         :param floor: floor number
         :param trav_map: traversability map
         """
-        graph_file = os.path.join(
-            maps_path, "floor_trav_{}_py{}{}.p".format(floor, sys.version_info.major, sys.version_info.minor)
+        trav_graph = TraversabilityGraph.load_or_build(
+            maps_path, "floor_trav_{}".format(floor), trav_map, self.trav_map_resolution, self.trav_map_erosion
         )
-        if os.path.isfile(graph_file):
-            logging.info("Loading traversable graph")
-            with open(graph_file, "rb") as pfile:
-                g = pickle.load(pfile)
-        else:
-            logging.info("Building traversable graph")
-            g = nx.Graph()
-            for i in range(self.trav_map_size):
-                for j in range(self.trav_map_size):
-                    if trav_map[i, j] == 0:
-                        continue
-                    g.add_node((i, j))
-                    # 8-connected graph
-                    neighbors = [(i - 1, j - 1), (i, j - 1), (i + 1, j - 1), (i - 1, j)]
-                    for n in neighbors:
-                        if (
-                            0 <= n[0] < self.trav_map_size
-                            and 0 <= n[1] < self.trav_map_size
-                            and trav_map[n[0], n[1]] > 0
-                        ):
-                            g.add_edge(n, (i, j), weight=l2_distance(n, (i, j)))
-
-            # only take the largest connected component
-            largest_cc = max(nx.connected_components(g), key=len)
-            g = g.subgraph(largest_cc).copy()
-            with open(graph_file, "wb") as pfile:
-                pickle.dump(g, pfile)
-
-        self.floor_graph.append(g)
+        self.floor_trav_graph.append(trav_graph)
 
         # update trav_map accordingly
         trav_map[:, :] = 0
-        for node in g.nodes:
-            trav_map[node[0], node[1]] = 255
+        trav_map[trav_graph.nodes[:, 0], trav_graph.nodes[:, 1]] = 255
+
+    @property
+    def floor_graph(self):
+        """
+        NetworkX traversability graphs of all floors, built lazily from the sparse graphs
+        """
+        return [trav_graph.to_networkx() for trav_graph in self.floor_trav_graph]
 
     def get_random_point(self, floor=None):
         """
@@ -151,10 +134,9 @@ class IndoorScene(with_metaclass(ABCMeta, Scene)):
         """
         if floor is None:
             floor = self.get_random_floor()
-        trav = self.floor_map[floor]
-        trav_space = np.where(trav == 255)
-        idx = np.random.randint(0, high=trav_space[0].shape[0])
-        xy_map = np.array([trav_space[0][idx], trav_space[1][idx]])
+        trav_cells = self.floor_trav_cells[floor]
+        idx = np.random.randint(0, high=trav_cells.shape[0])
+        xy_map = trav_cells[idx]
         x, y = self.map_to_world(xy_map)
         z = self.floor_heights[floor]
         return floor, np.array([x, y, z])
@@ -186,14 +168,12 @@ class IndoorScene(with_metaclass(ABCMeta, Scene)):
         :param world_xy: 2D location in world reference frame (metric)
         """
         map_xy = tuple(self.world_to_map(world_xy))
-        g = self.floor_graph[floor]
-        return g.has_node(map_xy)
+        return self.floor_trav_graph[floor].has_node(map_xy)
 
     def get_shortest_path(self, floor, source_world, target_world, entire_path=False):
         """
         Get the shortest path from one point to another point.
-        If any of the given point is not in the graph, add it to the graph and
-        create an edge between it to its closest node.
+        If any of the given point is not in the graph, it is connected to its closest node.
 
         :param floor: floor number
         :param source_world: 2D source location in world reference frame (metric)
@@ -202,21 +182,7 @@ class IndoorScene(with_metaclass(ABCMeta, Scene)):
         """
         assert self.build_graph, "cannot get shortest path without building the graph"
         source_map = tuple(self.world_to_map(source_world))
-        target_map = tuple(self.world_to_map(target_world))
-
-        g = self.floor_graph[floor]
-
-        if not g.has_node(target_map):
-            nodes = np.array(g.nodes)
-            closest_node = tuple(nodes[np.argmin(np.linalg.norm(nodes - target_map, axis=1))])
-            g.add_edge(closest_node, target_map, weight=l2_distance(closest_node, target_map))
-
-        if not g.has_node(source_map):
-            nodes = np.array(g.nodes)
-            closest_node = tuple(nodes[np.argmin(np.linalg.norm(nodes - source_map, axis=1))])
-            g.add_edge(closest_node, source_map, weight=l2_distance(closest_node, source_map))
-
-        path_map = np.array(nx.astar_path(g, source_map, target_map, heuristic=l2_distance))
+        path_map = self.get_distance_field(floor, target_world).get_path(source_map)
 
         path_world = self.map_to_world(path_map)
         geodesic_distance = np.sum(np.linalg.norm(path_world[1:] - path_world[:-1], axis=1))
@@ -230,3 +196,38 @@ class IndoorScene(with_metaclass(ABCMeta, Scene)):
                 path_world = np.concatenate((path_world, remaining_waypoints), axis=0)
 
         return path_world, geodesic_distance
+
+    def get_distance_field(self, floor, target_world):
+        """
+        Get the geodesic distance field to a target point. The fields are cached by floor and target cell, so that
+        tasks with a fixed goal only compute the field once per episode.
+
+        :param floor: floor number
+        :param target_world: 2D target location in world reference frame (metric)
+        :return: DistanceField
+        """
+        assert self.build_graph, "cannot get distance field without building the graph"
+        target_map = tuple(self.world_to_map(target_world))
+        key = (floor, target_map)
+        if key in self.distance_field_cache:
+            self.distance_field_cache.move_to_end(key)
+            return self.distance_field_cache[key]
+
+        distance_field = DistanceField(self.floor_trav_graph[floor], target_map)
+        self.distance_field_cache[key] = distance_field
+        if len(self.distance_field_cache) > self.distance_field_cache_size:
+            self.distance_field_cache.popitem(last=False)
+        return distance_field
+
+    def get_geodesic_distance(self, floor, source_world, target_world):
+        """
+        Get the geodesic distance from one point to another point, looked up in the cached distance field of the
+        target point. It is the same distance as the one returned by get_shortest_path.
+
+        :param floor: floor number
+        :param source_world: 2D source location in world reference frame (metric)
+        :param target_world: 2D target location in world reference frame (metric)
+        :return: geodesic distance (metric)
+        """
+        source_map = tuple(self.world_to_map(source_world))
+        return self.get_distance_field(floor, target_world).get_distance(source_map) * self.trav_map_resolution
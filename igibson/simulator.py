@@ -10,12 +10,20 @@ import pybullet as p
 
 import igibson
 from igibson.object_states.factory import get_states_by_dependency_order
+from igibson.object_states.object_state_base import (
+    AbsoluteObjectState,
+    BaseObjectState,
+    CachingEnabledObjectState,
+    UpdateTrigger,
+)
+from igibson.object_states.texture_change_state_mixin import TextureChangeStateMixin
 from igibson.objects.articulated_object import ArticulatedObject, URDFObject
 from igibson.objects.multi_object_wrappers import ObjectGrouper, ObjectMultiplexer
 from igibson.objects.object_base import NonRobotObject
 from igibson.objects.particles import Particle, ParticleSystem
 from igibson.objects.stateful_object import StatefulObject
 from igibson.objects.visual_marker import VisualMarker
+from igibson.physics.activation_tracker import ActivationStateTracker
 from igibson.render.mesh_renderer.instances import Instance, InstanceGroup
 from igibson.render.mesh_renderer.mesh_renderer_cpu import MeshRenderer
 from igibson.render.mesh_renderer.mesh_renderer_settings import MeshRendererSettings
@@ -28,7 +36,8 @@ from igibson.scenes.igibson_indoor_scene import InteractiveIndoorScene
 from igibson.scenes.scene_base import Scene
 from igibson.utils.assets_utils import get_ig_avg_category_specs
 from igibson.utils.constants import PyBulletSleepState, SemanticClass
-from igibson.utils.mesh_util import quat2rotmat, xyz2mat, xyzw2wxyz
+from igibson.utils.mesh_util import quat2rotmat, quat2rotmat_batch, xyz2mat, xyz2mat_batch, xyzw2wxyz, xyzw2wxyz_batch
+from igibson.utils.profiling import PROFILER
 from igibson.utils.semantics_utils import get_class_name_to_class_id
 from igibson.utils.utils import quatXYZWFromRotMat, restoreState
 from igibson.utils.vr_utils import VR_CONTROLLERS, VR_DEVICES, VrData, calc_offset, calc_z_rot_from_right
@@ -54,6 +63,7 @@ class Simulator:
         render_to_tensor=False,
         rendering_settings=MeshRendererSettings(),
         vr_settings=VrSettings(),
+        dirty_state_updates=False,
     ):
         """
         :param gravity: gravity on z direction.
@@ -71,6 +81,8 @@ class Simulator:
         disable it when you want to run multiple physics step but don't need to visualize each frame
         :param rendering_settings: settings to use for mesh renderer
         :param vr_settings: settings to use for VR in simulator and MeshRendererVR
+        :param dirty_state_updates: only update the object states whose update triggers fired during the step,
+            e.g. the poses of the bodies that moved, instead of updating every state of every object
         """
         # physics simulator
         self.gravity = gravity
@@ -170,6 +182,8 @@ class Simulator:
         self.assist_grasp_mass_thresh = 10.0
 
         self.object_state_types = get_states_by_dependency_order()
+        self.dirty_state_updates = dirty_state_updates
+        self.build_state_update_table()
 
     def set_timestep(self, physics_timestep, render_timestep):
         """
@@ -251,6 +265,20 @@ class Simulator:
         p.setTimeStep(self.physics_timestep)
         p.setGravity(0, 0, -self.gravity)
         p.setPhysicsEngineParameter(enableFileCaching=0)
+        # Activation states of the bodies, refreshed once per step
+        self.activation_tracker = ActivationStateTracker()
+        # Flat body/link lookup tables used by the batched renderer sync, rebuilt when instances are added
+        self.sync_table = None
+        self.sync_table_num_instances = -1
+        self.sync_buffer_table = None
+        # Bookkeeping of the dirty-set object state updates, the first step after loading updates every state
+        self.state_update_full_sweep = True
+        self.state_update_num_objects = -1
+        self.state_update_woken_bodies = set()
+        self.state_update_values = {}
+        self.contact_partners = {}
+        # Active heat sources of the current step, shared by all the Temperature states
+        self.heat_source_field = None
         self.visual_objects = {}
         self.robots = []
         self.scene = None
@@ -671,8 +699,8 @@ class Simulator:
 
         visual_objects = []
         link_ids = []
-        poses_rot = []
-        poses_trans = []
+        positions = []
+        orientations = []
         color = [0, 0, 0]
         for link_id in list(range(p.getNumJoints(object_pb_id))) + [-1]:
             if link_id == -1:
@@ -724,9 +752,12 @@ class Simulator:
                     pos, orn = p.getBasePositionAndOrientation(object_pb_id)
                 else:
                     pos, orn = p.getLinkState(object_pb_id, link_id)[:2]
-                poses_rot.append(np.ascontiguousarray(quat2rotmat(xyzw2wxyz(orn))))
-                poses_trans.append(np.ascontiguousarray(xyz2mat(pos)))
+                positions.append(pos)
+                orientations.append(orn)
 
+        # Convert the link poses in one batch, every slice of the contiguous arrays is itself contiguous
+        poses_rot = list(quat2rotmat_batch(xyzw2wxyz_batch(np.reshape(orientations, (-1, 4)))))
+        poses_trans = list(xyz2mat_batch(np.reshape(positions, (-1, 3))))
         self.renderer.add_instance_group(
             object_ids=visual_objects,
             link_ids=link_ids,
@@ -810,6 +841,7 @@ class Simulator:
 
             for body_id in body_ids:
                 p.removeBody(body_id)
+                self.activation_tracker.untrack_body(body_id)
 
             restoreState(state_id)
 
@@ -831,8 +863,8 @@ class Simulator:
         ids = robot.load()
         visual_objects = []
         link_ids = []
-        poses_rot = []
-        poses_trans = []
+        positions = []
+        orientations = []
         self.robots.append(robot)
 
         for shape in p.getVisualShapeData(ids[0]):
@@ -897,9 +929,12 @@ class Simulator:
                 pos, orn = p.getBasePositionAndOrientation(id)
             else:
                 pos, orn = p.getLinkState(id, link_id)[:2]
-            poses_rot.append(np.ascontiguousarray(quat2rotmat(xyzw2wxyz(orn))))
-            poses_trans.append(np.ascontiguousarray(xyz2mat(pos)))
+            positions.append(pos)
+            orientations.append(orn)
 
+        # Convert the link poses in one batch, every slice of the contiguous arrays is itself contiguous
+        poses_rot = list(quat2rotmat_batch(xyzw2wxyz_batch(np.reshape(orientations, (-1, 4)))))
+        poses_trans = list(xyz2mat_batch(np.reshape(positions, (-1, 3))))
         self.renderer.add_robot(
             object_ids=visual_objects,
             link_ids=link_ids,
@@ -1039,19 +1074,152 @@ class Simulator:
         Complete any non-physics steps such as state updates.
         """
         # Step all of the particle systems.
-        for particle_system in self.particle_systems:
-            particle_system.update(self)
+        with PROFILER.scope("particles"):
+            for particle_system in self.particle_systems:
+                with PROFILER.scope(type(particle_system).__name__):
+                    particle_system.update(self)
 
         # Step the object states in global topological order.
-        for state_type in self.object_state_types:
-            for obj in self.scene.get_objects_with_state(state_type):
-                obj.states[state_type].update()
+        with PROFILER.scope("object_states"):
+            if self.dirty_state_updates:
+                self.update_dirty_object_states()
+            else:
+                for state_type in self.object_state_types:
+                    with PROFILER.scope(state_type.__name__):
+                        for obj in self.scene.get_objects_with_state(state_type):
+                            obj.states[state_type].update()
 
         # Step the object procedural materials based on the updated object states
-        for obj in self.scene.get_objects():
-            if hasattr(obj, "procedural_material") and obj.procedural_material is not None:
-                obj.procedural_material.update()
+        with PROFILER.scope("procedural_materials"):
+            for obj in self.scene.get_objects():
+                if hasattr(obj, "procedural_material") and obj.procedural_material is not None:
+                    obj.procedural_material.update()
 
+    def build_state_update_table(self):
+        """
+        Collect the update triggers of every state type and the dependencies whose value changes need to be tracked
+        for the dirty-set object state updates
+        """
+        self.state_update_triggers = {}
+        self.state_update_dependencies = {}
+        self.state_update_value_types = set()
+        for state_type in self.object_state_types:
+            # States without an update never need to be stepped
+            if state_type._update is BaseObjectState._update:
+                self.state_update_triggers[state_type] = set()
+                continue
+            triggers = set(state_type.get_update_triggers())
+            self.state_update_triggers[state_type] = triggers
+            if UpdateTrigger.DEPENDENCY not in triggers:
+                continue
+            dependencies = state_type.get_dependencies() + state_type.get_optional_dependencies()
+            self.state_update_dependencies[state_type] = dependencies
+            # Cached states count as changed whenever they are refreshed and relative states have no value of their
+            # own, so only the values of the remaining absolute states are compared from step to step
+            for dependency in dependencies:
+                if issubclass(dependency, AbsoluteObjectState) and not issubclass(
+                    dependency, CachingEnabledObjectState
+                ):
+                    self.state_update_value_types.add(dependency)
+
+    def get_contact_changed_bodies(self, moved_bodies):
+        """
+        Get the bodies whose contacts may have changed: the bodies that moved, the bodies they touch and the bodies
+        they touched the last time they moved
+
+        :param moved_bodies: set of pybullet body ids that moved during the step
+        :return: set of pybullet body ids
+        """
+        contact_changed_bodies = set(moved_bodies)
+        for body_id in moved_bodies:
+            partners = set(item[2] for item in p.getContactPoints(bodyA=body_id))
+            contact_changed_bodies |= partners
+            contact_changed_bodies |= self.contact_partners.get(body_id, set())
+            self.contact_partners[body_id] = partners
+        return contact_changed_bodies
+
+    def update_dirty_object_states(self):
+        """
+        Update the object states in global topological order, skipping the objects for which none of the update
+        triggers of a state fired during the step. Every state is updated on the first step after objects are added.
+        """
+        num_objects = len(self.scene.get_objects())
+        full_sweep = self.state_update_full_sweep or num_objects != self.state_update_num_objects
+        self.state_update_full_sweep = False
+        self.state_update_num_objects = num_objects
+
+        moved_bodies = (
+            self.activation_tracker.get_awake_bodies()
+            | self.activation_tracker.newly_asleep_bodies
+            | self.state_update_woken_bodies
+        )
+        with PROFILER.scope("contacts"):
+            contact_changed_bodies = self.get_contact_changed_bodies(moved_bodies)
+        changed_states = set()
+
+        for state_type in self.object_state_types:
+            triggers = self.state_update_triggers[state_type]
+            if not triggers:
+                continue
+            with PROFILER.scope(state_type.__name__):
+                self.update_dirty_states_of_type(
+                    state_type, full_sweep, moved_bodies, contact_changed_bodies, changed_states
+                )
+
+        # Bodies moved by the state updates themselves are only seen by the activation tracker at the next step
+        self.state_update_woken_bodies = self.activation_tracker.get_woken_bodies()
+
+    def update_dirty_states_of_type(self, state_type, full_sweep, moved_bodies, contact_changed_bodies, changed_states):
+        """
+        Update the states of a type whose update triggers fired during the step
+
+        :param state_type: object state class
+        :param full_sweep: whether to update all the states regardless of their triggers
+        :param moved_bodies: set of pybullet body ids that moved during the step
+        :param contact_changed_bodies: set of pybullet body ids whose contacts may have changed
+        :param changed_states: set of the (object id, state type) pairs whose value changed during the step, updated
+            in place
+        """
+        triggers = self.state_update_triggers[state_type]
+        track_value = state_type in self.state_update_value_types
+        for obj in self.scene.get_objects_with_state(state_type):
+            state = obj.states[state_type]
+            if full_sweep or UpdateTrigger.ALWAYS in triggers:
+                triggered = True
+            else:
+                body_ids = getattr(obj, "body_ids", None) or [obj.get_body_id()]
+                triggered = (
+                    (UpdateTrigger.POSE in triggers and any(body_id in moved_bodies for body_id in body_ids))
+                    or (
+                        UpdateTrigger.CONTACT in triggers
+                        and any(body_id in contact_changed_bodies for body_id in body_ids)
+                    )
+                    or (
+                        UpdateTrigger.DEPENDENCY in triggers
+                        and any(
+                            (id(obj), dependency) in changed_states
+                            for dependency in self.state_update_dependencies[state_type]
+                        )
+                    )
+                )
+
+            if triggered:
+                state.update()
+                if isinstance(state, CachingEnabledObjectState):
+                    changed_states.add((id(obj), state_type))
+            elif isinstance(state, TextureChangeStateMixin):
+                # Texture change requests are cleared by the procedural material every step
+                state.update_texture()
+
+            if track_value:
+                # Values can also be changed through set_value between steps, so compare with the last seen value
+                key = (id(obj), state_type)
+                value = state.get_value()
+                if key not in self.state_update_values or not np.array_equal(self.state_update_values[key], value):
+                    changed_states.add(key)
+                    self.state_update_values[key] = value
+
+    @PROFILER.profile("simulator.step_vr")
     def step_vr(self, print_stats=False):
         """
         Step the simulation when using VR. Order of function calls:
@@ -1070,17 +1238,21 @@ class Simulator:
             outside_step_dur = time.perf_counter() - self.frame_end_time
         # Simulate Physics in PyBullet
         physics_start_time = time.perf_counter()
-        for _ in range(self.physics_timestep_num):
-            p.stepSimulation()
+        with PROFILER.scope("physics"):
+            for _ in range(self.physics_timestep_num):
+                p.stepSimulation()
         physics_dur = time.perf_counter() - physics_start_time
 
         non_physics_start_time = time.perf_counter()
-        self._non_physics_step()
+        with PROFILER.scope("activation"):
+            self.activation_tracker.refresh()
+        with PROFILER.scope("non_physics_step"):
+            self._non_physics_step()
         non_physics_dur = time.perf_counter() - non_physics_start_time
 
         # Sync PyBullet bodies to renderer and then render to Viewer
         render_start_time = time.perf_counter()
-        self.sync()
+        self.sync(refresh_activation=False)
         render_dur = time.perf_counter() - render_start_time
 
         # Sleep until last possible Vsync
@@ -1092,19 +1264,21 @@ class Simulator:
 
         # Update VR compositor and VR data
         vr_system_start = time.perf_counter()
-        # First sync VR compositor - this is where Oculus blocks (as opposed to Vive, which blocks in update_vr_data)
-        self.sync_vr_compositor()
-        # Note: this should only be called once per frame - use get_vr_events to read the event data list in
-        # subsequent read operations
-        self.poll_vr_events()
-        # This is necessary to fix the eye tracking value for the current frame, since it is multi-threaded
-        self.fix_eye_tracking_value()
-        # Move user to their starting location
-        self.perform_vr_start_pos_move()
-        # Update VR data and wait until 3ms before the next vsync
-        self.renderer.update_vr_data()
-        # Update VR system data - eg. offsets, haptics, etc.
-        self.vr_system_update()
+        with PROFILER.scope("vr_system"):
+            # First sync VR compositor - this is where Oculus blocks (as opposed to Vive, which blocks in
+            # update_vr_data)
+            self.sync_vr_compositor()
+            # Note: this should only be called once per frame - use get_vr_events to read the event data list in
+            # subsequent read operations
+            self.poll_vr_events()
+            # This is necessary to fix the eye tracking value for the current frame, since it is multi-threaded
+            self.fix_eye_tracking_value()
+            # Move user to their starting location
+            self.perform_vr_start_pos_move()
+            # Update VR data and wait until 3ms before the next vsync
+            self.renderer.update_vr_data()
+            # Update VR system data - eg. offsets, haptics, etc.
+            self.vr_system_update()
         vr_system_dur = time.perf_counter() - vr_system_start
 
         # Calculate final frame duration
@@ -1125,6 +1299,13 @@ class Simulator:
             print("Total sleep duration: {}".format(sleep_dur * 1000))
             print("Total VR system duration: {}".format(vr_system_dur * 1000))
             print("Total frame duration: {} and fps: {}".format(frame_dur * 1000, 1 / frame_dur))
+            print(
+                "Awake bodies: {} of {}, body links synced: {}".format(
+                    self.activation_tracker.get_num_awake_bodies(),
+                    self.activation_tracker.get_num_tracked_bodies(),
+                    self.body_links_awake,
+                )
+            )
             print(
                 "Realtime factor: {}".format(round((self.physics_timestep_num * self.physics_timestep) / frame_dur, 3))
             )
@@ -1142,26 +1323,44 @@ class Simulator:
             self.step_vr(print_stats=print_stats)
             return
 
-        for _ in range(self.physics_timestep_num):
-            p.stepSimulation()
+        with PROFILER.scope("simulator.step"):
+            with PROFILER.scope("physics"):
+                for _ in range(self.physics_timestep_num):
+                    p.stepSimulation()
+            with PROFILER.scope("activation"):
+                self.activation_tracker.refresh()
 
-        self._non_physics_step()
-        self.sync()
+            with PROFILER.scope("non_physics_step"):
+                self._non_physics_step()
+            self.sync(refresh_activation=False)
+
+        if print_stats:
+            print(
+                "Frame number {}: awake bodies: {} of {}, body links synced: {}".format(
+                    self.frame_count,
+                    self.activation_tracker.get_num_awake_bodies(),
+                    self.activation_tracker.get_num_tracked_bodies(),
+                    self.body_links_awake,
+                )
+            )
         self.frame_count += 1
 
-    def sync(self, force_sync=False):
+    def sync(self, force_sync=False, refresh_activation=True):
         """
         Update positions in renderer without stepping the simulation. Usually used in the reset() function
-        """
-        
-        # raise ValueError("DEBUG: calling sync function!!")
-        
-        self.body_links_awake = 0
-        for instance in self.renderer.instances:
-            if instance.dynamic:
-                self.body_links_awake += self.update_position(instance, force_sync=force_sync)
-        if (self.use_ig_renderer or self.use_vr_renderer or self.use_simple_viewer) and self.viewer is not None:
-            self.viewer.update()
+
+        :param force_sync: whether to update the positions of sleeping bodies as well
+        :param refresh_activation: whether to refresh the activation states of the bodies first. step() already
+            refreshes them right after physics
+        """
+        with PROFILER.scope("sync"):
+            if refresh_activation:
+                self.activation_tracker.refresh()
+            with PROFILER.scope("update_positions"):
+                self.body_links_awake = self.update_positions_batched(force_sync=force_sync)
+            if (self.use_ig_renderer or self.use_vr_renderer or self.use_simple_viewer) and self.viewer is not None:
+                with PROFILER.scope("viewer"):
+                    self.viewer.update()
         if self.first_sync:
             self.first_sync = False
 
@@ -1754,6 +1953,14 @@ class Simulator:
             if obj.get_body_id() == instance.pybullet_uuid:
                 return instance.hidden
 
+    def get_awake_bodies(self):
+        """
+        Gets the pybullet ids of the bodies that are awake in the current step
+
+        :return: set of body ids
+        """
+        return self.activation_tracker.get_awake_bodies()
+
     def get_category_ids(self, category_name):
         """
         Gets ids for all instances of a specific category (floors, walls, etc.) in a scene
@@ -1821,6 +2028,145 @@ class Simulator:
                 body_links_awake += 1
         return body_links_awake
 
+    def build_sync_table(self):
+        """
+        Gather the pybullet body and link ids of all dynamic renderer instances into flat arrays, so that
+        update_positions_batched can query each body once and convert all the poses with one NumPy call.
+        Every unique (body, link) pair becomes one row of the pose arrays.
+        """
+        rows = {}
+        bodies = {}
+        part_rows = []
+        part_instances = []
+        part_indices = []
+        for instance in self.renderer.instances:
+            if not instance.dynamic:
+                continue
+            body_id = instance.pybullet_uuid
+            if body_id not in bodies:
+                bodies[body_id] = {"base_row": None, "link_ids": [], "link_rows": []}
+                self.activation_tracker.track_body(body_id)
+            body = bodies[body_id]
+            link_ids = [-1] if isinstance(instance, Instance) else instance.link_ids
+            for j, link_id in enumerate(link_ids):
+                if (body_id, link_id) not in rows:
+                    rows[(body_id, link_id)] = len(rows)
+                    if link_id == -1:
+                        body["base_row"] = rows[(body_id, link_id)]
+                    else:
+                        body["link_ids"].append(link_id)
+                        body["link_rows"].append(rows[(body_id, link_id)])
+                part_rows.append(rows[(body_id, link_id)])
+                part_instances.append(instance)
+                # Instances have a single part and are identified by a None part index
+                part_indices.append(None if isinstance(instance, Instance) else j)
+
+        self.sync_table = {
+            "num_rows": len(rows),
+            "bodies": [
+                (body_id, body["base_row"], body["link_ids"], np.array(body["link_rows"], dtype=int))
+                for body_id, body in bodies.items()
+            ],
+            "part_rows": np.array(part_rows, dtype=int),
+            "part_instances": part_instances,
+            "part_indices": part_indices,
+        }
+        self.sync_table_num_instances = len(self.renderer.instances)
+        self.sync_buffer_table = None
+
+    def build_sync_buffer_table(self):
+        """
+        Map the rows of the optimized renderer's trans_data/rot_data buffers to rows of the sync table, so that
+        update_positions_batched can write the poses of awake links straight into those buffers.
+        """
+        buffer_rows = []
+        pose_rows = []
+        for instance, j, row in zip(
+            self.sync_table["part_instances"], self.sync_table["part_indices"], self.sync_table["part_rows"]
+        ):
+            if not instance.or_buffer_indices:
+                continue
+            if j is None:
+                instance_buffer_rows = instance.or_buffer_indices
+            else:
+                start = sum(len(vo.VAO_ids) for vo in instance.objects[:j])
+                instance_buffer_rows = instance.or_buffer_indices[start : start + len(instance.objects[j].VAO_ids)]
+            buffer_rows.extend(instance_buffer_rows)
+            pose_rows.extend([row] * len(instance_buffer_rows))
+        self.sync_buffer_table = (
+            self.renderer.trans_data,
+            np.array(buffer_rows, dtype=int),
+            np.array(pose_rows, dtype=int),
+        )
+
+    def update_positions_batched(self, force_sync=False):
+        """
+        Update positions of all dynamic instances in renderer. Only the bodies reported awake by the activation
+        tracker are queried, once for the states of all their links, and all the poses are converted to matrices in
+        one call. When the optimized renderer buffers exist, the poses are also written straight into them.
+
+        :param force_sync: whether to update the positions of sleeping bodies as well
+        :return: number of instance parts that are awake and have been updated
+        """
+        if self.sync_table is None or self.sync_table_num_instances != len(self.renderer.instances):
+            self.build_sync_table()
+        table = self.sync_table
+
+        positions = np.zeros((table["num_rows"], 3))
+        orientations = np.zeros((table["num_rows"], 4))
+        orientations[:, 3] = 1.0
+        awake = np.zeros(table["num_rows"], dtype=bool)
+        awake_bodies = None
+        if not self.first_sync and not force_sync:
+            awake_bodies = self.activation_tracker.get_awake_bodies()
+        self.activation_tracker.clear_woken_bodies()
+        for body_id, base_row, link_ids, link_rows in table["bodies"]:
+            if awake_bodies is not None and body_id not in awake_bodies:
+                continue
+
+            if base_row is not None:
+                positions[base_row], orientations[base_row] = p.getBasePositionAndOrientation(body_id)
+                awake[base_row] = True
+            if link_ids:
+                link_states = p.getLinkStates(body_id, link_ids)
+                positions[link_rows] = [link_state[0] for link_state in link_states]
+                orientations[link_rows] = [link_state[1] for link_state in link_states]
+                awake[link_rows] = True
+
+        if not np.any(awake):
+            return 0
+
+        trans = xyz2mat_batch(positions)
+        rots = quat2rotmat_batch(xyzw2wxyz_batch(orientations))
+
+        # Copy the per-part matrices so that the instances do not keep the whole batch alive
+        awake_parts = np.flatnonzero(awake[table["part_rows"]])
+        for k in awake_parts:
+            instance = table["part_instances"][k]
+            j = table["part_indices"][k]
+            row = table["part_rows"][k]
+            if j is None:
+                instance.last_trans = instance.pose_trans
+                instance.last_rot = instance.pose_rot
+                instance.pose_trans = trans[row].copy()
+                instance.pose_rot = rots[row].copy()
+            else:
+                instance.last_trans[j] = instance.poses_trans[j]
+                instance.last_rot[j] = instance.poses_rot[j]
+                instance.poses_trans[j] = trans[row].copy()
+                instance.poses_rot[j] = rots[row].copy()
+
+        if self.renderer.optimized and self.renderer.trans_data is not None:
+            if self.sync_buffer_table is None or self.sync_buffer_table[0] is not self.renderer.trans_data:
+                self.build_sync_buffer_table()
+            _, buffer_rows, pose_rows = self.sync_buffer_table
+            buffer_awake = awake[pose_rows]
+            self.renderer.trans_data[buffer_rows[buffer_awake]] = trans[pose_rows[buffer_awake]]
+            self.renderer.rot_data[buffer_rows[buffer_awake]] = rots[pose_rows[buffer_awake]]
+            self.renderer.dynamic_positions_synced = True
+
+        return len(awake_parts)
+
     def isconnected(self):
         """
         :return: pybullet is alive
@@ -1835,6 +2181,7 @@ class Simulator:
             # print("******************PyBullet Logging Information:")
             p.resetSimulation(physicsClientId=self.cid)
             p.disconnect(self.cid)
+            self.activation_tracker.untrack_all()
             # print("PyBullet Logging Information******************")
         self.renderer.release()
 
@@ -1845,3 +2192,4 @@ class Simulator:
         if self.isconnected():
             p.resetSimulation(physicsClientId=self.cid)
             p.disconnect(self.cid)
+            self.activation_tracker.untrack_all()
@@ -1,9 +1,7 @@
 import numpy as np
-import pybullet as p
 
 from igibson.robots.turtlebot_robot import Turtlebot
 from igibson.tasks.point_nav_random_task import PointNavRandomTask
-from igibson.utils.utils import restoreState
 
 
 class DynamicNavRandomTask(PointNavRandomTask):
@@ -43,13 +41,10 @@ class DynamicNavRandomTask(PointNavRandomTask):
         """
         max_trials = 100
         for robot in self.dynamic_objects:
-            # TODO: p.saveState takes a few seconds, need to speed up
-            state_id = p.saveState()
             for _ in range(max_trials):
                 _, pos = env.scene.get_random_point(floor=self.floor_num)
                 orn = np.array([0, 0, np.random.uniform(0, np.pi * 2)])
                 reset_success = env.test_valid_position(robot, pos, orn)
-                restoreState(state_id)
                 if reset_success:
                     break
 
@@ -58,8 +53,6 @@ class DynamicNavRandomTask(PointNavRandomTask):
 
             env.land(robot, pos, orn)
 
-            p.removeState(state_id)
-
     def reset_scene(self, env):
         """
         Task-specific scene reset: reset the dynamic objects after scene and agent reset
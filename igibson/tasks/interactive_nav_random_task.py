@@ -1,9 +1,7 @@
 import numpy as np
-import pybullet as p
 
 from igibson.objects.ycb_object import YCBObject
 from igibson.tasks.point_nav_random_task import PointNavRandomTask
-from igibson.utils.utils import restoreState
 
 
 class InteractiveNavRandomTask(PointNavRandomTask):
@@ -48,13 +46,10 @@ class InteractiveNavRandomTask(PointNavRandomTask):
         max_trials = 100
 
         for obj in self.interactive_objects:
-            # TODO: p.saveState takes a few seconds, need to speed up
-            state_id = p.saveState()
             for _ in range(max_trials):
                 _, pos = env.scene.get_random_point(floor=self.floor_num)
                 orn = np.array([0, 0, np.random.uniform(0, np.pi * 2)])
                 reset_success = env.test_valid_position(obj, pos, orn)
-                restoreState(state_id)
                 if reset_success:
                     break
 
@@ -63,8 +58,6 @@ class InteractiveNavRandomTask(PointNavRandomTask):
 
             env.land(obj, pos, orn)
 
-            p.removeState(state_id)
-
     def reset_scene(self, env):
         """
         Task-specific scene reset: reset the interactive objects after scene and agent reset
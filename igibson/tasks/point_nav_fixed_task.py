@@ -97,13 +97,14 @@ class PointNavFixedTask(BaseTask):
 
     def get_geodesic_potential(self, env):
         """
-        Get potential based on geodesic distance
+        Get potential based on geodesic distance, looked up in the cached distance field of the target position
 
         :param env: environment instance
         :return: geodesic distance to the target position
         """
-        _, geodesic_dist = self.get_shortest_path(env)
-        return geodesic_dist
+        source = env.robots[0].get_position()[:2]
+        target = self.target_pos[:2]
+        return env.scene.get_geodesic_distance(self.floor_num, source, target)
 
     def get_l2_potential(self, env):
         """
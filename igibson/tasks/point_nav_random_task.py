@@ -1,10 +1,9 @@
 import logging
 
 import numpy as np
-import pybullet as p
 
 from igibson.tasks.point_nav_fixed_task import PointNavFixedTask
-from igibson.utils.utils import l2_distance, restoreState
+from igibson.utils.utils import l2_distance
 
 
 class PointNavRandomTask(PointNavFixedTask):
@@ -31,9 +30,8 @@ class PointNavRandomTask(PointNavFixedTask):
         for _ in range(max_trials):
             _, target_pos = env.scene.get_random_point(floor=self.floor_num)
             if env.scene.build_graph:
-                _, dist = env.scene.get_shortest_path(
-                    self.floor_num, initial_pos[:2], target_pos[:2], entire_path=False
-                )
+                # The geodesic distance is symmetric: use the distance field of the initial position for all trials
+                dist = env.scene.get_geodesic_distance(self.floor_num, target_pos[:2], initial_pos[:2])
             else:
                 dist = l2_distance(initial_pos, target_pos)
             if self.target_dist_min < dist < self.target_dist_max:
@@ -62,23 +60,17 @@ class PointNavRandomTask(PointNavFixedTask):
         reset_success = False
         max_trials = 100
 
-        # cache pybullet state
-        # TODO: p.saveState takes a few seconds, need to speed up
-        state_id = p.saveState()
         for i in range(max_trials):
             initial_pos, initial_orn, target_pos = self.sample_initial_pose_and_target_pos(env)
             reset_success = env.test_valid_position(
                 env.robots[0], initial_pos, initial_orn
             ) and env.test_valid_position(env.robots[0], target_pos)
-            restoreState(state_id)
             if reset_success:
                 break
 
         if not reset_success:
             logging.warning("WARNING: Failed to reset robot without collision")
 
-        p.removeState(state_id)
-
         self.target_pos = target_pos
         self.initial_pos = initial_pos
         self.initial_orn = initial_orn
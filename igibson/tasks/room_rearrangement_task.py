@@ -9,7 +9,6 @@ from igibson.tasks.task_base import BaseTask
 from igibson.termination_conditions.max_collision import MaxCollision
 from igibson.termination_conditions.out_of_bound import OutOfBound
 from igibson.termination_conditions.timeout import Timeout
-from igibson.utils.utils import restoreState
 
 
 class RoomRearrangementTask(BaseTask):
@@ -96,13 +95,9 @@ class RoomRearrangementTask(BaseTask):
         reset_success = False
         max_trials = 100
 
-        # cache pybullet state
-        # TODO: p.saveState takes a few seconds, need to speed up
-        state_id = p.saveState()
         for _ in range(max_trials):
             initial_pos, initial_orn = self.sample_initial_pose(env)
             reset_success = env.test_valid_position(env.robots[0], initial_pos, initial_orn)
-            restoreState(state_id)
             if reset_success:
                 break
 
@@ -110,7 +105,6 @@ class RoomRearrangementTask(BaseTask):
             logging.warning("WARNING: Failed to reset robot without collision")
 
         env.land(env.robots[0], initial_pos, initial_orn)
-        p.removeState(state_id)
 
         for reward_function in self.reward_functions:
             reward_function.reset(self, env)
@@ -23,6 +23,24 @@ from igibson.simulator import Simulator
 from igibson.utils.utils import parse_config
 
 
+def get_base_sample_fn(base_limits):
+    def sample_fn():
+        x, y = np.random.uniform(*base_limits)
+        theta = np.random.uniform(*CIRCULAR_LIMITS)
+        return (x, y, theta)
+
+    return sample_fn
+
+
+def get_hand_sample_fn(hand_limits):
+    def sample_fn():
+        x, y, z = np.random.uniform(*hand_limits)
+        r, p, yaw = np.random.uniform((-PI, -PI, -PI), (PI, PI, PI))
+        return (x, y, z, r, p, yaw)
+
+    return sample_fn
+
+
 def plan_base_motion_br(
     robot: BehaviorRobot,
     end_conf,
@@ -35,11 +53,7 @@ def plan_base_motion_br(
     override_sample_fn=None,
     **kwargs
 ):
-    def sample_fn():
-        x, y = np.random.uniform(*base_limits)
-        theta = np.random.uniform(*CIRCULAR_LIMITS)
-        return (x, y, theta)
-
+    sample_fn = get_base_sample_fn(base_limits)
     if override_sample_fn is not None:
         sample_fn = override_sample_fn
 
@@ -129,6 +143,9 @@ def get_hand_distance_fn(weights=1 * np.ones(6)):
         difference = np.array(difference_fn(q2, q1))
         return np.sqrt(np.dot(weights, difference * difference))
 
+    # Metric of the distance, for the nearest neighbor indices of the planners
+    fn.weights = weights
+    fn.circular = (False, False, False, True, True, True)
     return fn
 
 
@@ -142,12 +159,12 @@ def plan_hand_motion_br(
     weights=(1, 1, 1, 5, 5, 5),
     resolutions=0.02 * np.ones(6),
     max_distance=MAX_DISTANCE,
+    override_sample_fn=None,
     **kwargs
 ):
-    def sample_fn():
-        x, y, z = np.random.uniform(*hand_limits)
-        r, p, yaw = np.random.uniform((-PI, -PI, -PI), (PI, PI, PI))
-        return (x, y, z, r, p, yaw)
+    sample_fn = get_hand_sample_fn(hand_limits)
+    if override_sample_fn is not None:
+        sample_fn = override_sample_fn
 
     difference_fn = get_hand_difference_fn()
     distance_fn = get_hand_distance_fn(weights=weights)
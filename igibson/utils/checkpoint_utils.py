@@ -1,6 +1,9 @@
 """This file contains utils for BEHAVIOR demo replay checkpoints."""
 import json
 import os
+import pickle
+import tempfile
+from collections import OrderedDict
 
 import pybullet as p
 
@@ -56,3 +59,150 @@ def load_internal_states(simulator, dump):
     robot_dumps = dump["robots"]
     for robot, robot_dump in zip(simulator.robots, robot_dumps):
         robot.load_state(robot_dump)
+
+
+class CheckpointManager(object):
+    """
+    In-memory checkpoints of a simulator, keyed by frame. The physics state of a checkpoint is kept by pybullet
+    (p.saveState) and its internal states as a pickled dump, so that saving and restoring never touch the disk.
+
+    At most max_checkpoints checkpoints are kept, the least recently saved or restored one being evicted first.
+    Checkpoints are only written to disk on request, with spill.
+    """
+
+    def __init__(self, simulator, max_checkpoints=100):
+        """
+        :param simulator: Simulator object
+        :param max_checkpoints: maximum number of checkpoints kept in memory
+        """
+        self.simulator = simulator
+        self.max_checkpoints = max_checkpoints
+        # Frame -> (pybullet state id, pickled internal states), in LRU order
+        self.checkpoints = OrderedDict()
+
+    def save(self, frame=None):
+        """
+        Save a checkpoint of the current state
+
+        :param frame: frame of the checkpoint, the current frame of the simulator by default
+        :return: frame of the checkpoint
+        """
+        if frame is None:
+            frame = self.simulator.frame_count
+        dump = pickle.dumps(save_internal_states(self.simulator), protocol=pickle.HIGHEST_PROTOCOL)
+        self.add(frame, p.saveState(), dump)
+        return frame
+
+    def add(self, frame, state_id, dump):
+        """
+        Add a checkpoint, replacing the checkpoint of the same frame and evicting the least recently used
+        checkpoints if needed
+
+        :param frame: frame of the checkpoint
+        :param state_id: pybullet state id of the physics state
+        :param dump: pickled internal states
+        """
+        self.drop(frame)
+        self.checkpoints[frame] = (state_id, dump)
+        while len(self.checkpoints) > self.max_checkpoints:
+            self.drop(next(iter(self.checkpoints)))
+
+    def restore(self, frame):
+        """
+        Restore the state of a checkpoint
+
+        :param frame: frame of the checkpoint
+        """
+        if frame not in self.checkpoints:
+            raise KeyError("No checkpoint for frame {}".format(frame))
+        self.checkpoints.move_to_end(frame)
+        state_id, dump = self.checkpoints[frame]
+        restoreState(state_id)
+        load_internal_states(self.simulator, pickle.loads(dump))
+
+    def drop(self, frame):
+        """
+        Drop a checkpoint, if any, and free its physics state
+
+        :param frame: frame of the checkpoint
+        """
+        if frame in self.checkpoints:
+            state_id, _ = self.checkpoints.pop(frame)
+            p.removeState(state_id)
+
+    def clear(self):
+        """
+        Drop all the checkpoints
+        """
+        for frame in list(self.checkpoints.keys()):
+            self.drop(frame)
+
+    def get_frames(self):
+        """
+        :return: sorted frames of the checkpoints
+        """
+        return sorted(self.checkpoints.keys())
+
+    def get_stats(self):
+        """
+        Memory usage of the checkpoints. The physics states are stored inside pybullet and are only counted.
+
+        :return: dict of statistics
+        """
+        internal_state_bytes = sum(len(dump) for _, dump in self.checkpoints.values())
+        return {
+            "num_checkpoints": len(self.checkpoints),
+            "max_checkpoints": self.max_checkpoints,
+            "internal_state_bytes": internal_state_bytes,
+            "mean_internal_state_bytes": internal_state_bytes / max(len(self.checkpoints), 1),
+        }
+
+    def spill(self, path, frames=None):
+        """
+        Write checkpoints to a single binary file, with the .bullet content and the pickled internal states of each
+        checkpoint. The state of the simulator is left unchanged.
+
+        :param path: path of the file to write
+        :param frames: frames of the checkpoints to write, all of them by default
+        """
+        if frames is None:
+            frames = self.get_frames()
+        current_state_id = p.saveState()
+        try:
+            checkpoints = {}
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                for frame in frames:
+                    bullet_path = os.path.join(tmp_dir, "%d.bullet" % frame)
+                    state_id, dump = self.checkpoints[frame]
+                    # p.saveBullet only saves the current physics state
+                    p.restoreState(state_id)
+                    p.saveBullet(bullet_path)
+                    with open(bullet_path, "rb") as f:
+                        checkpoints[frame] = (f.read(), dump)
+            with open(path, "wb") as f:
+                pickle.dump(checkpoints, f, protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            restoreState(current_state_id)
+            p.removeState(current_state_id)
+
+    def load(self, path):
+        """
+        Load the checkpoints of a file written by spill. The state of the simulator is left unchanged.
+
+        :param path: path of the file to read
+        """
+        with open(path, "rb") as f:
+            checkpoints = pickle.load(f)
+        current_state_id = p.saveState()
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                for frame, (bullet, dump) in sorted(checkpoints.items()):
+                    # pybullet caches the .bullet files it reads by path, so every checkpoint needs its own path
+                    bullet_path = os.path.join(tmp_dir, "%d.bullet" % frame)
+                    with open(bullet_path, "wb") as f:
+                        f.write(bullet)
+                    p.restoreState(fileName=bullet_path)
+                    self.add(frame, p.saveState(), dump)
+        finally:
+            restoreState(current_state_id)
+            p.removeState(current_state_id)
@@ -5,7 +5,10 @@ can be used to write regular logs, iGATUS task logs or VR logs to HDF5 for savin
 
 import copy
 import datetime
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
 
 import h5py
 import numpy as np
@@ -28,8 +31,14 @@ class IGLogWriter(object):
 
     3) After simulation, before disconnecting from PyBullet sever:
     end_log_session
+
+    With async_write, the data map is double buffered: a filled data map is handed to a writer thread, and the
+    next frames are stored in the other one while it is written to HDF5.
     """
 
+    # Lossless compression filters supported by h5py out of the box
+    COMPRESSION_FILTERS = [None, "gzip", "lzf"]
+
     def __init__(
         self,
         sim,
@@ -41,6 +50,10 @@ class IGLogWriter(object):
         filter_objects=True,
         profiling_mode=False,
         log_status=True,
+        async_write=False,
+        compression=None,
+        compact_dtypes=False,
+        awake_only=False,
     ):
         """
         Initializes IGLogWriter
@@ -53,7 +66,14 @@ class IGLogWriter(object):
         :param filter_objects: whether to filter objects
         :param profiling_mode: whether to print out how much time each log-write takes
         :param log_status: whether to log status updates to the console
+        :param async_write: whether to write to HDF5 on a background thread, so that process_frame does not block
+        :param compression: lossless compression filter of the datasets, None | gzip | lzf
+        :param compact_dtypes: whether to store physics data as float32 and goal status and VR event bits as int8,
+            instead of float64
+        :param awake_only: whether to only query the physics data of the bodies that are awake, the other bodies keep
+            their last known values and are marked as such in physics_awake
         """
+        assert compression in self.COMPRESSION_FILTERS, "unsupported compression filter: {}".format(compression)
         self.sim = sim
         # The number of frames to store data on the stack before writing to HDF5.
         # We buffer and flush data like this to cause a small an impact as possible
@@ -63,6 +83,15 @@ class IGLogWriter(object):
         self.filter_objects = filter_objects
         self.profiling_mode = profiling_mode
         self.log_status = log_status
+        self.async_write = async_write
+        self.compression = compression
+        self.compact_dtypes = compact_dtypes
+        self.awake_only = awake_only
+        # Writer thread state, used with async_write
+        self.write_thread = None
+        self.write_queue = None
+        self.free_data_maps = None
+        self.write_error = None
         # Reuse online checking calls
         self.task = task
         self.store_vr = store_vr
@@ -82,6 +111,19 @@ class IGLogWriter(object):
             self.tracked_objects = [p.getBodyUniqueId(i) for i in range(p.getNumBodies())]
 
         self.joint_map = {bid: p.getNumJoints(bid) for bid in self.tracked_objects}
+        self.joint_indices = {bid: list(range(self.joint_map[bid])) for bid in self.tracked_objects}
+        # Column layout of the physics buffer: position (3), orientation (4) and joint positions of every body
+        self.physics_columns = {}
+        self.num_physics_columns = 0
+        for bid in self.tracked_objects:
+            self.physics_columns[bid] = self.num_physics_columns
+            self.num_physics_columns += 7 + self.joint_map[bid]
+        # Last known physics data of every body, and bodies that have been queried at least once
+        self.last_physics_data = None
+        self.captured_bodies = set()
+        if self.awake_only:
+            for bid in self.tracked_objects:
+                self.sim.activation_tracker.track_body(bid)
         # Sentinel that indicates a certain value was not set in the HDF5
         self.default_fill_sentinel = -1.0
         # Numpy dtype common to all values
@@ -108,6 +150,8 @@ class IGLogWriter(object):
             base = ["physics_data", obj]
             for registered_property in ["position", "orientation", "joint_state"]:
                 self.name_path_data.append(copy.deepcopy(base) + [registered_property])
+        if self.awake_only:
+            self.name_path_data.append(["physics_awake"])
 
         if self.task:
             self.name_path_data.extend([["goal_status", "satisfied"], ["goal_status", "unsatisfied"]])
@@ -153,14 +197,12 @@ class IGLogWriter(object):
                 "unsatisfied": np.full((self.frames_before_write, self.total_goals), self.default_fill_sentinel),
             }
 
-        self.data_map["physics_data"] = dict()
-        for bid in self.tracked_objects:
-            obj = str(bid)
-            self.data_map["physics_data"][obj] = dict()
-            handle = self.data_map["physics_data"][obj]
-            handle["position"] = np.full((self.frames_before_write, 3), self.default_fill_sentinel)
-            handle["orientation"] = np.full((self.frames_before_write, 4), self.default_fill_sentinel)
-            handle["joint_state"] = np.full((self.frames_before_write, self.joint_map[bid]), self.default_fill_sentinel)
+        self.data_map["physics_buffer"], self.data_map["physics_data"] = self.create_physics_data_map()
+        self.last_physics_data = np.full(self.num_physics_columns, self.default_fill_sentinel)
+        if self.awake_only:
+            self.data_map["physics_awake"] = np.full(
+                (self.frames_before_write, len(self.tracked_objects)), self.default_fill_sentinel
+            )
 
         if self.store_vr:
             self.data_map["vr"] = {
@@ -225,6 +267,29 @@ class IGLogWriter(object):
                 "vr_robot": np.full((self.frames_before_write, 28), self.default_fill_sentinel, dtype=self.np_dtype)
             }
 
+    def create_physics_data_map(self):
+        """Creates the (frames, total_dofs) physics buffer, and the per-body datasets of the data map as views of
+        its columns."""
+        physics_buffer = np.full((self.frames_before_write, self.num_physics_columns), self.default_fill_sentinel)
+        physics_data = dict()
+        for bid in self.tracked_objects:
+            start = self.physics_columns[bid]
+            physics_data[str(bid)] = {
+                "position": physics_buffer[:, start : start + 3],
+                "orientation": physics_buffer[:, start + 3 : start + 7],
+                "joint_state": physics_buffer[:, start + 7 : start + 7 + self.joint_map[bid]],
+            }
+        return physics_buffer, physics_data
+
+    def copy_data_map(self):
+        """Creates another data map with the same layout as self.data_map."""
+        data_map = copy.deepcopy(
+            {key: value for key, value in self.data_map.items() if key not in ["physics_buffer", "physics_data"]}
+        )
+        # The per-body datasets need to stay views of the physics buffer
+        data_map["physics_buffer"], data_map["physics_data"] = self.create_physics_data_map()
+        return data_map
+
     def register_action(self, action_path, action_shape):
         """Registers an action to be saved every frame in the VRLogWriter.
 
@@ -266,9 +331,19 @@ class IGLogWriter(object):
             curr_data_shape = (0,) + self.get_data_for_name_path(name_path).shape[1:]
             # None as first shape value allows dataset to grow without bound through time
             max_shape = (None,) + curr_data_shape[1:]
+            # Each write appends one chunk of self.frames_before_write rows, datasets with no values are not chunked
+            chunk_shape = (self.frames_before_write,) + curr_data_shape[1:]
+            if np.prod(chunk_shape) == 0:
+                chunk_shape = None
             # Create_dataset with a '/'-joined path automatically creates the required groups
-            # Important note: we store values with double precision to avoid truncation
-            hf.create_dataset(joined_path, curr_data_shape, maxshape=max_shape, dtype=np.float64)
+            hf.create_dataset(
+                joined_path,
+                curr_data_shape,
+                maxshape=max_shape,
+                dtype=self.get_dtype_for_name_path(name_path),
+                chunks=chunk_shape,
+                compression=self.compression if chunk_shape else None,
+            )
 
         hf.close()
         # Now open in r+ mode to append to the file
@@ -290,10 +365,31 @@ class IGLogWriter(object):
         if self.store_vr:
             self.hf.attrs["/metadata/vr_settings"] = self.sim.vr_settings.dump_vr_settings()
 
-    def get_data_for_name_path(self, name_path):
+        if self.async_write:
+            # Double buffering: frames are stored in one data map while the other one is written
+            self.write_queue = Queue()
+            self.free_data_maps = Queue()
+            self.free_data_maps.put(self.copy_data_map())
+            self.write_thread = threading.Thread(target=self.write_loop, daemon=True)
+            self.write_thread.start()
+
+    def get_dtype_for_name_path(self, name_path):
+        """Returns the dtype of the HDF5 dataset of a name path.
+        Important note: by default we store values with double precision to avoid truncation"""
+        if self.compact_dtypes:
+            if name_path[0] == "physics_data":
+                return np.float32
+            # Binary values, which keep the -1 sentinel
+            if name_path[0] == "goal_status" or name_path[:2] == ["vr", "vr_event_data"]:
+                return np.int8
+        if name_path[0] == "physics_awake":
+            return np.int8
+        return np.float64
+
+    def get_data_for_name_path(self, name_path, data_map=None):
         """Resolves a list of names (group/dataset) into a numpy array.
         eg. [vr, vr_camera, right_eye_view] -> self.data_map['vr']['vr_camera']['right_eye_view']"""
-        next_data = self.data_map
+        next_data = self.data_map if data_map is None else data_map
         for name in name_path:
             next_data = next_data[name]
 
@@ -422,32 +518,41 @@ class IGLogWriter(object):
         self.data_map["vr"]["vr_event_data"]["reset_actions"][self.frame_counter, ...] = np.array(reset_actions)
 
     def write_pybullet_data_to_map(self):
-        """Write all pybullet data to the class' internal map."""
-        if self.task and self.filter_objects:
-            for obj_bid, obj in self.tracked_objects.items():
-                obj_name = str(obj_bid)
+        """Write all pybullet data to the class' internal map.
+        Each body takes one pose query and one joint state query, and the frame is
+        written to the physics buffer as a single row. With awake_only, the bodies
+        that did not move since the last frame keep their last known values."""
+        if self.awake_only:
+            tracker = self.sim.activation_tracker
+            moving_bodies = tracker.get_awake_bodies() | tracker.newly_asleep_bodies
+            awake = self.data_map["physics_awake"][self.frame_counter]
+
+        row = self.last_physics_data
+        for i, bid in enumerate(self.tracked_objects):
+            if self.awake_only:
+                if bid in self.captured_bodies and bid not in moving_bodies:
+                    awake[i] = 0
+                    continue
+                awake[i] = 1
+                self.captured_bodies.add(bid)
+
+            if self.task and self.filter_objects:
+                obj = self.tracked_objects[bid]
                 # TODO: currently we must hack around storing object pose for multiplexed objects
                 try:
                     pos, orn = obj.get_position_orientation()
-                except ValueError as e:
+                except ValueError:
                     pos, orn = obj.objects[0].get_position_orientation()
-
-                handle = self.data_map["physics_data"][obj_name]
-                handle["position"][self.frame_counter] = pos
-                handle["orientation"][self.frame_counter] = orn
-                handle["joint_state"][self.frame_counter] = np.array(
-                    [p.getJointState(obj_bid, n)[0] for n in range(self.joint_map[obj_bid])]
-                )
-        else:
-            for bid in self.tracked_objects:
-                obj_name = str(bid)
+            else:
                 pos, orn = p.getBasePositionAndOrientation(bid)
-                handle = self.data_map["physics_data"][obj_name]
-                handle["position"][self.frame_counter] = pos
-                handle["orientation"][self.frame_counter] = orn
-                handle["joint_state"][self.frame_counter] = np.array(
-                    [p.getJointState(bid, n)[0] for n in range(self.joint_map[bid])]
-                )
+
+            values = list(pos) + list(orn)
+            if self.joint_map[bid] > 0:
+                values.extend(joint_state[0] for joint_state in p.getJointStates(bid, self.joint_indices[bid]))
+            start = self.physics_columns[bid]
+            row[start : start + len(values)] = values
+
+        self.data_map["physics_buffer"][self.frame_counter] = row
 
     def _print_pybullet_data(self):
         """Print pybullet debug data - hidden API since this is used for debugging purposes only."""
@@ -505,51 +610,169 @@ class IGLogWriter(object):
             # We have accumulated enough data, which we will write to hd5
             self.write_to_hd5()
 
-    def refresh_data_map(self):
+    def refresh_data_map(self, data_map=None):
         """Resets all values stored in self.data_map to the default sentinel value.
         This function is called after we have written the last self.frames_before_write
         frames to HDF5 and can start inputting new frame data into the data map."""
         for name_path in self.name_path_data:
-            np_data = self.get_data_for_name_path(name_path)
+            np_data = self.get_data_for_name_path(name_path, data_map)
             np_data.fill(self.default_fill_sentinel)
 
     def write_to_hd5(self):
         """Writes data stored in self.data_map to hd5.
         The data is saved each time this function is called, so data
-        will be saved even if a Ctrl+C event interrupts the program."""
+        will be saved even if a Ctrl+C event interrupts the program.
+        With async_write, the data map is handed to the writer thread and
+        swapped with a free one instead."""
         if self.log_status:
             print("----- Writing log data to hd5 on frame: {0} -----".format(self.persistent_frame_count))
+        if self.async_write:
+            self.check_write_error()
+            self.write_queue.put(self.data_map)
+            # Only blocks if the writer thread is still busy with the previous data map
+            self.data_map = self.free_data_maps.get()
+            return
+
         start_time = time.time()
+        self.write_data_map_to_hd5(self.data_map)
+        self.refresh_data_map()
+        delta = time.time() - start_time
+        if self.profiling_mode:
+            print("Time to write: {0}".format(delta))
+
+    def write_data_map_to_hd5(self, data_map):
+        """Appends the self.frames_before_write frames of a data map to the HDF5 datasets."""
         for name_path in self.name_path_data:
             curr_dset = self.hf["/".join(name_path)]
             # Resize to accommodate new data
             curr_dset.resize(curr_dset.shape[0] + self.frames_before_write, axis=0)
             # Set last self.frames_before_write rows to numpy data from data map
-            curr_dset[-self.frames_before_write :, ...] = self.get_data_for_name_path(name_path)
-
-        self.refresh_data_map()
-        delta = time.time() - start_time
-        if self.profiling_mode:
-            print("Time to write: {0}".format(delta))
+            curr_dset[-self.frames_before_write :, ...] = self.get_data_for_name_path(name_path, data_map)
+
+    def write_loop(self):
+        """Writer thread loop: writes the filled data maps to HDF5 until it receives None."""
+        while True:
+            data_map = self.write_queue.get()
+            if data_map is None:
+                break
+            try:
+                start_time = time.time()
+                self.write_data_map_to_hd5(data_map)
+                if self.profiling_mode:
+                    print("Time to write: {0}".format(time.time() - start_time))
+            except Exception as e:
+                self.write_error = e
+            self.refresh_data_map(data_map)
+            self.free_data_maps.put(data_map)
+
+    def check_write_error(self):
+        """Re-raises an error of the writer thread in the simulation thread."""
+        if self.write_error is not None:
+            error, self.write_error = self.write_error, None
+            raise error
 
     def end_log_session(self):
         """Closes hdf5 log file at end of logging session."""
         if self.log_status:
             print("IG LOGGER INFO: Ending log writing session after {} frames".format(self.persistent_frame_count))
+        if self.write_thread is not None:
+            # Wait for the pending writes
+            self.write_queue.put(None)
+            self.write_thread.join()
+            self.write_thread = None
         self.hf.close()
+        self.check_write_error()
+
+
+class PrefetchedDataset(object):
+    """Read-only view of an HDF5 dataset that reads whole blocks of frames at once,
+    and prefetches the next block on a background thread while the current one is consumed."""
+
+    def __init__(self, dataset, block_size, executor):
+        """
+        :param dataset: h5py dataset, with frames along the first axis
+        :param block_size: number of frames per block
+        :param executor: executor of the block reads
+        """
+        self.dataset = dataset
+        self.block_size = block_size
+        self.executor = executor
+        self.shape = dataset.shape
+        self.dtype = dataset.dtype
+        self.num_blocks = (self.shape[0] + block_size - 1) // block_size
+        # Block index -> future of the block, only the current and the next blocks are kept
+        self.blocks = {}
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, index):
+        """Integer frame indices are served from the blocks, anything else (e.g. ranges of frames) reads the
+        dataset directly."""
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += self.shape[0]
+            return self.get_block(index // self.block_size)[index % self.block_size]
+        return self.dataset[index]
+
+    def read_block(self, block_index):
+        return self.dataset[block_index * self.block_size : (block_index + 1) * self.block_size]
+
+    def get_block(self, block_index):
+        """Returns a block of frames, and starts prefetching the next one."""
+        if block_index not in self.blocks:
+            self.blocks[block_index] = self.executor.submit(self.read_block, block_index)
+        next_block_index = block_index + 1
+        if next_block_index < self.num_blocks and next_block_index not in self.blocks:
+            self.blocks[next_block_index] = self.executor.submit(self.read_block, next_block_index)
+        for cached_block_index in list(self.blocks.keys()):
+            if cached_block_index != block_index and cached_block_index != next_block_index:
+                del self.blocks[cached_block_index]
+        return self.blocks[block_index].result()
+
+
+class PrefetchedFile(object):
+    """Read-only view of an HDF5 file whose datasets are PrefetchedDatasets, indexed by /-separated path."""
+
+    def __init__(self, hf, block_size):
+        """
+        :param hf: h5py file
+        :param block_size: number of frames per block
+        """
+        self.hf = hf
+        self.block_size = block_size
+        # A single reader thread, since h5py serializes the HDF5 calls anyway
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.datasets = {}
+
+    def __contains__(self, path):
+        return path in self.hf
+
+    def __getitem__(self, path):
+        if path not in self.datasets:
+            self.datasets[path] = PrefetchedDataset(self.hf[path], self.block_size, self.executor)
+        return self.datasets[path]
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.datasets = {}
 
 
 class IGLogReader(object):
-    def __init__(self, log_filepath, log_status=True):
+    def __init__(self, log_filepath, log_status=True, block_size=0):
         """
         :param log_filepath: path for logging files to be read from
         :param log_status: whether to print status updates to the command line
+        :param block_size: number of frames read at once for each dataset, the next block being prefetched on a
+            background thread. 0 reads the values one frame at a time
         """
         self.log_filepath = log_filepath
         self.log_status = log_status
         # Frame counter keeping track of how many frames have been reproduced
         self.frame_counter = -1
         self.hf = h5py.File(self.log_filepath, "r")
+        # Source of all the per-frame reads
+        self.data = PrefetchedFile(self.hf, block_size) if block_size > 0 else self.hf
         self.pb_ids = [p.getBodyUniqueId(i) for i in range(p.getNumBodies())]
         # Get total frame num (dataset row length) from an arbitary dataset
         self.total_frame_num = self.hf["frame_data"].shape[0]
@@ -594,9 +817,9 @@ class IGLogReader(object):
         """Sets camera based on saved camera matrices. Only valid if VR was used to save a demo.
         :param sim: Simulator object
         """
-        sim.renderer.V = self.hf["vr/vr_camera/right_eye_view"][self.frame_counter]
-        sim.renderer.P = self.hf["vr/vr_camera/right_eye_proj"][self.frame_counter]
-        right_cam_pos = self.hf["vr/vr_camera/right_camera_pos"][self.frame_counter]
+        sim.renderer.V = self.data["vr/vr_camera/right_eye_view"][self.frame_counter]
+        sim.renderer.P = self.data["vr/vr_camera/right_eye_proj"][self.frame_counter]
+        right_cam_pos = self.data["vr/vr_camera/right_camera_pos"][self.frame_counter]
         sim.renderer.camera = right_cam_pos
         sim.renderer.set_light_position_direction(
             [right_cam_pos[0], right_cam_pos[1], 10], [right_cam_pos[0], right_cam_pos[1], 0]
@@ -609,37 +832,39 @@ class IGLogReader(object):
         its actions for a single frame.
         """
         # Update VrData with new HF data
-        self.vr_data.refresh_action_replay_data(self.hf, self.frame_counter)
+        self.vr_data.refresh_action_replay_data(self.data, self.frame_counter)
         return self.vr_data
 
-    def get_agent_action(self, agent_name):
+    def get_agent_action(self, agent_name, frame=None):
         """
-        Gets action for agent with a specific name.
+        Gets action for agent with a specific name, for the current frame or the given frame index or slice.
         """
         agent_action_path = "agent_actions/{}".format(agent_name)
         if agent_action_path not in self.hf:
             raise RuntimeError("Unable to find agent action path: {} in saved HDF5 file".format(agent_action_path))
-        return self.hf[agent_action_path][self.frame_counter]
+        return self.data[agent_action_path][self.frame_counter if frame is None else frame]
 
-    def read_value(self, value_path):
+    def read_value(self, value_path, frame=None):
         """Reads any saved value at value_path for the current frame.
 
         Args:
             value_path: /-separated string representing the value to fetch. This should be one of the
             values list in the comment at the top of this file.
             Eg. vr/vr_button_data/right_controller
+            frame: frame index or slice of frames to read instead of the current frame
         """
-        return self.hf[value_path][self.frame_counter]
+        return self.data[value_path][self.frame_counter if frame is None else frame]
 
-    def read_action(self, action_path):
+    def read_action(self, action_path, frame=None):
         """Reads the action at action_path for the current frame.
 
         Args:
             action_path: /-separated string representing the action to fetch. This should match
                 an action that was previously registered with the VRLogWriter during data saving
+            frame: frame index or slice of frames to read instead of the current frame
         """
         full_action_path = "action/" + action_path
-        return self.hf[full_action_path][self.frame_counter]
+        return self.data[full_action_path][self.frame_counter if frame is None else frame]
 
     def get_data_left_to_read(self):
         """Returns whether there is still data left to read."""
@@ -651,6 +876,8 @@ class IGLogReader(object):
 
     def end_log_session(self):
         """Call this once reading has finished to clean up resources used."""
+        if isinstance(self.data, PrefetchedFile):
+            self.data.close()
         self.hf.close()
 
         if self.log_status:
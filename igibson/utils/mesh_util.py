@@ -16,6 +16,14 @@ def xyzw2wxyz(orn):
     return [orn[-1], orn[0], orn[1], orn[2]]
 
 
+def xyzw2wxyz_batch(orns):
+    """
+    :param orns: (N, 4) array of quaternions in xyzw
+    :return: (N, 4) array of quaternions in wxyz
+    """
+    return np.asarray(orns)[..., [3, 0, 1, 2]]
+
+
 def frustum(left, right, bottom, top, znear, zfar):
     """Create view frustum matrix."""
     assert right != left
@@ -224,12 +232,58 @@ def quat2rotmat(quat):
     return rot_mat
 
 
+def quat2rotmat_batch(quats):
+    """
+    Batched version of quat2rotmat
+
+    :param quats: (N, 4) array of quaternions in w,x,y,z
+    :return: (N, 4, 4) array of rotation matrices
+    """
+    quats = np.asarray(quats, dtype=np.float64)
+    w, x, y, z = quats[:, 0], quats[:, 1], quats[:, 2], quats[:, 3]
+    # Same normalization as transforms3d.quaternions.quat2mat, degenerate quaternions map to identity
+    norm_sq = np.einsum("ij,ij->i", quats, quats)
+    valid = norm_sq >= np.finfo(np.float64).eps
+    s = np.where(valid, 2.0 / np.where(valid, norm_sq, 1.0), 0.0)
+    X, Y, Z = x * s, y * s, z * s
+    wX, wY, wZ = w * X, w * Y, w * Z
+    xX, xY, xZ = x * X, x * Y, x * Z
+    yY, yZ, zZ = y * Y, y * Z, z * Z
+
+    rot_mats = np.zeros((quats.shape[0], 4, 4))
+    rot_mats[:, 0, 0] = 1.0 - (yY + zZ)
+    rot_mats[:, 0, 1] = xY - wZ
+    rot_mats[:, 0, 2] = xZ + wY
+    rot_mats[:, 1, 0] = xY + wZ
+    rot_mats[:, 1, 1] = 1.0 - (xX + zZ)
+    rot_mats[:, 1, 2] = yZ - wX
+    rot_mats[:, 2, 0] = xZ - wY
+    rot_mats[:, 2, 1] = yZ + wX
+    rot_mats[:, 2, 2] = 1.0 - (xX + yY)
+    rot_mats[:, 3, 3] = 1.0
+    return rot_mats
+
+
 def xyz2mat(xyz):
     trans_mat = np.eye(4)
     trans_mat[-1, :3] = xyz
     return trans_mat
 
 
+def xyz2mat_batch(xyzs):
+    """
+    Batched version of xyz2mat
+
+    :param xyzs: (N, 3) array of positions
+    :return: (N, 4, 4) array of translation matrices
+    """
+    xyzs = np.asarray(xyzs)
+    trans_mats = np.zeros((xyzs.shape[0], 4, 4))
+    trans_mats[:, [0, 1, 2, 3], [0, 1, 2, 3]] = 1.0
+    trans_mats[:, -1, :3] = xyzs
+    return trans_mats
+
+
 def mat2xyz(mat):
     xyz = mat[-1, :3]
     xyz[np.isnan(xyz)] = 0
@@ -0,0 +1,366 @@
+"""
+Parallel motion planning for the primitives of the BehaviorRobot.
+
+Planning attempts are independent given the state of the world, so the candidates of a primitive (different goal
+samples, different random seeds of BiRRT) are solved at the same time in a pool of worker processes. Each worker keeps
+its own DIRECT pybullet client with a copy of the collision geometry of the world, rebuilt from the snapshot sent with
+every request. Bodies are copied as rigid compound shapes at their current joint positions, which is all the
+BehaviorRobot planners need since they only move the bodies of the robot parts and of the object in hand. The first
+successful plan is returned and the remaining candidates of the request are cancelled.
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import queue
+import random
+
+import numpy as np
+import pybullet as p
+
+from igibson.external.pybullet_tools.utils import CIRCULAR_LIMITS
+from igibson.robots.behavior_robot import (
+    LEFT_HAND_LOC_POSE_TRACKED,
+    LEFT_HAND_LOC_POSE_UNTRACKED,
+    RIGHT_HAND_LOC_POSE_TRACKED,
+    RIGHT_HAND_LOC_POSE_UNTRACKED,
+)
+from igibson.utils.behavior_robot_planning_utils import (
+    get_base_sample_fn,
+    get_hand_sample_fn,
+    plan_base_motion_br,
+    plan_hand_motion_br,
+)
+
+log = logging.getLogger(__name__)
+
+PLANNERS = {"base": plan_base_motion_br, "hand": plan_hand_motion_br}
+
+
+def get_collision_shapes(body_id):
+    """
+    Get the collision shapes of all the links of a body at their current joint positions
+
+    :param body_id: pybullet body id
+    :return: tuple of (geometry type, dimensions, mesh file, position, orientation) shapes, in the frame of the body
+        base as returned by getBasePositionAndOrientation
+    """
+    base_pos, base_orn = p.getBasePositionAndOrientation(body_id)
+    inv_base_pos, inv_base_orn = p.invertTransform(base_pos, base_orn)
+    shapes = []
+    for link in range(-1, p.getNumJoints(body_id)):
+        if link == -1:
+            link_pos, link_orn = base_pos, base_orn
+        else:
+            link_pos, link_orn = p.getLinkState(body_id, link, computeForwardKinematics=True)[:2]
+        for _, _, geometry_type, dimensions, filename, local_pos, local_orn in p.getCollisionShapeData(body_id, link):
+            if geometry_type == p.GEOM_MESH and not os.path.isfile(filename.decode("utf-8")):
+                # Meshes created from vertices or from formats pybullet does not keep the file of are replaced by
+                # their axis-aligned bounding box, which is conservative
+                log.warning("Approximating a collision mesh of body {} link {} by its AABB".format(body_id, link))
+                lower, upper = np.array(p.getAABB(body_id, link))
+                pos, orn = p.multiplyTransforms(inv_base_pos, inv_base_orn, (lower + upper) / 2.0, [0, 0, 0, 1])
+                shapes.append((p.GEOM_BOX, tuple(upper - lower), "", pos, orn))
+                break
+            pos, orn = p.multiplyTransforms(link_pos, link_orn, local_pos, local_orn)
+            pos, orn = p.multiplyTransforms(inv_base_pos, inv_base_orn, pos, orn)
+            shapes.append((geometry_type, tuple(dimensions), filename.decode("utf-8"), pos, orn))
+    # Rounded so that the shapes of a body that only moved compare equal, and are not rebuilt by the workers
+    return tuple(
+        (geometry_type, dimensions, filename, tuple(np.round(pos, 6)), tuple(np.round(orn, 6)))
+        for geometry_type, dimensions, filename, pos, orn in shapes
+    )
+
+
+def get_world_snapshot(body_ids):
+    """
+    :param body_ids: pybullet body ids to copy
+    :return: dictionary of the collision shapes and base poses of the bodies, see get_collision_shapes
+    """
+    return {body_id: (get_collision_shapes(body_id), p.getBasePositionAndOrientation(body_id)) for body_id in body_ids}
+
+
+def create_rigid_body(shapes):
+    """
+    Create a static body with a compound collision shape
+
+    :param shapes: collision shapes, see get_collision_shapes
+    :return: pybullet body id
+    """
+    if len(shapes) == 0:
+        return p.createMultiBody(baseMass=0, baseCollisionShapeIndex=-1)
+    # pybullet only parses lists, of plain floats
+    geometry_types = [int(shape[0]) for shape in shapes]
+    dimensions = [[float(value) for value in shape[1]] for shape in shapes]
+    filenames = [shape[2] for shape in shapes]
+    positions = [[float(value) for value in shape[3]] for shape in shapes]
+    orientations = [[float(value) for value in shape[4]] for shape in shapes]
+    collision_id = p.createCollisionShapeArray(
+        shapeTypes=geometry_types,
+        radii=[
+            dims[1] if geometry_type in [p.GEOM_CAPSULE, p.GEOM_CYLINDER] else dims[0]
+            for geometry_type, dims in zip(geometry_types, dimensions)
+        ],
+        halfExtents=[[value / 2.0 for value in dims] for dims in dimensions],
+        lengths=[dims[0] for dims in dimensions],
+        fileNames=filenames,
+        meshScales=dimensions,
+        planeNormals=dimensions,
+        collisionFramePositions=positions,
+        collisionFrameOrientations=orientations,
+    )
+    return p.createMultiBody(baseMass=0, baseCollisionShapeIndex=collision_id)
+
+
+class RigidBody(object):
+    """
+    Copy of a simulated object in a worker, with the interface of the objects used by the planners
+    """
+
+    def __init__(self, body_id):
+        """
+        :param body_id: pybullet body id in the worker
+        """
+        self.body_id = body_id
+
+    def get_body_id(self):
+        return self.body_id
+
+    def get_position(self):
+        return np.array(p.getBasePositionAndOrientation(self.body_id)[0])
+
+    def get_orientation(self):
+        return np.array(p.getBasePositionAndOrientation(self.body_id)[1])
+
+    def set_position_orientation(self, pos, orn):
+        p.resetBasePositionAndOrientation(self.body_id, pos, orn)
+
+
+class RigidBehaviorRobot(object):
+    """
+    Copy of a BehaviorRobot in a worker: the hands follow the body at their default local poses, as in
+    BehaviorRobot.set_position_orientation
+    """
+
+    def __init__(self, parts, hand_local_poses, initial_z_offset):
+        """
+        :param parts: dictionary of the RigidBody of the body and of the hands
+        :param hand_local_poses: dictionary of the poses of the hands in the body frame
+        :param initial_z_offset: height of the body
+        """
+        self.parts = parts
+        self.hand_local_poses = hand_local_poses
+        self.initial_z_offset = initial_z_offset
+
+    def get_position(self):
+        return self.parts["body"].get_position()
+
+    def get_orientation(self):
+        return self.parts["body"].get_orientation()
+
+    def set_position_orientation(self, pos, orn):
+        self.parts["body"].set_position_orientation(pos, orn)
+        for hand, (local_pos, local_orn) in self.hand_local_poses.items():
+            self.parts[hand].set_position_orientation(*p.multiplyTransforms(pos, orn, local_pos, local_orn))
+
+
+class PlanningCancelled(Exception):
+    pass
+
+
+# State of the worker processes
+_worker = {}
+
+
+def _initialize_worker(cancelled_request):
+    p.connect(p.DIRECT)
+    _worker["cancelled_request"] = cancelled_request
+    _worker["bodies"] = {}
+
+
+def _load_snapshot(snapshot):
+    """
+    Update the bodies of the worker to a world snapshot, only the bodies whose collision shapes changed are rebuilt
+
+    :param snapshot: world snapshot, see get_world_snapshot
+    :return: dictionary from the body ids of the snapshot to the body ids in the worker
+    """
+    bodies = _worker["bodies"]
+    for body_id in list(bodies):
+        if body_id not in snapshot or bodies[body_id][0] != snapshot[body_id][0]:
+            p.removeBody(bodies.pop(body_id)[1])
+    for body_id, (shapes, (pos, orn)) in snapshot.items():
+        if body_id not in bodies:
+            bodies[body_id] = (shapes, create_rigid_body(shapes))
+        p.resetBasePositionAndOrientation(bodies[body_id][1], pos, orn)
+    return {body_id: worker_body_id for body_id, (_, worker_body_id) in bodies.items()}
+
+
+def _solve(request_id, index, planner, snapshot, robot, obj_in_hand, obstacles, kwargs, seed):
+    """
+    Solve a candidate planning problem in a worker
+
+    :return: request id, candidate index and plan, or None if the planning failed or was cancelled
+    """
+    cancelled_request = _worker["cancelled_request"]
+    if request_id <= cancelled_request.value:
+        return request_id, index, None
+    body_ids = _load_snapshot(snapshot)
+    random.seed(seed)
+    np.random.seed(seed)
+
+    parts = {name: RigidBody(body_ids[body_id]) for name, body_id in robot["parts"].items()}
+    rigid_robot = RigidBehaviorRobot(parts, robot["hand_local_poses"], robot["initial_z_offset"])
+    kwargs = dict(kwargs)
+    if planner == "hand":
+        kwargs["obj_in_hand"] = RigidBody(body_ids[obj_in_hand]) if obj_in_hand is not None else None
+        sample_fn = get_hand_sample_fn(kwargs["hand_limits"])
+    elif "sample_points" in kwargs:
+        sample_points = kwargs.pop("sample_points")
+
+        def sample_fn():
+            x, y = sample_points[np.random.randint(len(sample_points))][:2]
+            theta = np.random.uniform(*CIRCULAR_LIMITS)
+            return (x, y, theta)
+
+    else:
+        sample_fn = get_base_sample_fn(kwargs["base_limits"])
+
+    def cancellable_sample_fn():
+        # Samples are drawn at every iteration of the planners
+        if request_id <= cancelled_request.value:
+            raise PlanningCancelled()
+        return sample_fn()
+
+    try:
+        plan = PLANNERS[planner](
+            robot=rigid_robot,
+            obstacles=[body_ids[body_id] for body_id in obstacles],
+            override_sample_fn=cancellable_sample_fn,
+            **kwargs,
+        )
+    except PlanningCancelled:
+        plan = None
+    return request_id, index, plan
+
+
+def get_robot_description(robot):
+    """
+    :param robot: BehaviorRobot
+    :return: dictionary of the body ids of the robot parts and of the poses of the hands, to copy it in the workers
+    """
+    if robot.use_tracked_body:
+        hand_local_poses = {"left_hand": LEFT_HAND_LOC_POSE_TRACKED, "right_hand": RIGHT_HAND_LOC_POSE_TRACKED}
+    else:
+        hand_local_poses = {"left_hand": LEFT_HAND_LOC_POSE_UNTRACKED, "right_hand": RIGHT_HAND_LOC_POSE_UNTRACKED}
+    return {
+        "parts": {part: robot.parts[part].get_body_id() for part in ["body", "left_hand", "right_hand"]},
+        "hand_local_poses": hand_local_poses,
+        "initial_z_offset": robot.initial_z_offset,
+    }
+
+
+class MotionPlanningService(object):
+    """
+    Pool of worker processes solving the candidate plans of the BehaviorRobot primitives in parallel
+    """
+
+    def __init__(self, num_workers=None, timeout=60.0):
+        """
+        :param num_workers: number of worker processes, defaults to the number of CPUs
+        :param timeout: time in seconds to wait for the next candidate result. When it runs out, e.g. because a
+            worker died and its candidate is lost, the pending candidates count as failed and the workers are restarted
+        """
+        self.num_workers = num_workers or os.cpu_count()
+        self.timeout = timeout
+        # Spawn the workers, forking a process with an OpenGL context or a pybullet GUI is not safe
+        self.context = multiprocessing.get_context("spawn")
+        self.cancelled_request = self.context.Value("i", -1)
+        self.pool = None
+        self.start_workers()
+        self.request_id = 0
+        atexit.register(self.close)
+
+    def start_workers(self):
+        """
+        Start the worker processes, the worlds of the workers are loaded by the first request they get
+        """
+        self.pool = self.context.Pool(
+            self.num_workers, initializer=_initialize_worker, initargs=(self.cancelled_request,)
+        )
+
+    def solve(self, planner, robot, candidates, obstacles=[], obj_in_hand=None, seeds=None, return_first=True):
+        """
+        Solve the candidate problems of a primitive in parallel
+
+        :param planner: "base" for plan_base_motion_br or "hand" for plan_hand_motion_br
+        :param robot: BehaviorRobot
+        :param candidates: list of the keyword arguments of the planner for each candidate, e.g. end_conf and
+            base_limits. A base candidate can give sample_points, an array of (x, y) positions to sample the base
+            positions from instead of base_limits.
+        :param obstacles: obstacle body ids
+        :param obj_in_hand: object in the right hand, for the hand planner
+        :param seeds: random seed of each candidate, drawn from np.random by default
+        :param return_first: whether to return the first successful plan and cancel the other candidates, or to
+            wait for all the candidates and return the plan with the fewest waypoints
+        :return: index of the candidate and its plan, or (None, None) if no candidate succeeded
+        """
+        if seeds is None:
+            seeds = np.random.randint(2**31 - 1, size=len(candidates)).tolist()
+        robot_description = get_robot_description(robot)
+        obj_in_hand_id = obj_in_hand.get_body_id() if obj_in_hand is not None else None
+        body_ids = set(obstacles) | set(robot_description["parts"].values())
+        if obj_in_hand_id is not None:
+            body_ids.add(obj_in_hand_id)
+        snapshot = get_world_snapshot(sorted(body_ids))
+
+        self.request_id += 1
+        results = queue.Queue()
+        for index, (kwargs, seed) in enumerate(zip(candidates, seeds)):
+            args = (
+                self.request_id,
+                index,
+                planner,
+                snapshot,
+                robot_description,
+                obj_in_hand_id,
+                obstacles,
+                kwargs,
+                seed,
+            )
+            self.pool.apply_async(_solve, args, callback=results.put, error_callback=results.put)
+
+        best_index, best_plan = None, None
+        try:
+            for _ in range(len(candidates)):
+                try:
+                    result = results.get(timeout=self.timeout)
+                except queue.Empty:
+                    log.warning(
+                        "No motion planning result in {} s, restarting the workers and failing the pending "
+                        "candidates".format(self.timeout)
+                    )
+                    self.close()
+                    self.start_workers()
+                    break
+                if isinstance(result, Exception):
+                    raise result
+                _, index, plan = result
+                if plan is not None and (best_plan is None or len(plan) < len(best_plan)):
+                    best_index, best_plan = index, plan
+                    if return_first:
+                        break
+        finally:
+            # Cancel the candidates still queued or running
+            self.cancelled_request.value = self.request_id
+        return best_index, best_plan
+
+    def close(self):
+        """
+        Shut the worker processes down
+        """
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
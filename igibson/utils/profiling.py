@@ -0,0 +1,270 @@
+"""
+Hierarchical timers to find where the time of a simulation step goes.
+
+Code is instrumented with named scopes, which nest into paths such as "env.step/simulator.step/physics". Every path
+keeps running totals and a ring buffer of its latest durations for the percentiles, and the individual scope
+durations can also be recorded as a Chrome trace (chrome://tracing or https://ui.perfetto.dev). Profiling is off by
+default, in which case a scope costs one attribute check. Turn it on with PROFILER.enable() or by setting the
+IGIBSON_PROFILING environment variable to 1.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class TimerStats(object):
+    """
+    Running totals of the durations of a scope, and ring buffer of its latest durations
+    """
+
+    def __init__(self, history_size):
+        """
+        :param history_size: number of latest durations the percentiles are computed on
+        """
+        self.durations = np.zeros(history_size)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration):
+        """
+        :param duration: duration of one execution of the scope, in seconds
+        """
+        self.durations[self.count % len(self.durations)] = duration
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    def get_recent_durations(self):
+        """
+        :return: latest durations in seconds, not in chronological order once the ring buffer wrapped around
+        """
+        return self.durations[: min(self.count, len(self.durations))]
+
+    def summarize(self):
+        """
+        :return: dictionary of the call count and of the total, mean, max and percentile durations in milliseconds.
+            The percentiles are over the latest durations only.
+        """
+        recent = self.get_recent_durations()
+        p50, p95, p99 = np.percentile(recent, [50, 95, 99]) if len(recent) > 0 else (0.0, 0.0, 0.0)
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total / max(self.count, 1) * 1000,
+            "p50_ms": p50 * 1000,
+            "p95_ms": p95 * 1000,
+            "p99_ms": p99 * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class _NullScope(object):
+    """
+    Scope returned while profiling is disabled
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _Scope(object):
+    __slots__ = ("profiler", "name", "path", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        stack = self.profiler.get_scope_stack()
+        self.path = stack[-1] + "/" + self.name if stack else self.name
+        stack.append(self.path)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        end = time.perf_counter()
+        self.profiler.get_scope_stack().pop()
+        self.profiler.record(self.path, self.name, self.start, end)
+        return False
+
+
+class StepProfiler(object):
+    """
+    Registry of the hierarchical timers of the process
+    """
+
+    def __init__(self, enabled=False, trace=False, history_size=1000, max_trace_events=100000):
+        """
+        :param enabled: whether to time the scopes
+        :param trace: whether to also record the individual scope durations for the Chrome trace
+        :param history_size: number of latest durations of every scope the percentiles are computed on
+        :param max_trace_events: number of latest scope durations kept for the Chrome trace
+        """
+        self.enabled = enabled
+        self.trace = trace
+        self.history_size = history_size
+        self.timers = {}
+        self.trace_events = deque(maxlen=max_trace_events)
+        self.local = threading.local()
+        self.origin = time.perf_counter()
+
+    def enable(self, trace=False):
+        """
+        Start timing the scopes
+
+        :param trace: whether to also record the individual scope durations for the Chrome trace
+        """
+        self.enabled = True
+        self.trace = trace
+
+    def disable(self):
+        """
+        Stop timing the scopes, the recorded timings are kept
+        """
+        self.enabled = False
+
+    def reset(self):
+        """
+        Drop the recorded timings and trace events
+        """
+        self.timers = {}
+        self.trace_events.clear()
+        self.origin = time.perf_counter()
+
+    def get_scope_stack(self):
+        """
+        :return: paths of the scopes currently open in the calling thread, from outermost to innermost
+        """
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def scope(self, name):
+        """
+        Time a block of code, nested under the scopes open around it
+
+        :param name: name of the scope, without "/"
+        :return: context manager
+        """
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _Scope(self, name)
+
+    def profile(self, name=None):
+        """
+        Decorator timing every call of a function
+
+        :param name: name of the scope, defaults to the qualified name of the function
+        """
+
+        def decorator(func):
+            scope_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Scope(self, scope_name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def record(self, path, name, start, end):
+        """
+        Record one execution of a scope
+
+        :param path: path of the scope
+        :param name: name of the scope
+        :param start: start time, from time.perf_counter
+        :param end: end time, from time.perf_counter
+        """
+        timer = self.timers.get(path)
+        if timer is None:
+            timer = self.timers[path] = TimerStats(self.history_size)
+        timer.add(end - start)
+        if self.trace:
+            self.trace_events.append((path, name, start, end, threading.get_ident()))
+
+    def get_stats(self):
+        """
+        :return: dictionary of the summary of every scope path, see TimerStats.summarize
+        """
+        return {path: self.timers[path].summarize() for path in sorted(self.timers)}
+
+    def get_summary(self):
+        """
+        :return: table of the scope timings, children indented under their parents
+        """
+        lines = [
+            "{:<60} {:>8} {:>10} {:>9} {:>9} {:>9} {:>9}".format(
+                "scope", "count", "total ms", "mean ms", "p50 ms", "p95 ms", "p99 ms"
+            )
+        ]
+        for path, stats in self.get_stats().items():
+            depth = path.count("/")
+            lines.append(
+                "{:<60} {:>8} {:>10.1f} {:>9.3f} {:>9.3f} {:>9.3f} {:>9.3f}".format(
+                    "  " * depth + path.rsplit("/", 1)[-1],
+                    stats["count"],
+                    stats["total_ms"],
+                    stats["mean_ms"],
+                    stats["p50_ms"],
+                    stats["p95_ms"],
+                    stats["p99_ms"],
+                )
+            )
+        return "\n".join(lines)
+
+    def get_chrome_trace(self):
+        """
+        :return: recorded scope durations in the Chrome trace event format
+        """
+        pid = os.getpid()
+        events = [
+            {
+                "name": name,
+                "cat": "igibson",
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": pid,
+                "tid": tid,
+                "args": {"path": path},
+            }
+            for path, name, start, end, tid in self.trace_events
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_json(self, path):
+        """
+        :param path: path of the JSON file to write the scope summaries to
+        """
+        with open(path, "w") as f:
+            json.dump(self.get_stats(), f, indent=2)
+
+    def save_chrome_trace(self, path):
+        """
+        :param path: path of the JSON trace file to write, to open in chrome://tracing or Perfetto
+        """
+        with open(path, "w") as f:
+            json.dump(self.get_chrome_trace(), f)
+
+
+PROFILER = StepProfiler(enabled=os.environ.get("IGIBSON_PROFILING", "0") == "1")
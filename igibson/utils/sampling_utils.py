@@ -19,6 +19,10 @@ _DEFAULT_MAX_SAMPLING_ATTEMPTS = 10
 _DEFAULT_CUBOID_BOTTOM_PADDING = 0.005
 # We will cast an additional parallel ray for each additional this much distance.
 _DEFAULT_NEW_RAY_PER_HORIZONTAL_DISTANCE = 0.1
+# Number of candidate cuboids whose rays are cast together.
+_SAMPLING_BATCH_SIZE = 64
+# Corners of the bottom face of a unit cuboid centered on the origin.
+_CUBOID_BOTTOM_CORNERS = 0.5 * np.array([[1, 1, -1], [-1, 1, -1], [-1, -1, -1], [1, -1, -1]])
 
 
 def fit_plane(points):
@@ -39,6 +43,22 @@ def fit_plane(points):
     return ctr, normal / np.linalg.norm(normal)
 
 
+def fit_plane_batch(points, mask):
+    """
+    Fits a plane to each of the given sets of 3D points, like fit_plane.
+
+    :param points: np.array of shape (n, k, 3)
+    :param mask: bool np.array of shape (n, k), which points of each set to fit the plane to, at least 3 per set
+    :return Tuple[np.array, np.array] of shape (n, 3) where first element is the centroids and the second the normals
+    """
+    weights = mask[:, :, None].astype(float)
+    ctr = np.sum(points * weights, axis=1) / np.sum(weights, axis=1)
+    x = (points - ctr[:, None, :]) * weights
+    M = np.einsum("nki,nkj->nij", x, x)
+    normal = np.linalg.svd(M)[0][:, :, -1]
+    return ctr, normal / np.linalg.norm(normal, axis=1)[:, None]
+
+
 def get_distance_to_plane(points, plane_centroid, plane_normal):
     return np.abs(np.dot(points - plane_centroid, plane_normal))
 
@@ -106,6 +126,49 @@ def get_parallel_rays(
     return sources, destinations, ray_grid
 
 
+def get_parallel_rays_batch(
+    sources, destinations, offset, new_ray_per_horizontal_distance=_DEFAULT_NEW_RAY_PER_HORIZONTAL_DISTANCE
+):
+    """Batched version of get_parallel_rays, for rays sharing the same offset.
+
+    :param sources: Array of shape (n, 3), sources of the rays to sample parallel rays of.
+    :param destinations: Array of shape (n, 3), destinations of the rays to sample parallel rays of.
+    :param offset: Orthogonal distance of parallel rays from input rays.
+    :param new_ray_per_horizontal_distance: Step in offset beyond which an additional split will be applied in the
+        parallel ray grid (which at minimum is 3x3 at the AABB corners & center).
+    :return Tuple[Array[n, W * H, 3], Array[n, W * H, 3], Array[W, H, 2]] containing sources and destinations of the
+        parallel rays of each input ray and the unflattened, untransformed grid in object coordinates.
+    """
+    ray_directions = destinations - sources
+
+    # Get orthogonal vectors using random vectors.
+    random_vectors = np.random.rand(len(sources), 3)
+    orthogonal_vectors_1 = np.cross(ray_directions, random_vectors)
+    orthogonal_vectors_1 /= np.linalg.norm(orthogonal_vectors_1, axis=1)[:, None]
+
+    # Get second vectors orthogonal to both the rays and the first vectors.
+    orthogonal_vectors_2 = -np.cross(ray_directions, orthogonal_vectors_1)
+    orthogonal_vectors_2 /= np.linalg.norm(orthogonal_vectors_2, axis=1)[:, None]
+
+    orthogonal_vectors = np.stack([orthogonal_vectors_1, orthogonal_vectors_2], axis=1)
+    assert np.all(np.isfinite(orthogonal_vectors))
+
+    # Convert the offset into a 2-vector if it already isn't one.
+    offset = np.array([1, 1]) * offset
+
+    # Compute the grid of rays
+    steps = (offset / new_ray_per_horizontal_distance).astype(int) * 2 + 1
+    steps = np.maximum(steps, 3)
+    x_range = np.linspace(-offset[0], offset[0], steps[0])
+    y_range = np.linspace(-offset[1], offset[1], steps[1])
+    ray_grid = np.dstack(np.meshgrid(x_range, y_range, indexing="ij"))
+    ray_grid_flattened = ray_grid.reshape(-1, 2)
+
+    # Apply the grid onto the orthogonal vectors to obtain the rays.
+    ray_offsets = np.einsum("gi,nij->ngj", ray_grid_flattened, orthogonal_vectors)
+    return sources[:, None, :] + ray_offsets, destinations[:, None, :] + ray_offsets, ray_grid
+
+
 def sample_origin_positions(mins, maxes, count, bimodal_mean_fraction, bimodal_stdev_fraction, axis_probabilities):
     """
     Sample ray casting origin positions with a given distribution.
@@ -159,6 +222,68 @@ def sample_origin_positions(mins, maxes, count, bimodal_mean_fraction, bimodal_s
     return results
 
 
+def sample_origin_positions_batch(
+    mins, maxes, count, bimodal_mean_fraction, bimodal_stdev_fraction, axis_probabilities
+):
+    """
+    Vectorized version of sample_origin_positions, with the same distribution.
+
+    :param mins: Array of shape (3, ), the minimum coordinate along each axis.
+    :param maxes: Array of shape (3, ), the maximum coordinate along each axis.
+    :param count: int, Number of origins to sample.
+    :param bimodal_mean_fraction: float, the mean of one side of the symmetric bimodal distribution as a fraction of the
+        min-max range.
+    :param bimodal_stdev_fraction: float, the standard deviation of one side of the symmetric bimodal distribution as a
+        fraction of the min-max range.
+    :param axis_probabilities: Array of shape (3, ), the probability of ray casting along each axis.
+    :return: Tuple of arrays of shape (count, ), (count, ) and (count, 3): the ray cast axis indices, whether each axis
+        was sampled from the top side, and the [x, y, z] positions.
+    """
+    assert len(mins.shape) == 1
+    assert mins.shape == maxes.shape
+
+    # Get the uniform samples first.
+    positions = np.random.rand(count, 3)
+
+    # Sample the bimodal normal.
+    bottom = (0 - bimodal_mean_fraction) / bimodal_stdev_fraction
+    top = (1 - bimodal_mean_fraction) / bimodal_stdev_fraction
+    bimodal_samples = truncnorm.rvs(bottom, top, loc=bimodal_mean_fraction, scale=bimodal_stdev_fraction, size=count)
+
+    # Pick which axis the bimodal normal samples should go to.
+    bimodal_axes = np.random.choice([0, 1, 2], size=count, p=axis_probabilities)
+
+    # Choose which side of the axis to sample from. We only sample from the top for the Z axis.
+    bimodal_axes_top_side = (bimodal_axes == 2) | (np.random.rand(count) < 0.5)
+
+    # Move samples based on chosen side.
+    positions[np.arange(count), bimodal_axes] = np.where(bimodal_axes_top_side, bimodal_samples, 1 - bimodal_samples)
+
+    # Scale the positions from the standard normal range to the min-max range.
+    scaled_positions = mins + (maxes - mins) * positions
+
+    return bimodal_axes, bimodal_axes_top_side, scaled_positions
+
+
+def ray_test_batch(sources, destinations):
+    """
+    p.rayTestBatch for any number of rays, split into batches pybullet accepts. pybullet silently returns no results
+    for a batch of MAX_RAY_INTERSECTION_BATCH_SIZE rays or more, so batches have at most one ray less.
+
+    :param sources: Array of shape (n, 3), sources of the rays.
+    :param destinations: Array of shape (n, 3), destinations of the rays.
+    :return: List of the n ray test results.
+    """
+    batch_size = p.MAX_RAY_INTERSECTION_BATCH_SIZE - 1
+    results = []
+    for start in range(0, len(sources), batch_size):
+        end = start + batch_size
+        results.extend(
+            p.rayTestBatch(rayFromPositions=sources[start:end], rayToPositions=destinations[start:end], numThreads=0)
+        )
+    return results
+
+
 def sample_cuboid_on_object(
     obj,
     num_samples,
@@ -214,145 +339,64 @@ def sample_cuboid_on_object(
         assert cuboid_dimensions.shape[0] == num_samples, "Need as many offsets as samples requested."
 
     results = [(None, None, None, None, defaultdict(list)) for _ in range(num_samples)]
-
-    for i in range(num_samples):
-        # Sample the starting positions in advance.
-        # TODO: Narrow down the sampling domain so that we don't sample scenarios where the center is in-domain but the
-        # full extent isn't. Currently a lot of samples are being wasted because of this.
-        samples = sample_origin_positions(
-            -half_extent_with_offset,
-            half_extent_with_offset,
-            max_sampling_attempts,
-            bimodal_mean_fraction,
-            bimodal_stdev_fraction,
-            axis_probabilities,
-        )
-
-        refusal_reasons = results[i][4]
-
-        # Try each sampled position in the AABB.
-        for axis, is_top, start_pos in samples:
-            # Compute the ray's destination using the sampling & AABB information.
-            point_on_face = compute_ray_destination(
-                axis, is_top, start_pos, -half_extent_with_offset, half_extent_with_offset
-            )
-
-            # If we have a list of offset distances, pick the distance for this particular sample we're getting.
-            this_cuboid_dimensions = cuboid_dimensions if cuboid_dimensions.ndim == 1 else cuboid_dimensions[i]
-
-            # Obtain the parallel rays using the direction sampling method.
-            bbf_sources, bbf_destinations, grid = get_parallel_rays(
-                start_pos, point_on_face, this_cuboid_dimensions[:2] / 2.0
-            )
-
-            # Transform the sources, destinations and grid to the world frame coordinates.
-            to_wf_transform = utils.quat_pos_to_mat(bbox_center, bbox_orn)
-            sources = trimesh.transformations.transform_points(bbf_sources, to_wf_transform)
-            destinations = trimesh.transformations.transform_points(bbf_destinations, to_wf_transform)
-
-            # Time to cast the rays.
-            cast_results = p.rayTestBatch(rayFromPositions=sources, rayToPositions=destinations, numThreads=0)
-
-            # for ray_start, ray_end in zip(sources, destinations):
-            #     p.addUserDebugLine(ray_start, ray_end, lineWidth=4)
-
-            threshold, hits = check_rays_hit_object(cast_results, body_id, refusal_reasons["missed_object"], 0.6)
-            if not threshold:
-                continue
-
-            filtered_cast_results = []
-            center_idx = int(len(cast_results) / 2)
-            filtered_center_idx = None
-            center_hit = False
-            for idx, hit in enumerate(hits):
-                if hit:
-                    filtered_cast_results.append(cast_results[idx])
-                    if idx == center_idx:
-                        center_hit = True
-                        filtered_center_idx = len(filtered_cast_results) - 1
-
-            # Only consider objects whose center idx has a ray hit
-            if not center_hit:
-                continue
-
-            # Process the hit positions and normals.
-            hit_positions = np.array([ray_res[3] for ray_res in filtered_cast_results])
-            hit_normals = np.array([ray_res[4] for ray_res in filtered_cast_results])
-            hit_normals /= np.linalg.norm(hit_normals, axis=1)[:, np.newaxis]
-
-            assert filtered_center_idx
-            hit_link = filtered_cast_results[filtered_center_idx][1]
-            center_hit_normal = hit_normals[filtered_center_idx]
-
-            # Reject anything facing more than 45deg downwards if requested.
-            if refuse_downwards:
-                if not check_hit_max_angle_from_z_axis(
-                    center_hit_normal, max_angle_with_z_axis, refusal_reasons["downward_normal"]
-                ):
-                    continue
-
-            # Check that none of the parallel rays' hit normal differs from center ray by more than threshold.
-            if not check_normal_similarity(center_hit_normal, hit_normals, refusal_reasons["hit_normal_similarity"]):
-                continue
-
-            # Fit a plane to the points.
-            plane_centroid, plane_normal = fit_plane(hit_positions)
-
-            # The fit_plane normal can be facing either direction on the normal axis, but we want it to face away from
-            # the object for purposes of normal checking and padding. To do this:
-            # We get a vector from the centroid towards the center ray source, and flip the plane normal to match it.
-            # The cosine has positive sign if the two vectors are similar and a negative one if not.
-            plane_to_source = sources[center_idx] - plane_centroid
-            plane_normal *= np.sign(np.dot(plane_to_source, plane_normal))
-
-            # Check that the plane normal is similar to the hit normal
-            if not check_normal_similarity(
-                center_hit_normal, plane_normal[None, :], refusal_reasons["plane_normal_similarity"]
-            ):
-                continue
-
-            # Check that the points are all within some acceptable distance of the plane.
-            distances = get_distance_to_plane(hit_positions, plane_centroid, plane_normal)
-            if np.any(distances > hit_to_plane_threshold):
-                if igibson.debug_sampling:
-                    refusal_reasons["dist_to_plane"].append("distances to plane: %r" % (distances,))
-                continue
-
-            # Get projection of the base onto the plane, fit a rotation, and compute the new center hit / corners.
-            hit_positions = np.array([ray_res[3] for ray_res in cast_results])
-            projected_hits = get_projection_onto_plane(hit_positions, plane_centroid, plane_normal)
-            padding = _DEFAULT_CUBOID_BOTTOM_PADDING * plane_normal
-            projected_hits += padding
-            center_projected_hit = projected_hits[center_idx]
-            cuboid_centroid = center_projected_hit + plane_normal * this_cuboid_dimensions[2] / 2.0
-            rotation = compute_rotation_from_grid_sample(grid, projected_hits, cuboid_centroid, this_cuboid_dimensions)
-            corner_positions = cuboid_centroid[None, :] + (
-                rotation.apply(
-                    0.5
-                    * this_cuboid_dimensions
-                    * np.array(
-                        [
-                            [1, 1, -1],
-                            [-1, 1, -1],
-                            [-1, -1, -1],
-                            [1, -1, -1],
-                        ]
-                    )
-                )
+    if cuboid_dimensions.ndim == 1:
+        cuboid_dimensions = np.tile(cuboid_dimensions, (num_samples, 1))
+    to_wf_transform = utils.quat_pos_to_mat(bbox_center, bbox_orn)
+
+    # Sample the starting positions of all the attempts in advance.
+    # TODO: Narrow down the sampling domain so that we don't sample scenarios where the center is in-domain but the
+    # full extent isn't. Currently a lot of samples are being wasted because of this.
+    axes, is_top, start_positions = sample_origin_positions_batch(
+        -half_extent_with_offset,
+        half_extent_with_offset,
+        num_samples * max_sampling_attempts,
+        bimodal_mean_fraction,
+        bimodal_stdev_fraction,
+        axis_probabilities,
+    )
+    axes = axes.reshape(num_samples, max_sampling_attempts)
+    is_top = is_top.reshape(num_samples, max_sampling_attempts)
+    start_positions = start_positions.reshape(num_samples, max_sampling_attempts, 3)
+
+    # Try the attempts of all the pending points in batches, in order, until each point gets a sample: each point gets
+    # its first successful attempt, as if the attempts were tried one at a time.
+    pending = np.arange(num_samples)
+    attempt = 0
+    while len(pending) > 0 and attempt < max_sampling_attempts:
+        num_attempts = min(max(_SAMPLING_BATCH_SIZE // len(pending), 1), max_sampling_attempts - attempt)
+        attempts = np.arange(attempt, attempt + num_attempts)
+        attempt += num_attempts
+
+        # Candidates with the same cuboid dimensions share the same parallel ray grid.
+        unique_dimensions, dimension_indices = np.unique(cuboid_dimensions[pending], axis=0, return_inverse=True)
+        successes = {}
+        for group, this_cuboid_dimensions in enumerate(unique_dimensions):
+            # Candidates in attempt-major order, so that the first success of each point is its earliest one
+            group_points = pending[dimension_indices.ravel() == group]
+            candidate_points = np.tile(group_points, num_attempts)
+            candidate_attempts = np.repeat(attempts, len(group_points))
+            candidate_results = sample_cuboids_from_origins(
+                body_id,
+                to_wf_transform,
+                axes[candidate_points, candidate_attempts],
+                is_top[candidate_points, candidate_attempts],
+                start_positions[candidate_points, candidate_attempts],
+                -half_extent_with_offset,
+                half_extent_with_offset,
+                this_cuboid_dimensions,
+                [results[i][4] for i in candidate_points],
+                undo_padding,
+                max_angle_with_z_axis,
+                hit_to_plane_threshold,
+                refuse_downwards,
             )
+            for i, result in zip(candidate_points, candidate_results):
+                if result is not None and i not in successes:
+                    successes[i] = result
 
-            # Now we use the cuboid's diagonals to check that the cuboid is actually empty.
-            if not check_cuboid_empty(
-                plane_normal, corner_positions, refusal_reasons["cuboid_not_empty"], this_cuboid_dimensions
-            ):
-                continue
-
-            if undo_padding:
-                cuboid_centroid -= padding
-
-            # We've found a nice attachment point. Continue onto next point to sample.
-            results[i] = (cuboid_centroid, plane_normal, rotation.as_quat(), hit_link, refusal_reasons)
-            break
+        for i, result in successes.items():
+            results[i] = result + (results[i][4],)
+        pending = np.array([i for i in pending if i not in successes], dtype=int)
 
     if igibson.debug_sampling:
         print("Sampling rejection reasons:")
@@ -367,6 +411,165 @@ def sample_cuboid_on_object(
     return results
 
 
+def sample_cuboids_from_origins(
+    body_id,
+    to_wf_transform,
+    axes,
+    is_top,
+    start_positions,
+    aabb_min,
+    aabb_max,
+    this_cuboid_dimensions,
+    refusal_reasons,
+    undo_padding,
+    max_angle_with_z_axis,
+    hit_to_plane_threshold,
+    refuse_downwards,
+):
+    """
+    Tries to sample a cuboid from each of the given ray casting origins, casting the rays of all of them at once.
+    See sample_cuboid_on_object for the parameters.
+
+    :param body_id: body id of the object to sample points on.
+    :param to_wf_transform: Array of shape (4, 4), transform from the base aligned bounding box frame to the world frame.
+    :param axes: Array of shape (n, ), ray cast axis index of each origin.
+    :param is_top: Array of shape (n, ), whether each axis was sampled from the top side.
+    :param start_positions: Array of shape (n, 3), origins in the base aligned bounding box frame.
+    :param aabb_min: Array of shape (3, ), the minimum coordinate of the bounding box along each axis.
+    :param aabb_max: Array of shape (3, ), the maximum coordinate of the bounding box along each axis.
+    :param this_cuboid_dimensions: Array of shape (3, ), the size of the cuboids.
+    :param refusal_reasons: List of n {refusal_reason: [refusal_details...]} dicts.
+    :return: List of n elements, None for the failed origins or (cuboid_centroid, cuboid_up_vector, cuboid_rotation,
+        hit_link) tuples.
+    """
+    num_candidates = len(start_positions)
+    candidate_results = [None] * num_candidates
+
+    # Compute the rays' destinations using the sampling & AABB information.
+    points_on_face = compute_ray_destination_batch(axes, is_top, start_positions, aabb_min, aabb_max)
+
+    # Obtain the parallel rays using the direction sampling method.
+    bbf_sources, bbf_destinations, grid = get_parallel_rays_batch(
+        start_positions, points_on_face, this_cuboid_dimensions[:2] / 2.0
+    )
+    num_rays = bbf_sources.shape[1]
+
+    # Transform the sources and destinations to the world frame coordinates.
+    sources = trimesh.transformations.transform_points(bbf_sources.reshape(-1, 3), to_wf_transform)
+    destinations = trimesh.transformations.transform_points(bbf_destinations.reshape(-1, 3), to_wf_transform)
+    sources = sources.reshape(num_candidates, num_rays, 3)
+
+    # Time to cast the rays.
+    cast_results = ray_test_batch(sources.reshape(-1, 3), destinations)
+    hit_body_ids = np.array([ray_res[0] for ray_res in cast_results]).reshape(num_candidates, num_rays)
+    hit_links = np.array([ray_res[1] for ray_res in cast_results]).reshape(num_candidates, num_rays)
+    hit_positions = np.array([ray_res[3] for ray_res in cast_results]).reshape(num_candidates, num_rays, 3)
+    hit_normals = np.array([ray_res[4] for ray_res in cast_results]).reshape(num_candidates, num_rays, 3)
+
+    valid, hits = check_rays_hit_object_batch(
+        hit_body_ids, body_id, [reasons["missed_object"] for reasons in refusal_reasons], 0.6
+    )
+
+    # Only consider objects whose center idx has a ray hit
+    center_idx = int(num_rays / 2)
+    valid &= hits[:, center_idx]
+
+    # Only keep processing the valid candidates.
+    candidates = np.flatnonzero(valid)
+    hits = hits[candidates]
+    hit_normals = hit_normals[candidates]
+    hit_normal_norms = np.linalg.norm(hit_normals, axis=2)
+    hit_normals /= np.where(hits, hit_normal_norms, 1.0)[:, :, None]
+    center_hit_normals = hit_normals[:, center_idx]
+
+    # Reject anything facing more than 45deg downwards if requested.
+    if refuse_downwards:
+        valid = check_hit_max_angle_from_z_axis_batch(
+            center_hit_normals, max_angle_with_z_axis, [refusal_reasons[i]["downward_normal"] for i in candidates]
+        )
+        candidates, hits, hit_normals, center_hit_normals = (
+            candidates[valid],
+            hits[valid],
+            hit_normals[valid],
+            center_hit_normals[valid],
+        )
+
+    # Check that none of the parallel rays' hit normal differs from center ray by more than threshold.
+    valid = check_normal_similarity_batch(
+        center_hit_normals, hit_normals, hits, [refusal_reasons[i]["hit_normal_similarity"] for i in candidates]
+    )
+    candidates, hits, center_hit_normals = candidates[valid], hits[valid], center_hit_normals[valid]
+    if len(candidates) == 0:
+        return candidate_results
+
+    # Fit a plane to the points.
+    plane_centroids, plane_normals = fit_plane_batch(hit_positions[candidates], hits)
+
+    # The fit_plane normal can be facing either direction on the normal axis, but we want it to face away from
+    # the object for purposes of normal checking and padding. To do this:
+    # We get a vector from the centroid towards the center ray source, and flip the plane normal to match it.
+    # The cosine has positive sign if the two vectors are similar and a negative one if not.
+    plane_to_sources = sources[candidates, center_idx] - plane_centroids
+    plane_normals *= np.sign(np.sum(plane_to_sources * plane_normals, axis=1))[:, None]
+
+    # Check that the plane normal is similar to the hit normal
+    valid = check_normal_similarity_batch(
+        center_hit_normals,
+        plane_normals[:, None, :],
+        np.ones((len(candidates), 1), dtype=bool),
+        [refusal_reasons[i]["plane_normal_similarity"] for i in candidates],
+    )
+
+    # Check that the points are all within some acceptable distance of the plane.
+    distances = np.abs(np.einsum("nki,ni->nk", hit_positions[candidates] - plane_centroids[:, None, :], plane_normals))
+    close_to_plane = np.all((distances <= hit_to_plane_threshold) | ~hits, axis=1)
+    if igibson.debug_sampling:
+        for i, candidate in enumerate(candidates):
+            if valid[i] and not close_to_plane[i]:
+                refusal_reasons[candidate]["dist_to_plane"].append("distances to plane: %r" % (distances[i][hits[i]],))
+    valid &= close_to_plane
+    candidates, plane_centroids, plane_normals = candidates[valid], plane_centroids[valid], plane_normals[valid]
+
+    # Get projection of the base onto the plane, fit a rotation, and compute the new center hit / corners.
+    cuboid_centroids, rotations, corner_positions, paddings = [], [], [], []
+    for candidate, plane_centroid, plane_normal in zip(candidates, plane_centroids, plane_normals):
+        projected_hits = get_projection_onto_plane(hit_positions[candidate], plane_centroid, plane_normal)
+        padding = _DEFAULT_CUBOID_BOTTOM_PADDING * plane_normal
+        projected_hits += padding
+        center_projected_hit = projected_hits[center_idx]
+        cuboid_centroid = center_projected_hit + plane_normal * this_cuboid_dimensions[2] / 2.0
+        rotation = compute_rotation_from_grid_sample(grid, projected_hits, cuboid_centroid, this_cuboid_dimensions)
+        cuboid_centroids.append(cuboid_centroid)
+        rotations.append(rotation)
+        corner_positions.append(
+            cuboid_centroid[None, :] + rotation.apply(this_cuboid_dimensions * _CUBOID_BOTTOM_CORNERS)
+        )
+        paddings.append(padding)
+    if len(candidates) == 0:
+        return candidate_results
+
+    # Now we use the cuboid's diagonals to check that the cuboid is actually empty.
+    valid = check_cuboid_empty_batch(
+        plane_normals,
+        np.array(corner_positions),
+        [refusal_reasons[i]["cuboid_not_empty"] for i in candidates],
+        this_cuboid_dimensions,
+    )
+
+    for i in np.flatnonzero(valid):
+        cuboid_centroid = cuboid_centroids[i]
+        if undo_padding:
+            cuboid_centroid -= paddings[i]
+        candidate_results[candidates[i]] = (
+            cuboid_centroid,
+            plane_normals[i],
+            rotations[i].as_quat(),
+            hit_links[candidates[i], center_idx],
+        )
+
+    return candidate_results
+
+
 def compute_rotation_from_grid_sample(two_d_grid, hit_positions, cuboid_centroid, this_cuboid_dimensions):
     # TODO: Figure out if the normalization has any advantages.
     grid_in_planar_coordinates = two_d_grid.reshape(-1, 2)
@@ -422,6 +625,66 @@ def check_rays_hit_object(cast_results, body_id, refusal_log, threshold=1.0):
     return True, ray_hits
 
 
+def check_normal_similarity_batch(center_hit_normals, hit_normals, hits, refusal_logs):
+    """
+    Batched version of check_normal_similarity.
+
+    :param center_hit_normals: Array of shape (n, 3), unit normals of the center rays.
+    :param hit_normals: Array of shape (n, k, 3), unit normals of the parallel rays.
+    :param hits: bool Array of shape (n, k), which parallel rays hit the object.
+    :param refusal_logs: List of n refusal logs.
+    :return: bool Array of shape (n, ), whether the normals of each set are similar.
+    """
+    parallel_hit_main_hit_dot_products = np.clip(np.einsum("nki,ni->nk", hit_normals, center_hit_normals), -1.0, 1.0)
+    parallel_hit_normal_angles_to_hit_normal = np.arccos(parallel_hit_main_hit_dot_products)
+    all_rays_hit_with_similar_normal = np.all(
+        (parallel_hit_normal_angles_to_hit_normal < _PARALLEL_RAY_NORMAL_ANGLE_TOLERANCE) | ~hits, axis=1
+    )
+    if igibson.debug_sampling:
+        for i in np.flatnonzero(~all_rays_hit_with_similar_normal):
+            refusal_logs[i].append("angles %r" % (np.rad2deg(parallel_hit_normal_angles_to_hit_normal[i][hits[i]]),))
+
+    return all_rays_hit_with_similar_normal
+
+
+def check_rays_hit_object_batch(hit_body_ids, body_id, refusal_logs, threshold=1.0):
+    """
+    Batched version of check_rays_hit_object.
+
+    :param hit_body_ids: Array of shape (n, k), body ids hit by each set of rays.
+    :param body_id: body id of the object.
+    :param refusal_logs: List of n refusal logs.
+    :param threshold: float, minimum fraction of the rays of a set that need to hit the object.
+    :return: Tuple of bool Arrays of shape (n, ) and (n, k): whether enough rays of each set hit the object, and which
+        rays hit the object.
+    """
+    ray_hits = hit_body_ids == body_id
+    enough_hits = np.mean(ray_hits, axis=1) >= threshold
+    if igibson.debug_sampling:
+        for i in np.flatnonzero(~enough_hits):
+            refusal_logs[i].append("hits %r" % hit_body_ids[i].tolist())
+
+    return enough_hits, ray_hits
+
+
+def check_hit_max_angle_from_z_axis_batch(hit_normals, max_angle_with_z_axis, refusal_logs):
+    """
+    Batched version of check_hit_max_angle_from_z_axis.
+
+    :param hit_normals: Array of shape (n, 3), unit hit normals.
+    :param max_angle_with_z_axis: float, maximum angle between hit normal and positive Z axis allowed.
+    :param refusal_logs: List of n refusal logs.
+    :return: bool Array of shape (n, ), whether each hit normal is within the maximum angle.
+    """
+    hit_angles_with_z = np.arccos(np.clip(hit_normals[:, 2], -1.0, 1.0))
+    within_max_angle = hit_angles_with_z <= max_angle_with_z_axis
+    if igibson.debug_sampling:
+        for i in np.flatnonzero(~within_max_angle):
+            refusal_logs[i].append("normal %r" % hit_normals[i])
+
+    return within_max_angle
+
+
 def check_hit_max_angle_from_z_axis(hit_normal, max_angle_with_z_axis, refusal_log):
     hit_angle_with_z = np.arccos(np.clip(np.dot(hit_normal, np.array([0, 0, 1])), -1.0, 1.0))
     if hit_angle_with_z > max_angle_with_z_axis:
@@ -464,6 +727,72 @@ def compute_ray_destination(axis, is_top, start_pos, aabb_min, aabb_max):
     return point_on_face
 
 
+def compute_ray_destination_batch(axes, is_top, start_positions, aabb_min, aabb_max):
+    """
+    Batched version of compute_ray_destination. The rays are cast parallel to their sample axis, so they reach the
+    AABB's face orthogonal to that axis.
+
+    :param axes: Array of shape (n, ), ray cast axis index of each ray.
+    :param is_top: bool Array of shape (n, ), whether each axis was sampled from the top side.
+    :param start_positions: Array of shape (n, 3), sources of the rays.
+    :param aabb_min: Array of shape (3, ), the minimum coordinate of the AABB along each axis.
+    :param aabb_max: Array of shape (3, ), the maximum coordinate of the AABB along each axis.
+    :return: Array of shape (n, 3), the points on the AABB boundary that we want to cast our rays until.
+    """
+    points_on_face = np.array(start_positions, dtype=float)
+    points_on_face[np.arange(len(axes)), axes] = np.where(is_top, aabb_min[axes], aabb_max[axes])
+    return points_on_face
+
+
+def check_cuboid_empty_batch(hit_normals, bottom_corner_positions, refusal_logs, this_cuboid_dimensions):
+    """
+    Batched version of check_cuboid_empty, casting the rays of all the cuboids at once.
+
+    :param hit_normals: Array of shape (n, 3), up vectors of the cuboids.
+    :param bottom_corner_positions: Array of shape (n, 4, 3), bottom corners of the cuboids.
+    :param refusal_logs: List of n refusal logs.
+    :param this_cuboid_dimensions: Array of shape (3, ), the size of the cuboids.
+    :return: bool Array of shape (n, ), whether each cuboid is empty.
+    """
+    if igibson.debug_sampling:
+        for corner_positions in bottom_corner_positions:
+            draw_debug_markers(corner_positions)
+
+    # Compute top corners.
+    top_corner_positions = bottom_corner_positions + hit_normals[:, None, :] * this_cuboid_dimensions[2]
+
+    # Get all the top-to-bottom corner pairs, then the same-height pairs, in the same order as check_cuboid_empty.
+    top_to_bottom_pairs = list(itertools.product(range(4), range(4)))
+    same_height_pairs = list(itertools.combinations(range(4), 2))
+    from_corners = np.concatenate(
+        [
+            top_corner_positions[:, [i for i, _ in top_to_bottom_pairs]],
+            bottom_corner_positions[:, [i for i, _ in same_height_pairs]],
+            top_corner_positions[:, [i for i, _ in same_height_pairs]],
+        ],
+        axis=1,
+    )
+    to_corners = np.concatenate(
+        [
+            bottom_corner_positions[:, [j for _, j in top_to_bottom_pairs]],
+            bottom_corner_positions[:, [j for _, j in same_height_pairs]],
+            top_corner_positions[:, [j for _, j in same_height_pairs]],
+        ],
+        axis=1,
+    )
+
+    # Cast the rays, and make sure the rays don't hit anything.
+    check_cast_results = ray_test_batch(from_corners.reshape(-1, 3), to_corners.reshape(-1, 3))
+    check_hit_body_ids = np.array([ray[0] for ray in check_cast_results]).reshape(len(hit_normals), -1)
+    cuboid_empty = np.all(check_hit_body_ids == -1, axis=1)
+    if igibson.debug_sampling:
+        num_rays = check_hit_body_ids.shape[1]
+        for i in np.flatnonzero(~cuboid_empty):
+            refusal_logs[i].append("check ray info: %r" % (check_cast_results[i * num_rays : (i + 1) * num_rays],))
+
+    return cuboid_empty
+
+
 def check_cuboid_empty(hit_normal, bottom_corner_positions, refusal_log, this_cuboid_dimensions):
     if igibson.debug_sampling:
         draw_debug_markers(bottom_corner_positions)
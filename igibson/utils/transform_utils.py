@@ -198,6 +198,84 @@ def quat_inverse(quaternion):
     return quat_conjugate(quaternion) / np.dot(quaternion, quaternion)
 
 
+def quat_multiply_batch(quaternions1, quaternions0):
+    """
+    Return multiplication of two batches of quaternions (q1 * q0), row by row. Unlike quat_multiply, the result
+    keeps the precision of the inputs.
+
+    Args:
+        quaternions1 (np.array): (..., 4) (x,y,z,w) quaternions
+        quaternions0 (np.array): (..., 4) (x,y,z,w) quaternions
+
+    Returns:
+        np.array: (..., 4) (x,y,z,w) multiplied quaternions
+    """
+    x0, y0, z0, w0 = np.moveaxis(np.asarray(quaternions0, dtype=float), -1, 0)
+    x1, y1, z1, w1 = np.moveaxis(np.asarray(quaternions1, dtype=float), -1, 0)
+    return np.stack(
+        (
+            x1 * w0 + y1 * z0 - z1 * y0 + w1 * x0,
+            -x1 * z0 + y1 * w0 + z1 * x0 + w1 * y0,
+            x1 * y0 - y1 * x0 + z1 * w0 + w1 * z0,
+            -x1 * x0 - y1 * y0 - z1 * z0 + w1 * w0,
+        ),
+        axis=-1,
+    )
+
+
+def quat_rotate_batch(quaternions, vectors):
+    """
+    Rotate a batch of vectors by a batch of unit quaternions, row by row.
+
+    Args:
+        quaternions (np.array): (..., 4) (x,y,z,w) unit quaternions
+        vectors (np.array): (..., 3) vectors
+
+    Returns:
+        np.array: (..., 3) rotated vectors
+    """
+    quaternions = np.asarray(quaternions, dtype=float)
+    vectors = np.asarray(vectors, dtype=float)
+    q_xyz = quaternions[..., :3]
+    t = 2.0 * np.cross(q_xyz, vectors)
+    return vectors + quaternions[..., 3:] * t + np.cross(q_xyz, t)
+
+
+def pose_multiply_batch(pos1, quat1, pos0, quat0):
+    """
+    Compose two batches of poses (pose1 * pose0) row by row, the batched equivalent of p.multiplyTransforms.
+
+    Args:
+        pos1 (np.array): (..., 3) positions of pose1
+        quat1 (np.array): (..., 4) (x,y,z,w) unit quaternions of pose1
+        pos0 (np.array): (..., 3) positions of pose0
+        quat0 (np.array): (..., 4) (x,y,z,w) unit quaternions of pose0
+
+    Returns:
+        2-tuple:
+            - (np.array) (..., 3) positions of the composed poses
+            - (np.array) (..., 4) (x,y,z,w) quaternions of the composed poses
+    """
+    return np.asarray(pos1, dtype=float) + quat_rotate_batch(quat1, pos0), quat_multiply_batch(quat1, quat0)
+
+
+def pose_inv_batch(pos, quat):
+    """
+    Invert a batch of poses row by row, the batched equivalent of p.invertTransform.
+
+    Args:
+        pos (np.array): (..., 3) positions
+        quat (np.array): (..., 4) (x,y,z,w) unit quaternions
+
+    Returns:
+        2-tuple:
+            - (np.array) (..., 3) positions of the inverse poses
+            - (np.array) (..., 4) (x,y,z,w) quaternions of the inverse poses
+    """
+    quat_inv = np.asarray(quat, dtype=float) * np.array([-1.0, -1.0, -1.0, 1.0])
+    return -quat_rotate_batch(quat_inv, pos), quat_inv
+
+
 def quat_distance(quaternion1, quaternion0):
     """
     Returns distance between two quaternions, such that distance * quaternion0 = quaternion1
@@ -418,15 +496,57 @@ def mat2quat(rmat):
     return q1[inds]
 
 
+def mat2quat_batch(rmats):
+    """
+    Converts a batch of rotation matrices to quaternions.
+
+    Args:
+        rmats (np.array): (..., 3, 3) rotation matrices
+
+    Returns:
+        np.array: (..., 4) (x,y,z,w) float quaternion angles
+    """
+    M = np.asarray(rmats).astype(np.float32)[..., :3, :3]
+
+    m00 = M[..., 0, 0]
+    m01 = M[..., 0, 1]
+    m02 = M[..., 0, 2]
+    m10 = M[..., 1, 0]
+    m11 = M[..., 1, 1]
+    m12 = M[..., 1, 2]
+    m20 = M[..., 2, 0]
+    m21 = M[..., 2, 1]
+    m22 = M[..., 2, 2]
+    # symmetric matrix K, only its lower triangle is used
+    K = np.zeros(M.shape[:-2] + (4, 4), dtype=np.float32)
+    K[..., 0, 0] = m00 - m11 - m22
+    K[..., 1, 0] = m01 + m10
+    K[..., 1, 1] = m11 - m00 - m22
+    K[..., 2, 0] = m02 + m20
+    K[..., 2, 1] = m12 + m21
+    K[..., 2, 2] = m22 - m00 - m11
+    K[..., 3, 0] = m21 - m12
+    K[..., 3, 1] = m02 - m20
+    K[..., 3, 2] = m10 - m01
+    K[..., 3, 3] = m00 + m11 + m22
+    K /= 3.0
+    # quaternion is Eigen vector of K that corresponds to largest eigenvalue
+    w, V = np.linalg.eigh(K)
+    q1 = np.take_along_axis(V, np.argmax(w, axis=-1)[..., None, None], axis=-1)[..., 0]
+    # make the w component positive
+    q1 = np.where(q1[..., 3:] < 0.0, -q1, q1)
+    return q1
+
+
 def euler2mat(euler):
     """
     Converts euler angles into rotation matrix form
 
     Args:
-        euler (np.array): (r,p,y) angles
+        euler (np.array): (r,p,y) angles, or (..., 3) batch of angles
 
     Returns:
-        np.array: 3x3 rotation matrix
+        np.array: 3x3 rotation matrix, or (..., 3, 3) batch of rotation matrices
 
     Raises:
         AssertionError: [Invalid input shape]
@@ -521,6 +641,25 @@ def pose2mat(pose):
     return homo_pose_mat
 
 
+def pose2mat_batch(pos, quat):
+    """
+    Converts a batch of poses to homogeneous matrices.
+
+    Args:
+        pos (np.array): (..., 3) positions
+        quat (np.array): (..., 4) (x,y,z,w) quaternions
+
+    Returns:
+        np.array: (..., 4, 4) homogeneous matrices
+    """
+    quat = np.asarray(quat)
+    homo_pose_mats = np.zeros(quat.shape[:-1] + (4, 4), dtype=np.float32)
+    homo_pose_mats[..., :3, :3] = quat2mat_batch(quat)
+    homo_pose_mats[..., :3, 3] = pos
+    homo_pose_mats[..., 3, 3] = 1.0
+    return homo_pose_mats
+
+
 def quat2mat(quaternion):
     """
     Converts given quaternion to matrix.
@@ -549,6 +688,41 @@ def quat2mat(quaternion):
     )
 
 
+def quat2mat_batch(quaternions):
+    """
+    Converts a batch of quaternions to rotation matrices. Quaternions with a norm close to zero are converted to the
+    identity.
+
+    Args:
+        quaternions (np.array): (..., 4) (x,y,z,w) quaternions
+
+    Returns:
+        np.array: (..., 3, 3) rotation matrices
+    """
+    q = np.asarray(quaternions).astype(np.float32)
+    x, y, z, w = np.moveaxis(q, -1, 0)
+
+    n = np.sum(q * q, axis=-1)
+    valid = n >= EPS
+    s = np.where(valid, 2.0 / np.where(valid, n, 1.0), 0.0)
+    xs, ys, zs = x * s, y * s, z * s
+    wx, wy, wz = w * xs, w * ys, w * zs
+    xx, xy, xz = x * xs, x * ys, x * zs
+    yy, yz, zz = y * ys, y * zs, z * zs
+
+    mats = np.empty(q.shape[:-1] + (3, 3))
+    mats[..., 0, 0] = 1.0 - (yy + zz)
+    mats[..., 0, 1] = xy - wz
+    mats[..., 0, 2] = xz + wy
+    mats[..., 1, 0] = xy + wz
+    mats[..., 1, 1] = 1.0 - (xx + zz)
+    mats[..., 1, 2] = yz - wx
+    mats[..., 2, 0] = xz - wy
+    mats[..., 2, 1] = yz + wx
+    mats[..., 2, 2] = 1.0 - (xx + yy)
+    return mats
+
+
 def quat2axisangle(quat):
     """
     Converts quaternion to axis-angle format.
@@ -627,10 +801,10 @@ def pose_inv(pose):
     frame B in frame A. The inverse is the pose of frame A in frame B.
 
     Args:
-        pose (np.array): 4x4 matrix for the pose to inverse
+        pose (np.array): 4x4 matrix for the pose to inverse, or (..., 4, 4) matrices to inverse each of
 
     Returns:
-        np.array: 4x4 matrix for the inverse pose
+        np.array: 4x4 matrix for the inverse pose, or (..., 4, 4) matrices for the inverse poses
     """
 
     # Note, the inverse of a pose matrix is the following
@@ -643,10 +817,11 @@ def pose_inv(pose):
     # -t in the original frame, which is -R-1*t in the new frame, and then rotate back by
     # R-1 to align the axis again.
 
-    pose_inv = np.zeros((4, 4))
-    pose_inv[:3, :3] = pose[:3, :3].T
-    pose_inv[:3, 3] = -pose_inv[:3, :3].dot(pose[:3, 3])
-    pose_inv[3, 3] = 1.0
+    pose = np.asarray(pose)
+    pose_inv = np.zeros(pose.shape)
+    pose_inv[..., :3, :3] = np.swapaxes(pose[..., :3, :3], -1, -2)
+    pose_inv[..., :3, 3] = -np.einsum("...ij,...j->...i", pose_inv[..., :3, :3], pose[..., :3, 3])
+    pose_inv[..., 3, 3] = 1.0
     return pose_inv
 
 
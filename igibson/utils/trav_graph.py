@@ -0,0 +1,249 @@
+"""
+Traversability graph of a floor, stored as a sparse adjacency matrix over the traversable cells of the trav map.
+"""
+import hashlib
+import logging
+import os
+
+import networkx as nx
+import numpy as np
+from scipy import ndimage, sparse
+from scipy.sparse import csgraph
+from scipy.spatial import cKDTree
+
+# Bump when the graph construction or the cache layout changes, to invalidate the existing caches
+TRAV_GRAPH_CACHE_VERSION = 1
+
+# Neighbors already visited when scanning the map in row-major order, which give every edge of the 8-connected graph
+# exactly once
+_NEIGHBOR_OFFSETS = [(-1, -1), (0, -1), (1, -1), (-1, 0)]
+
+
+class TraversabilityGraph(object):
+    """
+    8-connected graph over the traversable cells of a trav map, restricted to its largest connected component.
+
+    Nodes are the (row, col) map cells, indexed in row-major order, and edges are weighted by the distance between
+    cells in pixels. A NetworkX view is built lazily for the callers that need one.
+    """
+
+    def __init__(self, nodes, adjacency, map_size):
+        """
+        :param nodes: (N, 2) int array of the (row, col) cells of the nodes, in row-major order
+        :param adjacency: (N, N) symmetric scipy.sparse.csr_matrix of edge weights
+        :param map_size: size of the square trav map
+        """
+        self.nodes = nodes
+        self.adjacency = adjacency
+        self.map_size = map_size
+        self.node_index = np.full((map_size, map_size), -1, dtype=np.int32)
+        self.node_index[nodes[:, 0], nodes[:, 1]] = np.arange(len(nodes), dtype=np.int32)
+        self._nx_graph = None
+        self._kdtree = None
+
+    @staticmethod
+    def from_trav_map(trav_map):
+        """
+        Build the graph of the largest 8-connected component of the traversable cells
+
+        :param trav_map: square traversability map, non-zero cells are traversable
+        :return: TraversabilityGraph
+        """
+        map_size = trav_map.shape[0]
+        labels, num_labels = ndimage.label(trav_map > 0, structure=np.ones((3, 3), dtype=bool))
+        if num_labels == 0:
+            return TraversabilityGraph(np.zeros((0, 2), dtype=np.int32), sparse.csr_matrix((0, 0)), map_size)
+
+        # Only take the largest connected component
+        component_sizes = np.bincount(labels.ravel())
+        component_sizes[0] = 0
+        component = labels == np.argmax(component_sizes)
+
+        nodes = np.argwhere(component).astype(np.int32)
+        node_index = np.full((map_size, map_size), -1, dtype=np.int32)
+        node_index[nodes[:, 0], nodes[:, 1]] = np.arange(len(nodes), dtype=np.int32)
+
+        rows, cols, weights = [], [], []
+        for di, dj in _NEIGHBOR_OFFSETS:
+            neighbors = nodes + np.array([di, dj], dtype=np.int32)
+            in_map = np.all((neighbors >= 0) & (neighbors < map_size), axis=1)
+            src = np.flatnonzero(in_map)
+            dst = node_index[neighbors[in_map, 0], neighbors[in_map, 1]]
+            connected = dst >= 0
+            rows.append(src[connected])
+            cols.append(dst[connected])
+            weights.append(np.full(np.count_nonzero(connected), np.hypot(di, dj)))
+
+        rows, cols, weights = np.concatenate(rows), np.concatenate(cols), np.concatenate(weights)
+        adjacency = sparse.csr_matrix(
+            (np.concatenate([weights, weights]), (np.concatenate([rows, cols]), np.concatenate([cols, rows]))),
+            shape=(len(nodes), len(nodes)),
+        )
+        return TraversabilityGraph(nodes, adjacency, map_size)
+
+    @staticmethod
+    def get_cache_key(trav_map, trav_map_resolution, trav_map_erosion):
+        """
+        :param trav_map: traversability map the graph is built from
+        :param trav_map_resolution: traversability map resolution
+        :param trav_map_erosion: erosion radius of traversability areas
+        :return: hex digest identifying the graph built from these inputs
+        """
+        key = hashlib.sha1()
+        key.update(np.ascontiguousarray(trav_map).tobytes())
+        key.update(
+            "{}_{}_{}_{}_{}".format(
+                trav_map.shape, trav_map.dtype, trav_map_resolution, trav_map_erosion, TRAV_GRAPH_CACHE_VERSION
+            ).encode()
+        )
+        return key.hexdigest()
+
+    @staticmethod
+    def load(path):
+        """
+        :param path: path of a .npz file written by save
+        :return: TraversabilityGraph
+        """
+        with np.load(path) as data:
+            adjacency = sparse.csr_matrix(
+                (data["data"], data["indices"], data["indptr"]), shape=(len(data["nodes"]), len(data["nodes"]))
+            )
+            return TraversabilityGraph(data["nodes"], adjacency, int(data["map_size"]))
+
+    def save(self, path):
+        """
+        :param path: path of the .npz file to write
+        """
+        np.savez_compressed(
+            path,
+            nodes=self.nodes,
+            data=self.adjacency.data,
+            indices=self.adjacency.indices,
+            indptr=self.adjacency.indptr,
+            map_size=self.map_size,
+        )
+
+    @staticmethod
+    def load_or_build(cache_dir, cache_prefix, trav_map, trav_map_resolution, trav_map_erosion):
+        """
+        Load the graph of a trav map from the on-disk cache, or build it and try to cache it
+
+        :param cache_dir: directory of the cache files
+        :param cache_prefix: prefix of the cache file name, e.g. floor_trav_0
+        :param trav_map: traversability map
+        :param trav_map_resolution: traversability map resolution
+        :param trav_map_erosion: erosion radius of traversability areas
+        :return: TraversabilityGraph
+        """
+        cache_key = TraversabilityGraph.get_cache_key(trav_map, trav_map_resolution, trav_map_erosion)
+        graph_file = os.path.join(cache_dir, "{}_{}.npz".format(cache_prefix, cache_key[:16]))
+        if os.path.isfile(graph_file):
+            logging.info("Loading traversable graph")
+            return TraversabilityGraph.load(graph_file)
+
+        logging.info("Building traversable graph")
+        graph = TraversabilityGraph.from_trav_map(trav_map)
+        try:
+            graph.save(graph_file)
+        except (IOError, OSError):
+            logging.warning("Cannot cache the traversable graph in {}".format(cache_dir))
+        return graph
+
+    def get_num_nodes(self):
+        return len(self.nodes)
+
+    def has_node(self, map_xy):
+        """
+        :param map_xy: (row, col) cell in map reference frame
+        :return: whether the cell is a node of the graph
+        """
+        i, j = map_xy
+        return 0 <= i < self.map_size and 0 <= j < self.map_size and self.node_index[i, j] >= 0
+
+    def get_nearest_node(self, map_xy):
+        """
+        :param map_xy: (row, col) cell in map reference frame
+        :return: index of the node at the cell, or of the closest node if the cell is not in the graph
+        """
+        if self.has_node(map_xy):
+            return self.node_index[map_xy[0], map_xy[1]]
+        if self._kdtree is None:
+            self._kdtree = cKDTree(self.nodes)
+        return self._kdtree.query(map_xy)[1]
+
+    def get_shortest_path(self, source_xy, target_xy):
+        """
+        Get the shortest path between two cells. Cells that are not in the graph are connected to their closest
+        node, without modifying the graph.
+
+        :param source_xy: (row, col) source cell in map reference frame
+        :param target_xy: (row, col) target cell in map reference frame
+        :return: (K, 2) array of the cells of the path, from source to target
+        """
+        return DistanceField(self, target_xy).get_path(source_xy)
+
+    def to_networkx(self):
+        """
+        Get a NetworkX view of the graph, with (row, col) tuple nodes and weighted edges. It is built on first use
+        and shared by all the callers.
+
+        :return: nx.Graph
+        """
+        if self._nx_graph is None:
+            g = nx.Graph()
+            node_tuples = [tuple(node) for node in self.nodes.tolist()]
+            g.add_nodes_from(node_tuples)
+            adjacency = sparse.triu(self.adjacency, format="coo")
+            g.add_weighted_edges_from(
+                (node_tuples[i], node_tuples[j], w)
+                for i, j, w in zip(adjacency.row.tolist(), adjacency.col.tolist(), adjacency.data.tolist())
+            )
+            self._nx_graph = g
+        return self._nx_graph
+
+
+class DistanceField(object):
+    """
+    Shortest distances (in pixels) and next hops from every node of a TraversabilityGraph to a single target cell,
+    computed with one Dijkstra pass over the CSR adjacency. A target cell that is not in the graph is connected to
+    its closest node, and so are the source cells of the queries.
+    """
+
+    def __init__(self, graph, target_xy):
+        """
+        :param graph: TraversabilityGraph
+        :param target_xy: (row, col) target cell in map reference frame
+        """
+        self.graph = graph
+        self.target_xy = np.array(target_xy)
+        self.target = graph.get_nearest_node(target_xy)
+        self.target_offset = np.linalg.norm(graph.nodes[self.target] - self.target_xy)
+        self.distances, self.next_hops = csgraph.dijkstra(
+            graph.adjacency, directed=True, indices=self.target, return_predecessors=True
+        )
+
+    def get_distance(self, source_xy):
+        """
+        :param source_xy: (row, col) source cell in map reference frame
+        :return: shortest distance from the source cell to the target cell, in pixels
+        """
+        source = self.graph.get_nearest_node(source_xy)
+        source_offset = np.linalg.norm(self.graph.nodes[source] - np.array(source_xy))
+        return self.distances[source] + source_offset + self.target_offset
+
+    def get_path(self, source_xy):
+        """
+        Descend the distance field from the source cell to the target cell by following the next hops
+
+        :param source_xy: (row, col) source cell in map reference frame
+        :return: (K, 2) array of the cells of a shortest path, from source to target
+        """
+        path = [self.graph.get_nearest_node(source_xy)]
+        while path[-1] != self.target:
+            path.append(self.next_hops[path[-1]])
+        path = self.graph.nodes[path]
+        if not self.graph.has_node(source_xy):
+            path = np.concatenate([[source_xy], path], axis=0)
+        if not self.graph.has_node(self.target_xy):
+            path = np.concatenate([path, [self.target_xy]], axis=0)
+        return path
@@ -10,6 +10,8 @@ from PIL import Image
 from scipy.spatial.transform import Rotation as R
 from transforms3d import quaternions
 
+from igibson.physics.activation_tracker import mark_body_awake
+
 # The function to retrieve the rotation matrix changed from as_dcm to as_matrix in version 1.4
 # We will use the version number for backcompatibility
 scipy_version = version.parse(scipy.version.version)
@@ -220,4 +222,6 @@ def restoreState(*args, **kwargs):
         p.resetBasePositionAndOrientation(
             body_id, *p.getBasePositionAndOrientation(body_id), physicsClientId=kwargs.get("physicsClientId", 0)
         )
+        # Every body may have moved, so its pose and object states need to be refreshed
+        mark_body_awake(body_id)
     return p.restoreState(*args, **kwargs)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+import tempfile
+import time
+
+import numpy as np
+
+from igibson.scenes.igibson_indoor_scene import InteractiveIndoorScene
+from igibson.simulator import Simulator
+from igibson.utils.assets_utils import download_assets
+from igibson.utils.checkpoint_utils import CheckpointManager, load_checkpoint, save_checkpoint
+
+
+def benchmark_checkpoints(n_checkpoint=50, steps_between_checkpoints=10):
+    s = Simulator(mode="headless", image_width=128, image_height=128)
+    scene = InteractiveIndoorScene("Rs_int", texture_randomization=False, object_randomization=False)
+    s.import_ig_scene(scene)
+    checkpoint_manager = CheckpointManager(s, max_checkpoints=n_checkpoint)
+
+    file_save, memory_save = [], []
+    frames = []
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        for _ in range(n_checkpoint):
+            for _ in range(steps_between_checkpoints):
+                s.step()
+            frames.append(s.frame_count)
+
+            start = time.time()
+            save_checkpoint(s, checkpoint_dir)
+            file_save.append(time.time() - start)
+
+            start = time.time()
+            checkpoint_manager.save()
+            memory_save.append(time.time() - start)
+
+        file_restore, memory_restore = [], []
+        for frame in np.random.permutation(frames):
+            start = time.time()
+            load_checkpoint(s, checkpoint_dir, frame)
+            file_restore.append(time.time() - start)
+
+            start = time.time()
+            checkpoint_manager.restore(frame)
+            memory_restore.append(time.time() - start)
+
+    stats = checkpoint_manager.get_stats()
+    checkpoint_manager.clear()
+    s.disconnect()
+    return np.mean(file_save), np.mean(memory_save), np.mean(file_restore), np.mean(memory_restore), stats
+
+
+def main():
+    download_assets()
+    file_save, memory_save, file_restore, memory_restore, stats = benchmark_checkpoints()
+    print("checkpoint save: file {:.2f} ms, memory {:.2f} ms".format(file_save * 1000, memory_save * 1000))
+    print("checkpoint restore: file {:.2f} ms, memory {:.2f} ms".format(file_restore * 1000, memory_restore * 1000))
+    print(
+        "{} checkpoints in memory, {:.1f} kB of internal states per checkpoint".format(
+            stats["num_checkpoints"], stats["mean_internal_state_bytes"] / 1000
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
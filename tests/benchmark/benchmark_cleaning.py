@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+
+import time
+
+import numpy as np
+
+from igibson import object_states
+from igibson.external.pybullet_tools.utils import aabb_contains_point, get_aabb
+from igibson.object_states.cleaning_tool import CleaningTool
+from igibson.objects.particles import Dust, Stain
+from igibson.objects.ycb_object import YCBObject
+from igibson.scenes.igibson_indoor_scene import InteractiveIndoorScene
+from igibson.simulator import Simulator
+from igibson.utils.assets_utils import download_assets
+
+vectorized_update = CleaningTool._update
+
+
+def per_particle_update(self):
+    """
+    CleaningTool._update with one pybullet query and AABB test per particle, as it used to be
+    """
+    for particle_system in self.simulator.particle_systems:
+        particle_type = type(particle_system)
+        if particle_type is not Dust and particle_type is not Stain:
+            continue
+        if not particle_system.get_num_active():
+            continue
+        if isinstance(particle_system, Stain):
+            if object_states.Soaked not in self.obj.states or not self.obj.states[object_states.Soaked].get_value():
+                continue
+        contact_bodies = self.obj.states[object_states.ContactBodies].get_value()
+        touching_body = [cb for cb in contact_bodies if cb.bodyUniqueIdB == particle_system.parent_obj.get_body_id()]
+        if not any(self.link_id is None or cb.linkIndexA == self.link_id for cb in touching_body):
+            continue
+        if self.link_id is not None:
+            aabb = get_aabb(self.body_id, link=self.link_id)
+        else:
+            aabb = self.obj.states[object_states.AABB].get_value()
+        for particle in particle_system.get_active_particles():
+            if aabb_contains_point(particle.get_position(), aabb):
+                particle_system.stash_particle(particle)
+
+
+def benchmark_cleaning(update_fn, n_frame=300):
+    CleaningTool._update = update_fn
+    s = Simulator(mode="headless", image_width=128, image_height=128)
+    scene = InteractiveIndoorScene(
+        "Rs_int", texture_randomization=False, object_randomization=False, load_object_categories=["floors"]
+    )
+    s.import_ig_scene(scene)
+    np.random.seed(0)
+
+    block = YCBObject(name="036_wood_block", abilities={"soakable": {}, "cleaningTool": {}})
+    s.import_object(block)
+    for obj in scene.get_objects_with_state(object_states.Dusty):
+        obj.states[object_states.Dusty].set_value(True)
+    num_particles = sum(
+        obj.states[object_states.Dusty].dirt.get_num_active()
+        for obj in scene.get_objects_with_state(object_states.Dusty)
+    )
+
+    # Scrub the floor back and forth along a line
+    start = time.time()
+    for i in range(n_frame):
+        block.set_position([-2 + 4 * abs((i % 100) / 50.0 - 1), 0.5, 0.03])
+        s.step()
+    duration = time.time() - start
+
+    num_left = sum(
+        obj.states[object_states.Dusty].dirt.get_num_active()
+        for obj in scene.get_objects_with_state(object_states.Dusty)
+    )
+    s.disconnect()
+    CleaningTool._update = vectorized_update
+    return n_frame / duration, num_particles, num_left
+
+
+def main():
+    download_assets()
+    before, num_particles, num_left_before = benchmark_cleaning(per_particle_update)
+    after, _, num_left_after = benchmark_cleaning(vectorized_update)
+    print("dust particles: {}, left after scrubbing: {} / {}".format(num_particles, num_left_before, num_left_after))
+    print("per-particle cleaning {:.1f} steps/s, vectorized cleaning {:.1f} steps/s".format(before, after))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+import random
+import time
+from itertools import product
+
+import numpy as np
+import pybullet as p
+import pybullet_data
+
+from igibson.external.motion.motion_planners.rrt_connect import birrt
+from igibson.external.pybullet_tools.utils import (
+    get_collision_fn,
+    get_custom_limits,
+    get_distance_fn,
+    get_extend_fn,
+    get_moving_links,
+    get_sample_fn,
+    get_self_link_pairs,
+    pairwise_collision,
+    pairwise_link_collision,
+    set_joint_positions,
+)
+
+
+def get_per_configuration_collision_fn(body, joints, obstacles, self_collisions):
+    """
+    Collision function checking every moving link against every obstacle link for each configuration
+    """
+    check_link_pairs = get_self_link_pairs(body, joints) if self_collisions else []
+    moving_links = frozenset(get_moving_links(body, joints))
+    check_body_pairs = list(product([(body, moving_links)], obstacles))
+
+    def collision_fn(q):
+        set_joint_positions(body, joints, q)
+        for link1, link2 in check_link_pairs:
+            if pairwise_link_collision(body, link1, body, link2):
+                return True
+        for body1, body2 in check_body_pairs:
+            if pairwise_collision(body1, body2):
+                return True
+        return False
+
+    return collision_fn
+
+
+def load_scene(num_far_obstacles=100, num_near_obstacles=8, seed=0):
+    """
+    Load a Panda arm next to a table, a few cubes within its reach and many cubes out of its reach
+
+    :return: robot id, arm joints and obstacle ids
+    """
+    p.setAdditionalSearchPath(pybullet_data.getDataPath())
+    robot = p.loadURDF("franka_panda/panda.urdf", useFixedBase=True)
+    joints = [joint for joint in range(p.getNumJoints(robot)) if p.getJointInfo(robot, joint)[2] == p.JOINT_REVOLUTE]
+    obstacles = [p.loadURDF("table/table.urdf", [1.0, 0.0, -0.3], useFixedBase=True)]
+    rng = np.random.RandomState(seed)
+    for _ in range(num_near_obstacles):
+        position = rng.uniform([0.4, -0.6, 0.4], [0.9, 0.6, 0.9])
+        obstacles.append(p.loadURDF("cube_small.urdf", position, useFixedBase=True, globalScaling=2))
+    for _ in range(num_far_obstacles):
+        position = rng.uniform([-5.0, -5.0, 0.0], [5.0, 5.0, 2.0])
+        if np.linalg.norm(position[:2]) > 2.0:
+            obstacles.append(p.loadURDF("cube_small.urdf", position, useFixedBase=True, globalScaling=2))
+    return robot, joints, obstacles
+
+
+def main():
+    p.connect(p.DIRECT)
+    robot, joints, obstacles = load_scene()
+    lower_limits, upper_limits = get_custom_limits(robot, joints)
+    distance_fn = get_distance_fn(robot, joints)
+    sample_fn = get_sample_fn(robot, joints)
+    extend_fn = get_extend_fn(robot, joints)
+    collision_fns = [
+        ("per configuration", get_per_configuration_collision_fn(robot, joints, obstacles, self_collisions=False)),
+        ("collision checker", get_collision_fn(robot, joints, obstacles, [], False, set())),
+    ]
+
+    rng = np.random.RandomState(1)
+    queries = []
+    while len(queries) < 20:
+        start, goal = [tuple(rng.uniform(lower_limits, upper_limits)) for _ in range(2)]
+        if not any(collision_fns[1][1](q) for q in [start, goal]):
+            queries.append((start, goal))
+
+    paths = {}
+    for name, collision_fn in collision_fns:
+        paths[name] = []
+        start_time = time.time()
+        for i, (start, goal) in enumerate(queries):
+            random.seed(i)
+            np.random.seed(i)
+            paths[name].append(birrt(start, goal, distance_fn, sample_fn, extend_fn, collision_fn))
+        elapsed = time.time() - start_time
+        num_solved = sum(path is not None for path in paths[name])
+        print("{}: {} / {} solved in {:.2f} s".format(name, num_solved, len(queries), elapsed))
+    print("same paths: {}".format(paths[collision_fns[0][0]] == paths[collision_fns[1][0]]))
+    p.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from igibson.scenes.igibson_indoor_scene import InteractiveIndoorScene
+from igibson.simulator import Simulator
+from igibson.utils.assets_utils import download_assets
+from igibson.utils.ig_logging import IGLogWriter
+
+
+def benchmark_log_writer(log_dir, n_frame=1000, **log_writer_kwargs):
+    s = Simulator(mode="headless", image_width=128, image_height=128)
+    scene = InteractiveIndoorScene("Rs_int", texture_randomization=False, object_randomization=False)
+    s.import_ig_scene(scene)
+
+    log_writer = IGLogWriter(
+        s, os.path.join(log_dir, "log.hdf5"), filter_objects=False, log_status=False, **log_writer_kwargs
+    )
+    log_writer.set_up_data_storage()
+
+    latencies = []
+    for _ in range(n_frame):
+        s.step()
+        start = time.time()
+        log_writer.process_frame()
+        latencies.append(time.time() - start)
+    log_writer.end_log_session()
+    s.disconnect()
+    return np.max(latencies), np.mean(latencies), os.path.getsize(os.path.join(log_dir, "log.hdf5"))
+
+
+def main():
+    download_assets()
+    for name, kwargs in [
+        ("synchronous", {}),
+        ("asynchronous", {"async_write": True}),
+        ("asynchronous, lzf, compact dtypes", {"async_write": True, "compression": "lzf", "compact_dtypes": True}),
+    ]:
+        with tempfile.TemporaryDirectory() as log_dir:
+            worst, mean, size = benchmark_log_writer(log_dir, **kwargs)
+        print(
+            "{} writer: worst process_frame {:.2f} ms, mean {:.2f} ms, file size {:.1f} MB".format(
+                name, worst * 1000, mean * 1000, size / 1e6
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
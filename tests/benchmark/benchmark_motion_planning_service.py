@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+import os
+import random
+import time
+
+import numpy as np
+import pybullet as p
+import pybullet_data
+
+from igibson.robots.behavior_robot import LEFT_HAND_LOC_POSE_UNTRACKED, RIGHT_HAND_LOC_POSE_UNTRACKED
+from igibson.utils.behavior_robot_planning_utils import plan_base_motion_br
+from igibson.utils.motion_planning_service import MotionPlanningService, RigidBehaviorRobot, RigidBody
+
+
+class ProxyBehaviorRobot(RigidBehaviorRobot):
+    """
+    Cylinder body and sphere hands with the interface of the BehaviorRobot used by the planning service
+    """
+
+    use_tracked_body = False
+
+    def __init__(self):
+        body = p.createMultiBody(0, p.createCollisionShape(p.GEOM_CYLINDER, radius=0.25, height=1.2))
+        parts = {
+            "body": RigidBody(body),
+            "left_hand": RigidBody(p.loadURDF("sphere_small.urdf", globalScaling=2)),
+            "right_hand": RigidBody(p.loadURDF("sphere_small.urdf", globalScaling=2)),
+        }
+        hand_local_poses = {"left_hand": LEFT_HAND_LOC_POSE_UNTRACKED, "right_hand": RIGHT_HAND_LOC_POSE_UNTRACKED}
+        super(ProxyBehaviorRobot, self).__init__(parts, hand_local_poses, initial_z_offset=0.7)
+
+
+def load_scene(num_tables=40, seed=3):
+    """
+    Load the robot among randomly placed tables
+
+    :return: robot and obstacle ids
+    """
+    p.setAdditionalSearchPath(pybullet_data.getDataPath())
+    robot = ProxyBehaviorRobot()
+    robot.set_position_orientation([0, 0, 0.7], [0, 0, 0, 1])
+    rng = np.random.RandomState(seed)
+    obstacles = []
+    for _ in range(num_tables):
+        x, y = rng.uniform(-4, 4, 2)
+        if np.linalg.norm([x, y]) > 0.8:
+            orn = p.getQuaternionFromEuler([0, 0, rng.uniform(0, np.pi)])
+            obstacles.append(p.loadURDF("table/table.urdf", [x, y, 0], orn, useFixedBase=True, globalScaling=0.6))
+    return robot, obstacles
+
+
+def sample_goals(robot, obstacles, num_goals, seed=0):
+    """
+    :return: list of collision-free base configurations
+    """
+    rng = np.random.RandomState(seed)
+    goals = []
+    while len(goals) < num_goals:
+        x, y = rng.uniform(-4, 4, 2)
+        yaw = rng.uniform(-np.pi, np.pi)
+        robot.set_position_orientation([x, y, 0.7], p.getQuaternionFromEuler([0, 0, yaw]))
+        if not any(
+            p.getClosestPoints(part.get_body_id(), obstacle, 0.0)
+            for part in robot.parts.values()
+            for obstacle in obstacles
+        ):
+            goals.append([x, y, yaw])
+    robot.set_position_orientation([0, 0, 0.7], [0, 0, 0, 1])
+    return goals
+
+
+def main():
+    p.connect(p.DIRECT)
+    robot, obstacles = load_scene()
+    num_workers = os.cpu_count()
+    candidates = [
+        {"end_conf": goal, "base_limits": [(-5, -5), (5, 5)]} for goal in sample_goals(robot, obstacles, num_workers)
+    ]
+    seeds = list(range(len(candidates)))
+
+    start_time = time.time()
+    for kwargs, seed in zip(candidates, seeds):
+        random.seed(seed)
+        np.random.seed(seed)
+        plan = plan_base_motion_br(robot=robot, obstacles=obstacles, **kwargs)
+        robot.set_position_orientation([0, 0, 0.7], [0, 0, 0, 1])
+        if plan is not None:
+            break
+    print("sequential: first plan in {:.2f} s".format(time.time() - start_time))
+
+    service = MotionPlanningService(num_workers)
+    # The first request loads the world in the workers
+    service.solve("base", robot, candidates[:1], obstacles=obstacles, seeds=seeds[:1])
+    start_time = time.time()
+    index, plan = service.solve("base", robot, candidates, obstacles=obstacles, seeds=seeds)
+    print(
+        "service with {} workers: first plan in {:.2f} s, candidate {}".format(
+            num_workers, time.time() - start_time, index
+        )
+    )
+    service.close()
+    p.disconnect()
+
+
+if __name__ == "__main__":
+    main()
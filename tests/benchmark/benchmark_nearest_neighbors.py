@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+import time
+
+import numpy as np
+
+from igibson.external.motion.motion_planners.nearest_neighbors import LinearNearestNeighbors, get_nearest_neighbors
+from igibson.external.motion.motion_planners.rrt_connect import rrt_connect
+from igibson.external.pybullet_tools.utils import CIRCULAR_LIMITS, get_base_difference_fn, get_base_distance_fn
+
+
+def benchmark_rrt_connect(iterations, nearest_neighbors_fn, seed=0):
+    """
+    Grow the two trees of rrt_connect for a number of iterations in a base configuration space where the goal is
+    walled off, so that the planner never finds a path
+
+    :return: planning time and total number of tree nodes
+    """
+    difference_fn = get_base_difference_fn()
+    distance_fn = get_base_distance_fn(weights=np.ones(3))
+
+    def sample_fn():
+        x, y = np.random.uniform(-5.0, 5.0, 2)
+        theta = np.random.uniform(*CIRCULAR_LIMITS)
+        return (x, y, theta)
+
+    def extend_fn(q1, q2):
+        n = int(np.max(np.abs(np.divide(difference_fn(q2, q1), 0.05)))) + 1
+        for i in range(n):
+            yield tuple((i + 1) / n * np.array(difference_fn(q2, q1)) + np.array(q1))
+
+    def collision_fn(q):
+        return 3.0 < np.linalg.norm(q[:2]) < 3.5
+
+    num_nodes = [0]
+
+    def counting_nearest_neighbors_fn(distance_fn):
+        nearest_neighbors = nearest_neighbors_fn(distance_fn)
+        add = nearest_neighbors.add
+
+        def counting_add(config, item):
+            num_nodes[0] += 1
+            add(config, item)
+
+        nearest_neighbors.add = counting_add
+        return nearest_neighbors
+
+    np.random.seed(seed)
+    start = time.time()
+    path = rrt_connect(
+        (0.0, 0.0, 0.0),
+        (4.0, 4.0, 0.0),
+        distance_fn,
+        sample_fn,
+        extend_fn,
+        collision_fn,
+        iterations=iterations,
+        nearest_neighbors_fn=counting_nearest_neighbors_fn,
+    )
+    assert path is None
+    return time.time() - start, num_nodes[0]
+
+
+def main():
+    for iterations in [50, 100, 200, 400, 800]:
+        linear_time, num_nodes = benchmark_rrt_connect(iterations, LinearNearestNeighbors)
+        kdtree_time, _ = benchmark_rrt_connect(iterations, get_nearest_neighbors)
+        print(
+            "{} iterations, {} tree nodes: linear scan {:.2f} s, kd-tree {:.2f} s, speedup {:.1f}x".format(
+                iterations, num_nodes, linear_time, kdtree_time, linear_time / kdtree_time
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+import time
+
+import numpy as np
+import pybullet as p
+
+from igibson.scenes.igibson_indoor_scene import InteractiveIndoorScene
+from igibson.simulator import Simulator
+from igibson.utils.assets_utils import download_assets
+
+
+def benchmark_object_states(dirty_state_updates, n_frame=300):
+    s = Simulator(mode="headless", image_width=128, image_height=128, dirty_state_updates=dirty_state_updates)
+    scene = InteractiveIndoorScene("Rs_int", texture_randomization=False, object_randomization=False)
+    s.import_ig_scene(scene)
+    np.random.seed(0)
+
+    # Let the scene settle so that most of the bodies fall asleep
+    for _ in range(100):
+        s.step()
+
+    state_update_time = 0.0
+    for i in range(n_frame):
+        # Keep a few objects moving so that the dirty set is not empty
+        if i % 30 == 0:
+            for obj in np.random.choice(scene.get_objects(), 5, replace=False):
+                if obj.get_body_id() is not None:
+                    p.applyExternalForce(obj.get_body_id(), -1, [0, 0, 50], [0, 0, 0], p.LINK_FRAME)
+                    obj.force_wakeup()
+        for _ in range(s.physics_timestep_num):
+            p.stepSimulation()
+        s.activation_tracker.refresh()
+        start = time.time()
+        s._non_physics_step()
+        state_update_time += time.time() - start
+        s.sync(refresh_activation=False)
+        s.frame_count += 1
+
+    num_awake = s.activation_tracker.get_num_awake_bodies()
+    num_tracked = s.activation_tracker.get_num_tracked_bodies()
+    s.disconnect()
+    return state_update_time / n_frame, num_awake, num_tracked
+
+
+def main():
+    download_assets()
+    full_sweep, _, _ = benchmark_object_states(dirty_state_updates=False)
+    dirty_set, num_awake, num_tracked = benchmark_object_states(dirty_state_updates=True)
+    print("awake bodies at the end: {} of {}".format(num_awake, num_tracked))
+    print(
+        "object state update: full sweep {:.3f} ms, dirty set {:.3f} ms, speedup {:.2f}x".format(
+            full_sweep * 1000, dirty_set * 1000, full_sweep / max(dirty_set, np.finfo(float).eps)
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+import time
+
+import gym
+import numpy as np
+
+from igibson.envs.parallel_env import ParallelNavEnv
+
+IMAGE_SIZE = 128
+
+
+class ObservationOnlyEnv(object):
+    """
+    Environment with the observation space of a navigation env and no simulation, to measure the transport of the
+    observations between the processes
+    """
+
+    def __init__(self):
+        self.observation_space = gym.spaces.Dict(
+            {
+                "rgb": gym.spaces.Box(0.0, 1.0, (IMAGE_SIZE, IMAGE_SIZE, 4), np.float32),
+                "depth": gym.spaces.Box(0.0, 1.0, (IMAGE_SIZE, IMAGE_SIZE, 1), np.float32),
+                "seg": gym.spaces.Box(0.0, 1.0, (IMAGE_SIZE, IMAGE_SIZE, 1), np.float32),
+                "scan": gym.spaces.Box(0.0, 1.0, (228, 1), np.float32),
+            }
+        )
+        self.action_space = gym.spaces.Box(-1.0, 1.0, (2,), np.float32)
+        self.obs = {
+            key: np.random.uniform(size=space.shape).astype(space.dtype)
+            for key, space in self.observation_space.spaces.items()
+        }
+
+    def reset(self):
+        return self.obs
+
+    def step(self, action):
+        return self.obs, 0.0, False, {}
+
+
+def benchmark_parallel_env(num_envs, use_shared_memory, n_frame=200):
+    env = ParallelNavEnv([ObservationOnlyEnv] * num_envs, use_shared_memory=use_shared_memory)
+    env.reset()
+    actions = [[0.0, 0.0]] * num_envs
+    start = time.time()
+    for _ in range(n_frame):
+        env.step(actions)
+    duration = time.time() - start
+    env.close()
+    return n_frame * num_envs / duration
+
+
+def main():
+    for num_envs in [1, 2, 4, 8, 16, 32]:
+        pipe = benchmark_parallel_env(num_envs, use_shared_memory=False)
+        shared = benchmark_parallel_env(num_envs, use_shared_memory=True)
+        print(
+            "{} workers: pipe {:.1f} steps/s, shared memory {:.1f} steps/s, speedup {:.2f}x".format(
+                num_envs, pipe, shared, shared / pipe
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
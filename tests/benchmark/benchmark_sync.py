@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+import os
+import time
+
+import numpy as np
+
+from igibson.robots.fetch_robot import Fetch
+from igibson.scenes.stadium_scene import StadiumScene
+from igibson.simulator import Simulator
+from igibson.utils.assets_utils import download_assets
+from igibson.utils.utils import parse_config
+
+
+def per_instance_sync(s):
+    """
+    Sync with one pybullet query per link, as Simulator.sync used to do
+    """
+    body_links_awake = 0
+    for instance in s.renderer.instances:
+        if instance.dynamic:
+            body_links_awake += s.update_position(instance, force_sync=True)
+    return body_links_awake
+
+
+def batched_sync(s):
+    return s.update_positions_batched(force_sync=True)
+
+
+def benchmark_sync(num_robots, n_frame=200):
+    config = parse_config(os.path.join(os.path.dirname(__file__), "..", "test.yaml"))
+    s = Simulator(mode="headless", image_width=128, image_height=128)
+    scene = StadiumScene()
+    s.import_scene(scene)
+    for i in range(num_robots):
+        fetch = Fetch(config)
+        s.import_robot(fetch)
+        fetch.set_position([(i % 8) * 1.5, (i // 8) * 1.5, 0])
+    s.step()
+
+    results = {}
+    for name, sync_fn in [("per-instance", per_instance_sync), ("batched", batched_sync)]:
+        num_links = sync_fn(s)
+        start = time.time()
+        for _ in range(n_frame):
+            sync_fn(s)
+        results[name] = (time.time() - start) / n_frame
+    s.disconnect()
+    return num_links, results
+
+
+def main():
+    download_assets()
+    for num_robots in [1, 2, 4, 8, 16, 32]:
+        num_links, results = benchmark_sync(num_robots)
+        print(
+            "{} links: per-instance sync {:.3f} ms, batched sync {:.3f} ms, speedup {:.2f}x".format(
+                num_links,
+                results["per-instance"] * 1000,
+                results["batched"] * 1000,
+                results["per-instance"] / max(results["batched"], np.finfo(float).eps),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+
+import time
+
+import numpy as np
+
+import igibson.utils.transform_utils as T
+from igibson.utils.mesh_util import quat2rotmat, quat2rotmat_batch, xyz2mat, xyz2mat_batch
+
+
+def random_poses(n):
+    pos = np.random.uniform(-1.0, 1.0, (n, 3))
+    quat = np.random.normal(size=(n, 4))
+    quat /= np.linalg.norm(quat, axis=1, keepdims=True)
+    return pos, quat
+
+
+def benchmark(per_element_fn, batch_fn, n, repeat=5):
+    """
+    :return: throughput of the per-element and the batched conversions, in elements per second
+    """
+    per_element, batch = [], []
+    for _ in range(repeat):
+        start = time.time()
+        per_element_fn()
+        per_element.append(time.time() - start)
+
+        start = time.time()
+        batch_fn()
+        batch.append(time.time() - start)
+    return n / np.min(per_element), n / np.min(batch)
+
+
+def main():
+    for n in [1, 10, 100, 1000, 10000]:
+        pos, quat = random_poses(n)
+        rmats = T.quat2mat_batch(quat)
+        conversions = [
+            ("quat2mat", lambda: [T.quat2mat(q) for q in quat], lambda: T.quat2mat_batch(quat)),
+            ("mat2quat", lambda: [T.mat2quat(m) for m in rmats], lambda: T.mat2quat_batch(rmats)),
+            ("pose2mat", lambda: [T.pose2mat((x, q)) for x, q in zip(pos, quat)], lambda: T.pose2mat_batch(pos, quat)),
+            ("quat_multiply", lambda: [T.quat_multiply(q, q) for q in quat], lambda: T.quat_multiply_batch(quat, quat)),
+            ("quat2rotmat", lambda: [quat2rotmat(q) for q in quat], lambda: quat2rotmat_batch(quat)),
+            ("xyz2mat", lambda: [xyz2mat(x) for x in pos], lambda: xyz2mat_batch(pos)),
+        ]
+        for name, per_element_fn, batch_fn in conversions:
+            per_element, batch = benchmark(per_element_fn, batch_fn, n)
+            print(
+                "{} N={}: per element {:.0f}/s, batched {:.0f}/s, speedup {:.1f}x".format(
+                    name, n, per_element, batch, batch / per_element
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import pybullet as p
+import pybullet_data
+import pytest
+
+from igibson.objects.cube import Cube
+
+
+@pytest.fixture
+def pybullet_direct():
+    """
+    Connect to pybullet without a GUI for the duration of a test
+    """
+    p.connect(p.DIRECT)
+    p.setAdditionalSearchPath(pybullet_data.getDataPath())
+    yield
+    p.disconnect()
+
+
+@pytest.fixture
+def load_cube(pybullet_direct):
+    """
+    :return: function loading a Cube with initialized object states, without a simulator
+    """
+
+    def load(position, half_extent=0.1, mass=0, abilities=None):
+        cube = Cube(pos=position, dim=[half_extent] * 3, mass=mass, abilities=abilities)
+        cube.load()
+        for state in cube.states.values():
+            state.initialize(None)
+        return cube
+
+    return load
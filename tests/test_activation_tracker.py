@@ -0,0 +1,59 @@
+import pybullet as p
+import pytest
+
+from igibson.physics import activation_tracker
+from igibson.physics.activation_tracker import ActivationStateTracker, get_pose_version, mark_body_awake
+
+
+def test_activation_state_tracker(load_cube, monkeypatch):
+    body_ids = [load_cube([i, 0, 1], mass=1).get_body_id() for i in range(3)]
+    tracker = ActivationStateTracker()
+    tracker.untrack_all()
+
+    # Not all builds of pybullet report activation states, so the sleeping bodies are chosen by the test
+    sleeping_bodies = set()
+    monkeypatch.setattr(activation_tracker, "is_body_awake", lambda body_id: body_id not in sleeping_bodies)
+    for body_id in body_ids:
+        tracker.track_body(body_id)
+    assert tracker.get_awake_bodies() == set(body_ids)
+    assert tracker.get_num_tracked_bodies() == 3
+
+    # The bodies falling asleep may have moved during the step, the ones already asleep have not
+    sleeping_bodies.update(body_ids[:2])
+    versions = [get_pose_version(body_id) for body_id in body_ids]
+    tracker.refresh()
+    assert tracker.awake_bodies == {body_ids[2]}
+    assert tracker.newly_asleep_bodies == set(body_ids[:2])
+    assert all(get_pose_version(body_id) != version for body_id, version in zip(body_ids, versions))
+
+    versions = [get_pose_version(body_id) for body_id in body_ids]
+    tracker.refresh()
+    assert tracker.newly_asleep_bodies == set()
+    changed = [get_pose_version(body_id) != version for body_id, version in zip(body_ids, versions)]
+    assert changed == [False, False, True]
+
+    sleeping_bodies.remove(body_ids[0])
+    tracker.refresh()
+    assert tracker.newly_awake_bodies == {body_ids[0]}
+    assert not tracker.is_awake(body_ids[1])
+
+    # A body moved through the iGibson API is awake until the next sync
+    version = get_pose_version(body_ids[1])
+    mark_body_awake(body_ids[1])
+    assert tracker.is_awake(body_ids[1])
+    assert tracker.get_woken_bodies() == {body_ids[1]}
+    assert get_pose_version(body_ids[1]) != version
+    tracker.clear_woken_bodies()
+    assert not tracker.is_awake(body_ids[1])
+
+    # pybullet cannot be queried for removed bodies, so they must be untracked
+    monkeypatch.undo()
+    mark_body_awake(body_ids[1])
+    p.removeBody(body_ids[1])
+    with pytest.raises(p.error):
+        tracker.refresh()
+    tracker.untrack_body(body_ids[1])
+    tracker.refresh()
+    assert tracker.body_ids == {body_ids[0], body_ids[2]}
+    assert tracker.get_woken_bodies() == set()
+    assert get_pose_version(body_ids[1]) == 0
@@ -0,0 +1,68 @@
+import numpy as np
+
+from igibson.object_states.adjacency import (
+    HorizontalAdjacency,
+    VerticalAdjacency,
+    compute_adjacencies,
+    compute_adjacencies_batch,
+    update_adjacencies,
+)
+
+
+def load_cubes(load_cube, num_cubes=60, seed=0):
+    """
+    :return: cubes on a grid, stacked in columns of random heights so that the rays hit several bodies
+    """
+    rng = np.random.RandomState(seed)
+    cubes = []
+    while len(cubes) < num_cubes:
+        x, y = rng.randint(0, 6, 2) * 0.4 + rng.uniform(-0.05, 0.05, 2)
+        for level in range(rng.randint(1, 4)):
+            cubes.append(load_cube([x, y, 0.1 + 0.25 * level]))
+    return cubes
+
+
+def test_compute_adjacencies_batch(load_cube):
+    cubes = load_cubes(load_cube)
+    queries = [
+        state_type.get_adjacency_query(cube)
+        for cube in cubes
+        for state_type in [VerticalAdjacency, HorizontalAdjacency]
+    ]
+    batch_adjacencies = compute_adjacencies_batch(queries)
+    assert len(batch_adjacencies) == len(queries)
+    for query, adjacencies in zip(queries, batch_adjacencies):
+        assert adjacencies == compute_adjacencies(*query)
+
+    # The cube in the middle of a stack of three sees both of the others
+    bottom, middle, top = [load_cube([5.0, 5.0, 0.1 + 0.25 * level]) for level in range(3)]
+    (vertical,) = compute_adjacencies_batch([VerticalAdjacency.get_adjacency_query(middle)])[0]
+    assert vertical.positive_neighbors == [top.get_body_id()]
+    assert vertical.negative_neighbors == [bottom.get_body_id()]
+
+
+def test_compute_adjacencies_batch_size(load_cube):
+    cubes = load_cubes(load_cube)
+    # More rays than pybullet casts in one batch
+    rng = np.random.RandomState(1)
+    axes = rng.normal(size=(8200, 3))
+    axes /= np.linalg.norm(axes, axis=1)[:, None]
+    (adjacencies,) = compute_adjacencies_batch([(cubes[0], axes, 2.0)])
+    assert adjacencies == [
+        adjacency for chunk in np.array_split(axes, 10) for adjacency in compute_adjacencies(cubes[0], chunk, 2.0)
+    ]
+    assert any(adjacency.positive_neighbors for adjacency in adjacencies)
+
+
+def test_update_adjacencies(load_cube):
+    cubes = load_cubes(load_cube, num_cubes=10)
+    sentinel = object()
+    cubes[0].states[VerticalAdjacency].value = sentinel
+
+    update_adjacencies(cubes)
+    assert cubes[0].states[VerticalAdjacency].value is sentinel
+    for cube in cubes:
+        for state_type in [VerticalAdjacency, HorizontalAdjacency]:
+            state = cube.states[state_type]
+            if state.value is not sentinel:
+                assert state.value == state._compute_value()
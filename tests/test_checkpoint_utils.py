@@ -0,0 +1,133 @@
+import os
+
+import numpy as np
+import pybullet as p
+import pytest
+
+from igibson.object_states import Temperature
+from igibson.utils.checkpoint_utils import CheckpointManager
+
+
+class StubScene(object):
+    def __init__(self, objects_by_name):
+        self.objects_by_name = objects_by_name
+
+
+class StubSimulator(object):
+    def __init__(self, objects_by_name):
+        self.scene = StubScene(objects_by_name)
+        self.robots = []
+        self.frame_count = 0
+
+    def step(self):
+        # The temperatures are part of the object states but not of the pybullet state
+        p.stepSimulation()
+        for obj in self.scene.objects_by_name.values():
+            obj.states[Temperature].set_value(obj.states[Temperature].get_value() + 1)
+        self.frame_count += 1
+
+
+def load_simulator(load_cube):
+    p.setGravity(0, 0, -9.8)
+    p.loadURDF("plane.urdf")
+    objects_by_name = {
+        "cube_{}".format(i): load_cube(
+            [0.1 * i, 0, 0.5 + 0.2 * i], half_extent=0.025, mass=1, abilities={"cookable": {}}
+        )
+        for i in range(3)
+    }
+    return StubSimulator(objects_by_name)
+
+
+def get_simulator_state(simulator):
+    return {
+        name: (obj.get_position(), obj.states[Temperature].get_value())
+        for name, obj in sorted(simulator.scene.objects_by_name.items())
+    }
+
+
+def assert_same_state(state1, state2):
+    assert state1.keys() == state2.keys()
+    for name in state1:
+        assert np.allclose(state1[name][0], state2[name][0])
+        assert state1[name][1] == state2[name][1]
+
+
+def is_state_removed(state_id):
+    try:
+        p.restoreState(state_id)
+    except p.error:
+        return True
+    return False
+
+
+def test_checkpoint_round_trip(load_cube):
+    simulator = load_simulator(load_cube)
+    checkpoint_manager = CheckpointManager(simulator)
+    simulator.step()
+    frame = checkpoint_manager.save()
+    saved_state = get_simulator_state(simulator)
+
+    for _ in range(20):
+        simulator.step()
+    assert not np.allclose(get_simulator_state(simulator)["cube_2"][0], saved_state["cube_2"][0])
+
+    checkpoint_manager.restore(frame)
+    assert_same_state(get_simulator_state(simulator), saved_state)
+    with pytest.raises(KeyError):
+        checkpoint_manager.restore(frame + 1)
+
+    checkpoint_manager.clear()
+
+
+def test_checkpoint_eviction_and_release(load_cube):
+    simulator = load_simulator(load_cube)
+    checkpoint_manager = CheckpointManager(simulator, max_checkpoints=3)
+    state_ids = {}
+    for _ in range(4):
+        simulator.step()
+        frame = checkpoint_manager.save()
+        state_ids[frame] = checkpoint_manager.checkpoints[frame][0]
+        if frame == 2:
+            # Restoring the first checkpoint makes the second one the least recently used
+            checkpoint_manager.restore(1)
+
+    assert checkpoint_manager.get_frames() == [1, 3, 4]
+    assert is_state_removed(state_ids[2])
+    assert checkpoint_manager.get_stats()["num_checkpoints"] == 3
+
+    checkpoint_manager.drop(3)
+    assert checkpoint_manager.get_frames() == [1, 4]
+    assert is_state_removed(state_ids[3])
+    assert not is_state_removed(state_ids[4])
+
+    checkpoint_manager.clear()
+    assert checkpoint_manager.get_frames() == []
+    assert is_state_removed(state_ids[1]) and is_state_removed(state_ids[4])
+
+
+def test_checkpoint_spill_and_load(load_cube, tmp_path):
+    simulator = load_simulator(load_cube)
+    checkpoint_manager = CheckpointManager(simulator)
+    saved_states = {}
+    for _ in range(3):
+        for _ in range(10):
+            simulator.step()
+        frame = checkpoint_manager.save()
+        saved_states[frame] = get_simulator_state(simulator)
+
+    path = os.path.join(str(tmp_path), "checkpoints.pkl")
+    current_state = get_simulator_state(simulator)
+    checkpoint_manager.spill(path)
+    assert_same_state(get_simulator_state(simulator), current_state)
+
+    loaded_checkpoint_manager = CheckpointManager(simulator)
+    loaded_checkpoint_manager.load(path)
+    assert_same_state(get_simulator_state(simulator), current_state)
+    assert loaded_checkpoint_manager.get_frames() == sorted(saved_states)
+    for frame, saved_state in saved_states.items():
+        loaded_checkpoint_manager.restore(frame)
+        assert_same_state(get_simulator_state(simulator), saved_state)
+
+    checkpoint_manager.clear()
+    loaded_checkpoint_manager.clear()
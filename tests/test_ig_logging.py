@@ -0,0 +1,200 @@
+import os
+
+import h5py
+import numpy as np
+import pybullet as p
+import pytest
+
+from igibson.utils.ig_logging import IGLogReader, IGLogWriter
+
+
+class TimingSimulator(object):
+    """
+    Stepping and timing attributes of the Simulator used by IGLogWriter
+    """
+
+    def __init__(self):
+        self.physics_timestep = 1 / 240.0
+        self.render_timestep = 1 / 30.0
+        self.frame_count = 0
+        self.last_physics_timestep = -1
+        self.last_render_timestep = -1
+        self.last_frame_dur = -1
+
+    def step(self):
+        p.stepSimulation()
+        self.frame_count += 1
+        self.last_physics_timestep = 0.001 * self.frame_count
+        self.last_render_timestep = 0.002 * self.frame_count
+        self.last_frame_dur = 0.003 * self.frame_count
+
+
+def load_world(load_cube):
+    """
+    :return: body ids of falling cubes and of a robot spinning its wheels, which has joints
+    """
+    p.setGravity(0, 0, -9.8)
+    p.loadURDF("plane.urdf")
+    body_ids = [load_cube([0.3 * i, 0, 0.5 + 0.2 * i], half_extent=0.05, mass=1).get_body_id() for i in range(3)]
+    robot_id = p.loadURDF("r2d2.urdf", [2, 0, 0.5])
+    for joint in range(p.getNumJoints(robot_id)):
+        p.setJointMotorControl2(robot_id, joint, p.VELOCITY_CONTROL, targetVelocity=5.0, force=10.0)
+    return body_ids + [robot_id]
+
+
+def write_log(log_filepath, num_frames=50, frames_before_write=10, **kwargs):
+    """
+    Step the simulation and log every frame, with an action
+
+    :return: IGLogWriter, after the end of the log session
+    """
+    simulator = TimingSimulator()
+    writer = IGLogWriter(simulator, log_filepath, frames_before_write=frames_before_write, log_status=False, **kwargs)
+    writer.register_action("hand/force", (3,))
+    writer.set_up_data_storage()
+    for frame in range(num_frames):
+        simulator.step()
+        writer.save_action("hand/force", np.full(3, frame))
+        writer.process_frame()
+    writer.end_log_session()
+    return writer
+
+
+def read_datasets(log_filepath):
+    """
+    :return: dictionary of the contents of all the datasets of an HDF5 file, by path
+    """
+    datasets = {}
+    with h5py.File(log_filepath, "r") as hf:
+        hf.visititems(lambda path, item: datasets.update({path: item[()]}) if isinstance(item, h5py.Dataset) else None)
+    return datasets
+
+
+def test_async_write(load_cube, tmp_path):
+    load_world(load_cube)
+    state_id = p.saveState()
+    datasets = {}
+    for async_write in [False, True]:
+        p.restoreState(state_id)
+        log_filepath = os.path.join(str(tmp_path), "log_{}.hdf5".format(async_write))
+        write_log(log_filepath, async_write=async_write)
+        datasets[async_write] = read_datasets(log_filepath)
+
+    assert datasets[False]["frame_data"].shape[0] == 50
+    assert datasets[True].keys() == datasets[False].keys()
+    for path, data in datasets[False].items():
+        assert datasets[True][path].dtype == data.dtype
+        assert np.array_equal(datasets[True][path], data), path
+
+
+def test_async_write_error(load_cube, tmp_path):
+    load_world(load_cube)
+    simulator = TimingSimulator()
+    writer = IGLogWriter(
+        simulator, os.path.join(str(tmp_path), "log.hdf5"), frames_before_write=10, log_status=False, async_write=True
+    )
+    writer.set_up_data_storage()
+
+    # The first write of the writer thread fails
+    write_data_map_to_hd5 = writer.write_data_map_to_hd5
+
+    def fail_once(data_map):
+        writer.write_data_map_to_hd5 = write_data_map_to_hd5
+        raise IOError("disk full")
+
+    writer.write_data_map_to_hd5 = fail_once
+    # The error is raised in the simulation thread at a later write, once the failed data map is handed back
+    with pytest.raises(IOError, match="disk full"):
+        for _ in range(30):
+            simulator.step()
+            writer.process_frame()
+    writer.end_log_session()
+
+
+def get_physics_state(body_id):
+    """
+    :return: base position, base orientation and joint positions of a body, from pybullet
+    """
+    position, orientation = p.getBasePositionAndOrientation(body_id)
+    joint_indices = list(range(p.getNumJoints(body_id)))
+    joint_state = [state[0] for state in p.getJointStates(body_id, joint_indices)] if joint_indices else []
+    return {"position": position, "orientation": orientation, "joint_state": joint_state}
+
+
+def test_physics_buffer(load_cube, tmp_path):
+    body_ids = load_world(load_cube)
+    simulator = TimingSimulator()
+    log_filepath = os.path.join(str(tmp_path), "log.hdf5")
+    writer = IGLogWriter(simulator, log_filepath, frames_before_write=10, log_status=False)
+    writer.set_up_data_storage()
+    assert set(body_ids) <= set(writer.tracked_objects)
+
+    # The per-body datasets are views of the preallocated buffer
+    physics_buffer = writer.data_map["physics_buffer"]
+    for bid in writer.tracked_objects:
+        for data in writer.data_map["physics_data"][str(bid)].values():
+            assert data.base is physics_buffer
+
+    expected = {bid: [] for bid in writer.tracked_objects}
+    for _ in range(25):
+        simulator.step()
+        writer.process_frame()
+        for bid in writer.tracked_objects:
+            expected[bid].append(get_physics_state(bid))
+
+        # The frame is in the current data map until it is written
+        if writer.frame_counter > 0:
+            frame = writer.frame_counter - 1
+            row = writer.data_map["physics_buffer"][frame]
+            for bid in writer.tracked_objects:
+                physics_data = writer.data_map["physics_data"][str(bid)]
+                start = writer.physics_columns[bid]
+                values = []
+                for name in ["position", "orientation", "joint_state"]:
+                    assert np.allclose(physics_data[name][frame], expected[bid][-1][name])
+                    values.extend(expected[bid][-1][name])
+                assert np.allclose(row[start : start + len(values)], values)
+    writer.end_log_session()
+
+    # Only the full data maps are written
+    datasets = read_datasets(log_filepath)
+    for bid in writer.tracked_objects:
+        for name in ["position", "orientation", "joint_state"]:
+            data = datasets["physics_data/{}/{}".format(bid, name)]
+            assert data.shape[0] == 20
+            assert np.allclose(data, [state[name] for state in expected[bid][:20]])
+
+
+def test_prefetched_reader(load_cube, tmp_path):
+    body_ids = load_world(load_cube)
+    log_filepath = os.path.join(str(tmp_path), "log.hdf5")
+    write_log(log_filepath, num_frames=50)
+    # 50 frames are 6 full blocks and a last block of 2 frames
+    block_size = 8
+    reader = IGLogReader(log_filepath, log_status=False, block_size=block_size)
+    frame_reader = IGLogReader(log_filepath, log_status=False)
+    value_paths = ["frame_data", "physics_data/{}/position".format(body_ids[0])]
+    value_paths.append("physics_data/{}/joint_state".format(body_ids[-1]))
+
+    dataset = reader.data["frame_data"]
+    assert dataset.num_blocks == 7
+    assert len(dataset.get_block(6)) == 2
+    num_frames = 0
+    while reader.get_data_left_to_read():
+        assert frame_reader.get_data_left_to_read()
+        for value_path in value_paths:
+            assert np.array_equal(reader.read_value(value_path), frame_reader.read_value(value_path))
+        assert np.array_equal(reader.read_action("hand/force"), frame_reader.read_action("hand/force"))
+        # Only the current block and the prefetched next block are kept
+        block_index = reader.frame_counter // block_size
+        assert set(dataset.blocks) == {block_index, block_index + 1} & set(range(dataset.num_blocks))
+        num_frames += 1
+    assert num_frames == 50
+    assert not frame_reader.get_data_left_to_read()
+
+    # Negative indices, NumPy integers and ranges of frames
+    for frame in [-1, -2, -3, -50, np.int64(17), slice(5, 20), slice(45, None)]:
+        for value_path in value_paths:
+            assert np.array_equal(reader.read_value(value_path, frame), frame_reader.read_value(value_path, frame))
+    reader.end_log_session()
+    frame_reader.end_log_session()
@@ -1,6 +1,8 @@
 import os
 from time import time
 
+import pybullet as p
+
 import igibson
 from igibson.envs.igibson_env import iGibsonEnv
 from igibson.utils.assets_utils import download_assets, download_demo_data
@@ -73,3 +75,27 @@ def test_env_reset():
     assert env.task.reset_scene_called
     assert env.task.reset_agent_called
     assert env.task.get_task_obs_called
+
+
+def test_check_placement_collision(pybullet_direct):
+    p.setGravity(0, 0, -9.8)
+    # Convex mesh boxes, as the objects of the scenes
+    vertices = [[x, y, z] for x in [-0.1, 0.1] for y in [-0.1, 0.1] for z in [-0.1, 0.1]]
+    shape = p.createCollisionShape(p.GEOM_MESH, vertices=vertices)
+    p.createMultiBody(0, shape, basePosition=[0, 0, 0.1])
+
+    def has_collision_after_step(body_id):
+        state_id = p.saveState()
+        p.stepSimulation()
+        collision = len(p.getContactPoints(bodyA=body_id)) > 0
+        p.restoreState(state_id)
+        p.removeState(state_id)
+        return collision
+
+    # Overlapping, touching, a few millimeters apart and clearly apart
+    for gap, step_collision in [(-0.02, True), (0.0, True), (0.003, True), (0.05, False)]:
+        body_id = p.createMultiBody(1, shape, basePosition=[0, 0, 0.3 + gap])
+        assert has_collision_after_step(body_id) == step_collision
+        # The contact points after the step include the collision margin, not the placement check
+        assert iGibsonEnv.check_placement_collision(body_id) == (gap > 0)
+        p.removeBody(body_id)
@@ -0,0 +1,81 @@
+import pybullet as p
+
+from igibson.object_states import memoization
+from igibson.object_states.memoization import PositionalValidationMemoizedObjectStateMixin
+from igibson.object_states.utils import clear_cached_states
+from igibson.physics.activation_tracker import ActivationStateTracker, bump_pose_version, mark_body_awake
+
+
+class BodyIdsState(object):
+    """
+    Relative state returning the body ids of the other objects and counting its computations
+    """
+
+    def __init__(self, obj):
+        self.obj = obj
+        self.num_computations = 0
+
+    def get_value(self, *others):
+        self.num_computations += 1
+        return tuple(other.get_body_id() for other in others)
+
+
+class MemoizedBodyIdsState(PositionalValidationMemoizedObjectStateMixin, BodyIdsState):
+    pass
+
+
+def test_pose_version_memoization(load_cube):
+    obj, other = load_cube([0, 0, 1], mass=1), load_cube([1, 0, 1], mass=1)
+    state = MemoizedBodyIdsState(obj)
+
+    def is_memoized():
+        num_computations = state.num_computations
+        assert state.get_value(other) == (other.get_body_id(),)
+        return state.num_computations == num_computations
+
+    assert not is_memoized()
+    assert is_memoized()
+
+    bump_pose_version(other.get_body_id())
+    assert not is_memoized()
+    assert is_memoized()
+
+    mark_body_awake(obj.get_body_id())
+    assert not is_memoized()
+
+    clear_cached_states(other)
+    assert not is_memoized()
+
+    # A pure rotation invalidates the memoized value
+    obj.set_position_orientation(obj.get_position(), p.getQuaternionFromEuler([0, 0, 1]))
+    assert not is_memoized()
+    assert is_memoized()
+
+    # The bodies awake after physics stepping may have moved
+    tracker = ActivationStateTracker()
+    tracker.track_body(other.get_body_id())
+    tracker.refresh()
+    assert other.get_body_id() in tracker.awake_bodies
+    assert not is_memoized()
+    assert is_memoized()
+
+
+def test_memoization_lru_eviction(load_cube, monkeypatch):
+    monkeypatch.setattr(memoization, "MAX_MEMO_SIZE", 3)
+    obj = load_cube([0, 0, 1])
+    others = [load_cube([i + 1, 0, 1]) for i in range(4)]
+    state = MemoizedBodyIdsState(obj)
+
+    for other in others[:3]:
+        state.get_value(other)
+    # Use the first value again so that the second one is the least recently used
+    state.get_value(others[0])
+    assert state.num_computations == 3
+
+    state.get_value(others[3])
+    assert len(state._memo) == 3
+    state.get_value(others[0])
+    state.get_value(others[2])
+    assert state.num_computations == 4
+    state.get_value(others[1])
+    assert state.num_computations == 5
@@ -1,11 +1,31 @@
 import os
 
+import cv2
 import matplotlib.pyplot as plt
 import numpy as np
+import pybullet as p
+import pybullet_data
 
 import igibson
 from igibson.envs.igibson_env import iGibsonEnv
+from igibson.external.motion.motion_planners.nearest_neighbors import (
+    KDTreeNearestNeighbors,
+    LinearNearestNeighbors,
+    get_nearest_neighbors,
+)
+from igibson.external.pybullet_tools.utils import (
+    get_aabb,
+    get_base_cspace_map,
+    get_base_distance_fn,
+    get_collision_fn,
+    get_custom_limits,
+    get_moving_links,
+    get_swept_aabb,
+    pairwise_collision,
+    set_joint_positions,
+)
 from igibson.utils.assets_utils import download_assets, download_demo_data
+from igibson.utils.constants import OccupancyGridState
 from igibson.utils.motion_planning_wrapper import MotionPlanningWrapper
 
 
@@ -51,3 +71,78 @@ def test_base_planning():
 
     assert len(plan) > 0
     nav_env.clean()
+
+
+def test_base_cspace_map():
+    rng = np.random.RandomState(0)
+    map_2d = rng.choice(
+        [OccupancyGridState.FREESPACE, OccupancyGridState.OBSTACLES, OccupancyGridState.UNKNOWN],
+        size=(64, 64),
+        p=[0.98, 0.01, 0.01],
+    )
+    radius = 4
+    cspace_map = get_base_cspace_map(map_2d, radius)
+
+    footprint = np.zeros((radius * 2 + 1, radius * 2 + 1))
+    cv2.circle(footprint, (radius, radius), radius, 1, -1)
+    footprint = footprint.astype(bool)
+    for i in range(64):
+        for j in range(64):
+            if i < radius or j < radius or i > 64 - radius - 1 or j > 64 - radius - 1:
+                assert cspace_map[i, j]
+            else:
+                window = map_2d[i - radius : i + radius + 1, j - radius : j + radius + 1]
+                assert cspace_map[i, j] == (not np.all(window[footprint] == OccupancyGridState.FREESPACE))
+
+
+def test_nearest_neighbors():
+    rng = np.random.RandomState(0)
+    distance_fn = get_base_distance_fn(weights=np.array([1.0, 2.0, 0.3]))
+    linear, kdtree = LinearNearestNeighbors(distance_fn), get_nearest_neighbors(distance_fn)
+    assert isinstance(kdtree, KDTreeNearestNeighbors)
+
+    for i in range(500):
+        config = (rng.uniform(-3, 3), rng.uniform(-3, 3), rng.uniform(-np.pi, np.pi))
+        linear.add(config, i)
+        kdtree.add(config, i)
+        query = (rng.uniform(-3, 3), rng.uniform(-3, 3), rng.uniform(-np.pi, np.pi))
+        assert kdtree.nearest(query) == linear.nearest(query)
+        if i % 50 == 0:
+            for expected, actual in [
+                (linear.k_nearest(query, 10), kdtree.k_nearest(query, 10)),
+                (linear.within(query, 1.0), kdtree.within(query, 1.0)),
+            ]:
+                assert [item for _, item in actual] == [item for _, item in expected]
+                assert np.allclose([distance for distance, _ in actual], [distance for distance, _ in expected])
+
+
+def test_collision_checker():
+    p.connect(p.DIRECT)
+    p.setAdditionalSearchPath(pybullet_data.getDataPath())
+    robot = p.loadURDF("franka_panda/panda.urdf", useFixedBase=True)
+    joints = [joint for joint in range(p.getNumJoints(robot)) if p.getJointInfo(robot, joint)[2] == p.JOINT_REVOLUTE]
+    obstacles = [
+        p.loadURDF("table/table.urdf", [1.0, 0.0, -0.3], useFixedBase=True),
+        p.loadURDF("cube_small.urdf", [0.5, 0.2, 0.6], useFixedBase=True, globalScaling=2),
+        p.loadURDF("cube_small.urdf", [4.0, 4.0, 0.5], useFixedBase=True),
+    ]
+    moving_links = get_moving_links(robot, joints)
+    collision_fn = get_collision_fn(robot, joints, obstacles, [], False, set())
+    # The cube out of reach of the arm is never queried
+    assert obstacles[2] not in [obstacle for obstacle, _ in collision_fn.obstacles]
+
+    swept_lower, swept_upper = get_swept_aabb(robot, joints)
+    rng = np.random.RandomState(0)
+    lower_limits, upper_limits = get_custom_limits(robot, joints)
+    configurations = [tuple(rng.uniform(lower_limits, upper_limits)) for _ in range(200)]
+    collisions = []
+    for q in configurations:
+        set_joint_positions(robot, joints, q)
+        for link in moving_links:
+            lower, upper = get_aabb(robot, link)
+            assert np.all(swept_lower <= lower) and np.all(upper <= swept_upper)
+        collisions.append(any(pairwise_collision((robot, moving_links), obstacle) for obstacle in obstacles))
+    assert 0 < sum(collisions) < len(collisions)
+    assert [collision_fn(q) for q in configurations] == collisions
+    assert collision_fn.check_segment(configurations[:10]) == any(collisions[:10])
+    p.disconnect()
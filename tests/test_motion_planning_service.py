@@ -0,0 +1,165 @@
+import random
+
+import numpy as np
+import pybullet as p
+
+from igibson.robots.behavior_robot import LEFT_HAND_LOC_POSE_UNTRACKED, RIGHT_HAND_LOC_POSE_UNTRACKED
+from igibson.utils import motion_planning_service
+from igibson.utils.behavior_robot_planning_utils import plan_base_motion_br
+from igibson.utils.motion_planning_service import (
+    MotionPlanningService,
+    RigidBehaviorRobot,
+    RigidBody,
+    _solve,
+    create_rigid_body,
+    get_collision_shapes,
+    get_robot_description,
+    get_world_snapshot,
+)
+
+
+class ProxyBehaviorRobot(RigidBehaviorRobot):
+    """
+    Cylinder body and sphere hands with the interface of the BehaviorRobot used by the planning service
+    """
+
+    use_tracked_body = False
+
+    def __init__(self):
+        body = p.createMultiBody(0, p.createCollisionShape(p.GEOM_CYLINDER, radius=0.25, height=1.2))
+        parts = {
+            "body": RigidBody(body),
+            "left_hand": RigidBody(p.loadURDF("sphere_small.urdf", globalScaling=2)),
+            "right_hand": RigidBody(p.loadURDF("sphere_small.urdf", globalScaling=2)),
+        }
+        hand_local_poses = {"left_hand": LEFT_HAND_LOC_POSE_UNTRACKED, "right_hand": RIGHT_HAND_LOC_POSE_UNTRACKED}
+        super(ProxyBehaviorRobot, self).__init__(parts, hand_local_poses, initial_z_offset=0.7)
+
+
+class CancelledAfter(object):
+    """
+    Cancellation flag of the workers that cancels the requests after being checked a number of times
+    """
+
+    def __init__(self, num_checks):
+        self.num_checks = num_checks
+        self.num_reads = 0
+
+    @property
+    def value(self):
+        self.num_reads += 1
+        return 1 if self.num_reads > self.num_checks else 0
+
+
+def load_scene():
+    """
+    :return: robot at the origin between two tables, and the table ids
+    """
+    robot = ProxyBehaviorRobot()
+    robot.set_position_orientation([0, 0, 0.7], [0, 0, 0, 1])
+    obstacles = [p.loadURDF("table/table.urdf", [x, 0, 0], useFixedBase=True, globalScaling=0.6) for x in [-1.5, 1.5]]
+    return robot, obstacles
+
+
+def get_candidates():
+    """
+    :return: base candidates around the tables, the last one with a goal inside a table
+    """
+    base_limits = [(-4, -4), (4, 4)]
+    goals = [[2.0, 2.0, 0.0], [-3.0, 0.0, np.pi / 2], [3.0, -1.0, 0.0], [1.5, 0.0, 0.0]]
+    return [{"end_conf": goal, "base_limits": base_limits} for goal in goals]
+
+
+def plan_sequentially(robot, obstacles, candidates, seeds):
+    plans = []
+    for kwargs, seed in zip(candidates, seeds):
+        random.seed(seed)
+        np.random.seed(seed)
+        plans.append(plan_base_motion_br(robot=robot, obstacles=obstacles, **kwargs))
+        robot.set_position_orientation([0, 0, 0.7], [0, 0, 0, 1])
+    return plans
+
+
+def get_closest_distances(body_id, probe_ids):
+    return [min(point[8] for point in p.getClosestPoints(body_id, probe_id, 10.0)) for probe_id in probe_ids]
+
+
+def test_collision_shape_round_trip(pybullet_direct):
+    box_shape = p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.1, 0.2, 0.3], collisionFramePosition=[0.1, 0, 0.2])
+    body_ids = [
+        p.createMultiBody(0, box_shape, basePosition=[0, 0, 1], baseOrientation=p.getQuaternionFromEuler([0.3, 0, 1])),
+        p.createMultiBody(0, p.createCollisionShape(p.GEOM_SPHERE, radius=0.2), basePosition=[2, 0, 1]),
+        p.createMultiBody(
+            0,
+            p.createCollisionShape(p.GEOM_CAPSULE, radius=0.1, height=0.5),
+            basePosition=[0, 2, 1],
+            baseOrientation=p.getQuaternionFromEuler([0, 1, 0]),
+        ),
+        p.loadURDF("duck_vhacd.urdf", [2, 2, 1], globalScaling=3),
+    ]
+    rng = np.random.RandomState(0)
+    probe_shape = p.createCollisionShape(p.GEOM_SPHERE, radius=0.01)
+    probe_ids = [p.createMultiBody(0, probe_shape, basePosition=rng.uniform(-1, 3, 3)) for _ in range(20)]
+
+    for body_id in body_ids:
+        copy_id = create_rigid_body(get_collision_shapes(body_id))
+        p.resetBasePositionAndOrientation(copy_id, *p.getBasePositionAndOrientation(body_id))
+        assert np.allclose(
+            get_closest_distances(body_id, probe_ids), get_closest_distances(copy_id, probe_ids), atol=1e-4
+        )
+
+
+def test_solve(pybullet_direct):
+    robot, obstacles = load_scene()
+    candidates = get_candidates()
+    seeds = list(range(len(candidates)))
+    plans = plan_sequentially(robot, obstacles, candidates, seeds)
+    assert plans[-1] is None
+
+    service = MotionPlanningService(num_workers=2)
+    # The workers plan from the same world and seeds as the sequential planning
+    index, plan = service.solve("base", robot, candidates, obstacles=obstacles, seeds=seeds)
+    assert plan is not None and plan == plans[index]
+
+    index, plan = service.solve("base", robot, candidates, obstacles=obstacles, seeds=seeds, return_first=False)
+    assert len(plan) == min(len(plan) for plan in plans if plan is not None)
+    assert plan == plans[index]
+
+    index, plan = service.solve("base", robot, candidates[-1:], obstacles=obstacles, seeds=seeds[-1:])
+    assert index is None and plan is None
+    service.close()
+
+
+def test_solve_cancellation(pybullet_direct, monkeypatch):
+    robot, obstacles = load_scene()
+    # The goal is behind a wall, so that the planner samples configurations
+    wall = p.createMultiBody(0, p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.1, 2.5, 1]), basePosition=[2.2, 0, 1])
+    obstacles.append(wall)
+    candidate = {"end_conf": [3.0, 0.0, 0.0], "base_limits": [(-4, -4), (4, 4)]}
+    snapshot = get_world_snapshot(obstacles + [part.get_body_id() for part in robot.parts.values()])
+    monkeypatch.setitem(motion_planning_service._worker, "bodies", {})
+
+    def solve(cancelled_request, snapshot):
+        monkeypatch.setitem(motion_planning_service._worker, "cancelled_request", cancelled_request)
+        args = (1, 0, "base", snapshot, get_robot_description(robot), None, obstacles, candidate, 0)
+        return _solve(*args)[2]
+
+    # The candidates of a request that was cancelled before they started are not planned
+    cancelled_request = CancelledAfter(0)
+    assert solve(cancelled_request, snapshot=None) is None
+    assert cancelled_request.num_reads == 1
+
+    # The running candidates stop at the next sample
+    cancelled_request = CancelledAfter(10000)
+    assert solve(cancelled_request, snapshot) is not None
+    num_checks = cancelled_request.num_reads
+    assert num_checks > 2
+    cancelled_request = CancelledAfter(num_checks // 2)
+    assert solve(cancelled_request, snapshot) is None
+    assert cancelled_request.num_reads == num_checks // 2 + 1
+
+    # The service cancels the other candidates of a request once it returns
+    service = MotionPlanningService(num_workers=1)
+    service.solve("base", robot, get_candidates(), obstacles=obstacles, seeds=[0, 1, 2, 3])
+    assert service.cancelled_request.value == service.request_id
+    service.close()
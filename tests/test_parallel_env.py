@@ -0,0 +1,83 @@
+from functools import partial
+
+import gym
+import numpy as np
+
+from igibson.envs.parallel_env import ParallelNavEnv
+
+
+class DictObservationEnv(gym.Env):
+    """
+    Environment whose dict observations only depend on its id and on its number of steps
+    """
+
+    def __init__(self, env_id):
+        self.env_id = env_id
+        self.num_steps = 0
+        self.observation_space = gym.spaces.Dict(
+            {
+                "rgb": gym.spaces.Box(0.0, 1.0, shape=(16, 16, 3), dtype=np.float32),
+                "depth": gym.spaces.Box(0.0, 1.0, shape=(16, 16, 1), dtype=np.float32),
+                "seg": gym.spaces.Box(0, 255, shape=(16, 16, 1), dtype=np.int32),
+                "task_obs": gym.spaces.Box(-np.inf, np.inf, shape=(4,), dtype=np.float64),
+            }
+        )
+        self.action_space = gym.spaces.Box(-1.0, 1.0, shape=(2,), dtype=np.float32)
+
+    def get_obs(self):
+        rng = np.random.RandomState(self.env_id * 1000 + self.num_steps)
+        return {
+            key: rng.uniform(0, 255, space.shape).astype(space.dtype)
+            for key, space in self.observation_space.spaces.items()
+        }
+
+    def reset(self):
+        self.num_steps = 0
+        return self.get_obs()
+
+    def step(self, action):
+        self.num_steps += 1
+        return self.get_obs(), float(np.sum(action)) + self.env_id, self.num_steps >= 5, {"num_steps": self.num_steps}
+
+
+def run_episode(use_shared_memory, num_envs=3, num_steps=5):
+    """
+    :return: batched observations, rewards, dones and infos of an episode, copied out of the shared memory buffer
+    """
+    env = ParallelNavEnv([partial(DictObservationEnv, i) for i in range(num_envs)], use_shared_memory=use_shared_memory)
+    actions = np.full((num_envs, 2), 0.25)
+    try:
+        if use_shared_memory:
+            observations = [{key: np.copy(value) for key, value in env.reset().items()}]
+            results = []
+            for _ in range(num_steps):
+                obs, rewards, dones, infos = env.step(actions)
+                observations.append({key: np.copy(value) for key, value in obs.items()})
+                results.append((list(rewards), list(dones), infos))
+        else:
+            # The pickled transport returns the observation of each environment
+            observations = [env.reset()]
+            results = []
+            for _ in range(num_steps):
+                obs, rewards, dones, infos = zip(*env.step(actions))
+                observations.append(obs)
+                results.append((list(rewards), list(dones), list(infos)))
+            observations = [
+                {key: np.stack([env_obs[key] for env_obs in obs]) for key in obs[0]} for obs in observations
+            ]
+    finally:
+        env.close()
+    return observations, results
+
+
+def test_shared_memory_observations():
+    # More steps than the ring buffer has slots, so that the slots are reused
+    pickled_observations, pickled_results = run_episode(use_shared_memory=False)
+    shared_observations, shared_results = run_episode(use_shared_memory=True)
+    assert shared_results == pickled_results
+    assert len(shared_observations) == len(pickled_observations)
+    for shared_obs, pickled_obs in zip(shared_observations, pickled_observations):
+        assert shared_obs.keys() == pickled_obs.keys()
+        for key in shared_obs:
+            assert shared_obs[key].dtype == pickled_obs[key].dtype
+            assert np.array_equal(shared_obs[key], pickled_obs[key])
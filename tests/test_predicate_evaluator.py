@@ -0,0 +1,142 @@
+import pybullet as p
+from bddl.condition_evaluation import compile_state, evaluate_state
+
+from igibson import object_states
+from igibson.activity.bddl_backend import PREDICATE_EVALUATOR, IGibsonBDDLBackend
+
+
+class CountingState(object):
+    """
+    Object state returning fixed values and counting its evaluations
+    """
+
+    def __init__(self, values=None, precheck=True):
+        self.values = values if values is not None else {}
+        self.precheck = precheck
+        self.num_evaluations = 0
+        self.num_prechecks = 0
+
+    def get_value(self, *others):
+        self.num_evaluations += 1
+        return self.values.get(others, False)
+
+    def passes_precheck(self, *others):
+        self.num_prechecks += 1
+        return self.precheck
+
+
+class StubObject(object):
+    def __init__(self, name):
+        self.name = name
+        self.states = {
+            object_states.Inside: CountingState(),
+            object_states.OnTop: CountingState(precheck=False),
+            object_states.Cooked: CountingState(),
+        }
+
+    def __repr__(self):
+        return self.name
+
+
+def compile_goal():
+    """
+    :return: stub objects by name, and a compiled goal with forpairs, forall, not and a duplicated atom
+    """
+    object_map = {
+        "apple.n.01": ["apple.n.01_1", "apple.n.01_2"],
+        "bowl.n.01": ["bowl.n.01_1", "bowl.n.01_2"],
+        "table.n.02": ["table.n.02_1"],
+    }
+    objs = {name: StubObject(name) for names in object_map.values() for name in names}
+    objs["apple.n.01_1"].states[object_states.Inside].values[(objs["bowl.n.01_1"],)] = True
+    objs["apple.n.01_2"].states[object_states.Inside].values[(objs["bowl.n.01_2"],)] = True
+    goal = [
+        [
+            "forpairs",
+            ["?apple.n.01", "-", "apple.n.01"],
+            ["?bowl.n.01", "-", "bowl.n.01"],
+            ["inside", "?apple.n.01", "?bowl.n.01"],
+        ],
+        ["forall", ["?apple.n.01", "-", "apple.n.01"], ["not", ["cooked", "?apple.n.01"]]],
+        ["inside", "?apple.n.01_1", "?bowl.n.01_1"],
+        ["not", ["ontop", "?apple.n.01_1", "?table.n.02_1"]],
+    ]
+    compiled_goal = compile_state(goal, IGibsonBDDLBackend(), scope=dict(objs), object_map=object_map)
+    return objs, compiled_goal
+
+
+def get_num_evaluations(objs, state_class):
+    return sum(obj.states[state_class].num_evaluations for obj in objs.values())
+
+
+def test_predicate_evaluator_caching():
+    PREDICATE_EVALUATOR.clear()
+    PREDICATE_EVALUATOR.reset_stats()
+    objs, compiled_goal = compile_goal()
+
+    with PREDICATE_EVALUATOR.caching(0):
+        PREDICATE_EVALUATOR.evaluate_atoms(compiled_goal)
+        # 4 distinct inside atoms, the duplicated one included, and 2 cooked atoms
+        assert get_num_evaluations(objs, object_states.Inside) == 4
+        assert get_num_evaluations(objs, object_states.Cooked) == 2
+        # The failed precheck is cached as False without evaluating the state
+        assert objs["apple.n.01_1"].states[object_states.OnTop].num_prechecks == 1
+        assert get_num_evaluations(objs, object_states.OnTop) == 0
+
+        success, _ = evaluate_state(compiled_goal)
+        assert success
+        assert get_num_evaluations(objs, object_states.Inside) == 4
+        assert get_num_evaluations(objs, object_states.Cooked) == 2
+
+        stats = PREDICATE_EVALUATOR.get_stats()
+        assert stats["inside"]["evaluations"] == 4
+        # forpairs evaluates its 4 atoms, and the duplicated atom is evaluated again
+        assert stats["inside"]["cache_hits"] == 5
+        assert stats["cooked"]["evaluations"] == 2
+        assert stats["cooked"]["cache_hits"] == 2
+        assert stats["ontop"]["evaluations"] == 1
+        assert stats["ontop"]["cache_hits"] == 1
+
+        # Clearing the cache evaluates the atoms again
+        PREDICATE_EVALUATOR.clear()
+        evaluate_state(compiled_goal)
+        assert get_num_evaluations(objs, object_states.Inside) == 8
+
+    # Still cached for the same frame
+    with PREDICATE_EVALUATOR.caching(0):
+        evaluate_state(compiled_goal)
+        assert get_num_evaluations(objs, object_states.Inside) == 8
+
+    # Dropped when the frame changes
+    with PREDICATE_EVALUATOR.caching(1):
+        evaluate_state(compiled_goal)
+        assert get_num_evaluations(objs, object_states.Inside) == 12
+        assert get_num_evaluations(objs, object_states.Cooked) == 6
+
+    PREDICATE_EVALUATOR.clear()
+    PREDICATE_EVALUATOR.reset_stats()
+
+
+def test_predicate_evaluator_adjacencies(load_cube):
+    table = load_cube([0, 0, 0.1])
+    apple = load_cube([0, 0, 0.25], half_extent=0.05, mass=1)
+    p.stepSimulation()
+    objs = {"apple.n.01_1": apple, "table.n.02_1": table}
+    object_map = {"apple.n.01": ["apple.n.01_1"], "table.n.02": ["table.n.02_1"]}
+    goal = [["ontop", "?apple.n.01_1", "?table.n.02_1"]]
+    compiled_goal = compile_state(goal, IGibsonBDDLBackend(), scope=dict(objs), object_map=object_map)
+
+    PREDICATE_EVALUATOR.clear()
+    with PREDICATE_EVALUATOR.caching(0):
+        PREDICATE_EVALUATOR.evaluate_atoms(compiled_goal)
+        assert evaluate_state(compiled_goal)[0]
+    # OnTop only needs the vertical adjacencies
+    assert apple.states[object_states.VerticalAdjacency].value is not None
+    assert apple.states[object_states.HorizontalAdjacency].value is None
+
+    # Moving an object drops the cached values even if the simulator did not step
+    apple.set_position([1, 0, 0.25])
+    with PREDICATE_EVALUATOR.caching(0):
+        PREDICATE_EVALUATOR.evaluate_atoms(compiled_goal)
+        assert not evaluate_state(compiled_goal)[0]
+    PREDICATE_EVALUATOR.clear()
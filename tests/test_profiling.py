@@ -0,0 +1,64 @@
+import json
+import time
+
+import numpy as np
+
+from igibson.utils.profiling import StepProfiler, TimerStats
+
+
+def test_timer_stats_ring_buffer():
+    stats = TimerStats(history_size=100)
+    for duration in np.arange(1, 201) / 1000.0:
+        stats.add(duration)
+    summary = stats.summarize()
+    assert summary["count"] == 200
+    assert np.isclose(summary["total_ms"], np.sum(np.arange(1, 201)))
+    assert np.isclose(summary["max_ms"], 200)
+    # Percentiles are over the latest 100 durations only
+    assert np.isclose(summary["p50_ms"], np.percentile(np.arange(101, 201), 50))
+    assert np.isclose(summary["p99_ms"], np.percentile(np.arange(101, 201), 99))
+
+
+def test_nested_scopes(tmp_path):
+    profiler = StepProfiler()
+    with profiler.scope("step"):
+        pass
+    assert profiler.get_stats() == {}
+
+    profiler.enable(trace=True)
+
+    @profiler.profile("render")
+    def render():
+        time.sleep(0.001)
+
+    for _ in range(3):
+        with profiler.scope("step"):
+            with profiler.scope("physics"):
+                pass
+            render()
+    render()
+
+    stats = profiler.get_stats()
+    assert list(stats) == ["render", "step", "step/physics", "step/render"]
+    assert stats["step"]["count"] == 3 and stats["step/render"]["count"] == 3 and stats["render"]["count"] == 1
+    assert stats["step"]["total_ms"] >= stats["step/render"]["total_ms"] >= 3.0
+    assert "physics" in profiler.get_summary()
+
+    profiler.save_json(str(tmp_path / "stats.json"))
+    with open(str(tmp_path / "stats.json")) as f:
+        assert json.load(f)["step/physics"]["count"] == 3
+
+    profiler.save_chrome_trace(str(tmp_path / "trace.json"))
+    with open(str(tmp_path / "trace.json")) as f:
+        events = json.load(f)["traceEvents"]
+    assert len(events) == 10
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+    assert sorted(set(event["name"] for event in events)) == ["physics", "render", "step"]
+
+    profiler.disable()
+    with profiler.scope("step"):
+        pass
+    assert profiler.get_stats()["step"]["count"] == 3
+
+    profiler.reset()
+    assert profiler.get_stats() == {} and profiler.get_chrome_trace()["traceEvents"] == []
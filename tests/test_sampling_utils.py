@@ -0,0 +1,118 @@
+from collections import defaultdict
+
+import numpy as np
+import pybullet as p
+
+from igibson.utils import sampling_utils, utils
+from igibson.utils.sampling_utils import (
+    sample_cuboid_on_object,
+    sample_cuboids_from_origins,
+    sample_origin_positions_batch,
+)
+
+CUBOID_DIMENSIONS = np.array([0.1, 0.1, 0.1])
+# Rays are cast from the faces of the bounding box, mostly from the top
+SAMPLING_PARAMS = {"bimodal_mean_fraction": 1.0, "bimodal_stdev_fraction": 1e-6, "axis_probabilities": [0.2, 0.2, 0.6]}
+
+
+class BoxObject(object):
+    """
+    Cube with the bounding box interface of the objects used by the sampler
+    """
+
+    def __init__(self, cube):
+        self.cube = cube
+
+    def get_body_id(self):
+        return self.cube.get_body_id()
+
+    def get_base_aligned_bounding_box(self, xy_aligned=True):
+        position, orientation = p.getBasePositionAndOrientation(self.get_body_id())
+        return np.array(position), np.array(orientation), 2 * np.array(self.cube.dimension), None
+
+
+def load_table(load_cube):
+    """
+    :return: unit box on the ground, and the body id of a small obstacle on its top face
+    """
+    table = BoxObject(load_cube([0, 0, 0.5], half_extent=0.5))
+    obstacle = load_cube([0.2, 0, 1.05], half_extent=0.05)
+    return table, obstacle.get_body_id()
+
+
+def test_sample_cuboids_from_origins(load_cube):
+    table, _ = load_table(load_cube)
+    bbox_center, bbox_orn, bbox_extent, _ = table.get_base_aligned_bounding_box()
+    half_extent = bbox_extent / 2 + sampling_utils._DEFAULT_AABB_OFFSET
+    to_wf_transform = utils.quat_pos_to_mat(bbox_center, bbox_orn)
+    np.random.seed(0)
+    num_origins = 2000
+    axes, is_top, start_positions = sample_origin_positions_batch(
+        -half_extent, half_extent, num_origins, **SAMPLING_PARAMS
+    )
+    # Each origin casts a 3x3 grid of parallel rays, more than pybullet casts in one batch
+    assert num_origins * 9 > p.MAX_RAY_INTERSECTION_BATCH_SIZE
+
+    def sample(indices):
+        return sample_cuboids_from_origins(
+            table.get_body_id(),
+            to_wf_transform,
+            axes[indices],
+            is_top[indices],
+            start_positions[indices],
+            -half_extent,
+            half_extent,
+            CUBOID_DIMENSIONS,
+            [defaultdict(list) for _ in indices],
+            False,
+            sampling_utils._DEFAULT_MAX_ANGLE_WITH_Z_AXIS,
+            sampling_utils._DEFAULT_HIT_TO_PLANE_THRESHOLD,
+            False,
+        )
+
+    # The parallel rays of the origins are drawn in order, so that the same seed gives the same rays
+    np.random.seed(1)
+    batch_results = sample(np.arange(num_origins))
+    np.random.seed(1)
+    results = [sample(np.array([i]))[0] for i in range(num_origins)]
+
+    assert 0 < sum(result is not None for result in results) < num_origins
+    for batch_result, result in zip(batch_results, results):
+        if result is None:
+            assert batch_result is None
+            continue
+        centroid, up_vector, rotation, link = result
+        assert np.allclose(batch_result[0], centroid)
+        assert np.allclose(batch_result[1], up_vector)
+        assert np.allclose(batch_result[2], rotation)
+        assert batch_result[3] == link
+
+
+def test_sample_cuboid_on_object(load_cube):
+    table, obstacle_id = load_table(load_cube)
+    num_samples = 2000
+
+    def sample():
+        np.random.seed(0)
+        return sample_cuboid_on_object(table, num_samples, CUBOID_DIMENSIONS, **SAMPLING_PARAMS)
+
+    results = sample()
+    assert len(results) == num_samples
+    assert all(
+        np.array_equal(result[0], other_result[0]) and np.array_equal(result[2], other_result[2])
+        for result, other_result in zip(results, sample())
+    )
+
+    successes = [result for result in results if result[0] is not None]
+    assert len(successes) > num_samples / 2
+    cuboid_id = p.createMultiBody(0, p.createCollisionShape(p.GEOM_BOX, halfExtents=CUBOID_DIMENSIONS / 2))
+    for centroid, up_vector, rotation, link, _ in successes:
+        # The cuboids are on a face of the table, padded away from it, and clear of the obstacle
+        axis = np.argmax(np.abs(up_vector))
+        assert np.allclose(np.abs(up_vector[axis]), 1.0, atol=1e-3)
+        distance_to_face = np.dot(centroid - [0, 0, 0.5], up_vector) - 0.5
+        padding = sampling_utils._DEFAULT_CUBOID_BOTTOM_PADDING
+        assert np.isclose(distance_to_face, CUBOID_DIMENSIONS[2] / 2 + padding, atol=1e-4)
+        p.resetBasePositionAndOrientation(cuboid_id, centroid, rotation)
+        assert not p.getClosestPoints(cuboid_id, obstacle_id, 0.0)
+        assert link == -1
@@ -1,4 +1,7 @@
+import numpy as np
+
 from igibson.objects.ycb_object import YCBObject
+from igibson.render.mesh_renderer.instances import Instance
 from igibson.scenes.stadium_scene import StadiumScene
 from igibson.simulator import Simulator
 from igibson.utils.assets_utils import download_assets
@@ -21,3 +24,31 @@ def test_simulator():
     for i in range(1000):
         s.step()
     s.disconnect()
+
+
+def test_batched_sync():
+    download_assets()
+    s = Simulator(mode="headless")
+    scene = StadiumScene()
+    s.import_scene(scene)
+
+    for i in range(5):
+        obj = YCBObject("006_mustard_bottle")
+        s.import_object(obj)
+        obj.set_position([0, i * 0.2, 1])
+
+    for i in range(30):
+        s.step()
+
+    s.sync(force_sync=True)
+    batched_poses = {
+        instance.id: (np.copy(instance.pose_trans), np.copy(instance.pose_rot))
+        for instance in s.renderer.instances
+        if instance.dynamic and isinstance(instance, Instance)
+    }
+    for instance in s.renderer.instances:
+        if instance.id in batched_poses:
+            s.update_position(instance, force_sync=True)
+            assert np.allclose(instance.pose_trans, batched_poses[instance.id][0])
+            assert np.allclose(instance.pose_rot, batched_poses[instance.id][1])
+    s.disconnect()
@@ -243,6 +243,43 @@ def test_dirty():
         s.disconnect()
 
 
+def test_dirty_dump():
+    s = Simulator(mode="headless")
+
+    try:
+        scene = EmptyScene()
+        s.import_scene(scene)
+        model_path = os.path.join(get_ig_model_path("sink", "sink_1"), "sink_1.urdf")
+
+        sink = URDFObject(
+            filename=model_path,
+            category="sink",
+            name="sink_1",
+            scale=np.array([0.8, 0.8, 0.8]),
+            abilities={"dustyable": {}},
+        )
+
+        s.import_object(sink)
+        sink.set_position([1, 1, 0.8])
+        assert sink.states[object_states.Dusty].set_value(True)
+        dump = sink.states[object_states.Dusty].dump()
+        num_active = sink.states[object_states.Dusty].dirt.get_num_active()
+
+        # Moving the sink moves the dust with it, and restoring the dump puts it back in place.
+        sink.set_position([2, 2, 0.8])
+        s.step()
+        sink.set_position([1, 1, 0.8])
+        sink.states[object_states.Dusty].load(dump)
+        assert sink.states[object_states.Dusty].dirt.get_num_active() == num_active
+        for old_data, new_data in zip(dump["particles"], sink.states[object_states.Dusty].dump()["particles"]):
+            assert (old_data is None) == (new_data is None)
+            if old_data is not None:
+                assert np.allclose(old_data[1], new_data[1], atol=1e-4)
+
+    finally:
+        s.disconnect()
+
+
 def test_water_source():
     s = Simulator(mode="headless")
 
@@ -0,0 +1,39 @@
+import numpy as np
+
+import igibson.utils.transform_utils as T
+
+
+def random_poses(n, seed=0):
+    rng = np.random.RandomState(seed)
+    pos = rng.uniform(-1.0, 1.0, (n, 3))
+    quat = rng.normal(size=(n, 4))
+    quat /= np.linalg.norm(quat, axis=1, keepdims=True)
+    return pos, quat
+
+
+def test_batch_conversions_match_per_element():
+    pos, quat = random_poses(100)
+
+    rmats = T.quat2mat_batch(quat)
+    assert rmats.shape == (100, 3, 3)
+    assert np.allclose(rmats, [T.quat2mat(q) for q in quat], atol=1e-6)
+
+    quats = T.mat2quat_batch(rmats)
+    assert quats.shape == (100, 4)
+    assert np.allclose(quats, [T.mat2quat(m) for m in rmats], atol=1e-6)
+    # Same rotation up to the sign of the quaternion
+    assert np.allclose(np.abs(np.sum(quats * quat, axis=1)), 1.0, atol=1e-5)
+
+    poses = T.pose2mat_batch(pos, quat)
+    assert poses.dtype == np.float32
+    assert np.allclose(poses, [T.pose2mat((x, q)) for x, q in zip(pos, quat)], atol=1e-6)
+    assert np.allclose(T.pose_inv(poses), [T.pose_inv(mat) for mat in poses], atol=1e-6)
+
+    # Batches of any leading shape
+    assert T.quat2mat_batch(quat.reshape(10, 10, 4)).shape == (10, 10, 3, 3)
+    assert T.mat2quat_batch(rmats.reshape(10, 10, 3, 3)).shape == (10, 10, 4)
+
+
+def test_quat2mat_batch_degenerate_quaternion():
+    rmats = T.quat2mat_batch([[0.0, 0.0, 0.0, 0.0], [0.0, 0.0, 0.0, 1.0]])
+    assert np.allclose(rmats, np.identity(3))
@@ -0,0 +1,94 @@
+import networkx as nx
+import numpy as np
+
+from igibson.utils.trav_graph import DistanceField, TraversabilityGraph
+from igibson.utils.utils import l2_distance
+
+
+def build_reference_graph(trav_map):
+    """
+    NetworkX construction of the traversability graph, as IndoorScene.build_trav_graph used to do it
+    """
+    size = trav_map.shape[0]
+    g = nx.Graph()
+    for i in range(size):
+        for j in range(size):
+            if trav_map[i, j] == 0:
+                continue
+            g.add_node((i, j))
+            for n in [(i - 1, j - 1), (i, j - 1), (i + 1, j - 1), (i - 1, j)]:
+                if 0 <= n[0] < size and 0 <= n[1] < size and trav_map[n[0], n[1]] > 0:
+                    g.add_edge(n, (i, j), weight=l2_distance(n, (i, j)))
+    return g.subgraph(max(nx.connected_components(g), key=len)).copy()
+
+
+def random_trav_map(size=64, seed=0):
+    rng = np.random.RandomState(seed)
+    trav_map = np.full((size, size), 255, dtype=np.uint8)
+    trav_map[rng.rand(size, size) < 0.3] = 0
+    return trav_map
+
+
+def test_trav_graph_matches_networkx():
+    trav_map = random_trav_map()
+    graph = TraversabilityGraph.from_trav_map(trav_map)
+    reference = build_reference_graph(trav_map)
+
+    g = graph.to_networkx()
+    assert set(g.nodes) == set(reference.nodes)
+    assert set(map(frozenset, g.edges)) == set(map(frozenset, reference.edges))
+    for u, v, weight in reference.edges(data="weight"):
+        assert np.isclose(g[u][v]["weight"], weight)
+    assert all(graph.has_node(node) for node in reference.nodes)
+    assert not graph.has_node((-1, 0)) and not graph.has_node((0, trav_map.shape[1]))
+
+
+def test_trav_graph_cache(tmp_path):
+    trav_map = random_trav_map(seed=1)
+    graph = TraversabilityGraph.load_or_build(str(tmp_path), "floor_trav_0", trav_map, 0.1, 2)
+    assert len(list(tmp_path.glob("floor_trav_0_*.npz"))) == 1
+
+    cached_graph = TraversabilityGraph.load_or_build(str(tmp_path), "floor_trav_0", trav_map, 0.1, 2)
+    assert np.array_equal(cached_graph.nodes, graph.nodes)
+    assert (cached_graph.adjacency != graph.adjacency).nnz == 0
+
+    # A different erosion gets its own cache entry
+    TraversabilityGraph.load_or_build(str(tmp_path), "floor_trav_0", trav_map, 0.1, 3)
+    assert len(list(tmp_path.glob("floor_trav_0_*.npz"))) == 2
+
+
+def test_trav_graph_shortest_path():
+    trav_map = random_trav_map(seed=2)
+    graph = TraversabilityGraph.from_trav_map(trav_map)
+    reference = build_reference_graph(trav_map)
+    rng = np.random.RandomState(0)
+
+    for _ in range(20):
+        source, target = (tuple(graph.nodes[i]) for i in rng.choice(graph.get_num_nodes(), 2, replace=False))
+        path = graph.get_shortest_path(source, target)
+        assert tuple(path[0]) == source and tuple(path[-1]) == target
+        steps = np.abs(np.diff(path, axis=0))
+        assert np.all(steps.max(axis=1) == 1) and all(graph.has_node(cell) for cell in path)
+        length = np.sum(np.linalg.norm(np.diff(path, axis=0), axis=1))
+        assert np.isclose(length, nx.astar_path_length(reference, source, target, heuristic=l2_distance))
+
+    # Cells out of the graph are connected to their closest node, without modifying the graph
+    num_edges = graph.adjacency.nnz
+    path = graph.get_shortest_path((-3, -3), (trav_map.shape[0] + 2, trav_map.shape[1] + 2))
+    assert tuple(path[0]) == (-3, -3) and tuple(path[-1]) == (trav_map.shape[0] + 2, trav_map.shape[1] + 2)
+    assert graph.adjacency.nnz == num_edges
+
+
+def test_distance_field():
+    trav_map = random_trav_map(seed=3)
+    graph = TraversabilityGraph.from_trav_map(trav_map)
+    rng = np.random.RandomState(0)
+
+    for target in [tuple(graph.nodes[rng.randint(graph.get_num_nodes())]), (-2, 5)]:
+        distance_field = DistanceField(graph, target)
+        for _ in range(10):
+            source = tuple(rng.randint(-2, trav_map.shape[0] + 2, size=2))
+            path = distance_field.get_path(source)
+            length = np.sum(np.linalg.norm(np.diff(path, axis=0), axis=1))
+            assert np.isclose(distance_field.get_distance(source), length)
+            assert np.array_equal(path, graph.get_shortest_path(source, target))